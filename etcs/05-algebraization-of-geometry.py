@@ -2,6 +2,24 @@
 
 from manimlib.imports import *
 
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from etcslib import finite
+from etcslib.finite import FiniteNamedSetBag
+from etcslib.finset import FinSet
+from etcslib.finset import product
+from etcslib.geometry import ParametricCircle
+from etcslib.geometry import ParametricDot
+from etcslib.geometry import ParametricLine
+from etcslib.layers import LayeredScene
+from etcslib.paths import ArcLengthPath
+from etcslib.paths import Reverse
+from etcslib.static_layers import mark_static
+from etcslib.traced_path import TracedPath
+
 # To watch one of these scenes, run the following:
 # python -m manim example_scenes.py SquareToCircle -pl
 #
@@ -14,78 +32,10 @@ from manimlib.imports import *
 # Use -r <number> to specify a resolution (for example, -r 1080
 # for a 1920x1080 video)
 
-class Reverse(VMobject):
-    def __init__(self, obj, **kwargs):
-        VMobject.__init__(self, **kwargs)
-        self.obj = obj
-        self.add(obj)
-
-    def point_from_proportion(self, alpha):
-        return self.obj.point_from_proportion(1 - alpha)
-
-class FiniteMapping(VMobject):
-    def __init__(self, set_from, set_to, f, f_name=None, **kwargs):
-        VMobject.__init__(self, **kwargs)
-        if f_name:
-            self.f_name = TextMobject(str(f_name), **kwargs).move_to(n/2 * UP)
-            self.add(self.f_name)
-
-        self.set_from = set_from
-        self.set_to   = set_to
-
-        self.arrows = []
-        for i in range(len(set_from.elements)):
-            x = set_from.elements[i]
-            dot_from = set_from.dots[i]
-            y = f(x)
-            j = set_to.elements.index(y)
-            dot_to = set_to.dots[j]
-            arr = Arrow(dot_from, dot_to, tip_length = 0.1, stroke_width = 2, buff=0.1, **kwargs)
-            self.arrows.append(arr)
-            self.add(arr)
-
-class FiniteNamedSetBag(VMobject):
-    def __init__(self, names, set_name=None, set_boundary=False, set_draw_dots=True, set_element_lines=1, set_orientation=DOWN,
-            element_label_at=None, **kwargs):
-        VMobject.__init__(self, **kwargs)
-
-        if element_label_at is None:
-            if set_draw_dots:
-                element_label_at = 0.7 * rotate_vector(set_orientation, np.pi/2)
-            else:
-                element_label_at = 0
-
-        self.elements = names
-
-        if set_name:
-            self.set_name = TextMobject(str(set_name), **kwargs).move_to(n/2 * UP)
-            self.add(self.set_name)
-
-        n = len(names)
-        line_k = 1 + (n - 1) // set_element_lines
-        dx = set_orientation/2
-        dy = rotate_vector(dx, np.pi/2)
-        start = - ((line_k - 1) * dx / 2 + (set_element_lines - 1) * dy / 2)
-
-        self.dots = [Dot(
-            (start + (i % line_k + 0.5 * ((i // line_k) % 2)) * dx + (i // line_k) * dy)
-            , **kwargs) for i in range(n)]
-        self.labels = []
-
-        for (dot, name) in zip(self.dots, names):
-            label = TextMobject(str(name), **kwargs).scale(0.8).next_to(dot, element_label_at)
-            self.labels.append(label)
-            if set_draw_dots:
-                self.add(dot)
-            self.add(label)
-
-        if not set_draw_dots:
-            self.dots = self.labels
-
-        if set_boundary:
-            self.bag = Circle(**kwargs)
-            self.bag.surround(self)
-            self.add(self.bag)
+class FiniteMapping(finite.FiniteMapping):
+    CONFIG = {
+        "tip_length": 0.1,
+    }
 
 class FiniteSetBag(VMobject):
     def __init__(self, n, boundary=False, **kwargs):
@@ -144,7 +94,7 @@ class AlgebraisationOfGeometrySummary(Scene):
         self.play(Write(P_set))
         self.wait()
 
-class ParabolaExample(Scene):
+class ParabolaExample(LayeredScene):
     def construct(self):
         c = 2 # parameter for parabola
         t = 2.5 # parameter for a point on a parabola
@@ -170,15 +120,15 @@ class ParabolaExample(Scene):
         F_name = TexMobject("F", "=(0, c)", color=BLUE).next_to(F_dot, UP).shift(0.5*RIGHT)
         focus_name = TextMobject(r"\emph{focus}", color=BLUE).next_to(F_name[0], RIGHT)
 
-        E_dot = Dot(L_line.get_point_from_function(t))
+        E_dot = ParametricDot(L_line.get_point_from_function(t))
         E_name = TexMobject("E").next_to(E_dot, DOWN)
 
         parabola_function = lambda x: (x**2)/(4*c)
 
         P_graph = grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6)
         P_graph_left = Reverse(grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6, x_min = t, x_max = t1))
-        P_graph_right1 = grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6, x_min = t1, x_max = t2)
-        P_graph_right2 = grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6, x_min = t2, x_max = t3)
+        P_graph_right1 = ArcLengthPath(grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6, x_min = t1, x_max = t2))
+        P_graph_right2 = ArcLengthPath(grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6, x_min = t2, x_max = t3))
 
         tangent = TangentLine(
                 P_graph,
@@ -199,14 +149,14 @@ class ParabolaExample(Scene):
         F_circle = Circle(radius=EF, stroke_width=1,stroke_opacity=0.5,color=WHITE).move_to(F_dot)
 
         C_point = P_graph.get_point_from_function(t)
-        C_dot = Dot(C_point, color=YELLOW)
+        C_dot = ParametricDot(C_point, color=YELLOW)
         C_name = TexMobject("C", "=(x_C, y_C)").next_to(C_dot, RIGHT+0.5*DOWN)
-        C_to_L = Line(C_dot, np.array([C_point[0],0,0])+c*DOWN)
+        C_to_L = ParametricLine(C_dot, np.array([C_point[0],0,0])+c*DOWN)
         i_name = TexMobject("i", "= y_C + c").next_to(C_to_L)
-        C_to_F = Line(C_dot.get_center(), F_dot.get_center())
+        C_to_F = ParametricLine(C_dot.get_center(), F_dot.get_center())
         j_name = TexMobject("j", r"= \sqrt{x_C^2 + (y_C - c)^2}").next_to(C_to_F.get_center(), RIGHT+0.5*UP)
 
-        C_circle = Circle(radius=C_point[1] + c, stroke_width=2, stroke_opacity=0.6).move_to(C_point)
+        C_circle = ParametricCircle(arc_center=C_point, radius=C_point[1] + c, stroke_width=2, stroke_opacity=0.6)
 
         equation1 = TexMobject("i = j")
         equation2 = TexMobject("y_C + c"," = ",r"\sqrt{x_C^2 + (y_C - c)^2}")
@@ -222,6 +172,7 @@ class ParabolaExample(Scene):
 
         self.play(ShowCreation(L_line), Write(L_name))
         self.play(Write(directrix_name))
+        mark_static(L_line, L_name)
         self.wait()
         self.play(ShowCreation(F_dot), Write(F_name[0]))
         self.play(Write(focus_name))
@@ -248,8 +199,8 @@ class ParabolaExample(Scene):
         group = VGroup(C_circle,C_to_L,C_to_F,C_dot,E_dot)
         def update_group(group):
             t = dot_guide.get_center()[0]
-            C_circle,C_toL,C_to_F,C_dot,E_dot = group
-            E_dot.move_to(L_line.get_point_from_function(t))
+            C_circle,C_to_L,C_to_F,C_dot,E_dot = group
+            E_dot.set_center(L_line.get_point_from_function(t))
             E_name.next_to(E_dot, DOWN)
 
 #            new_tangent = TangentLine(
@@ -268,23 +219,18 @@ class ParabolaExample(Scene):
 #                    stroke_opacity=0.75)
 #
             new_C_point = P_graph.get_point_from_function(t)
-            new_C_dot = Dot(new_C_point, color=YELLOW)
+            C_dot.set_center(new_C_point)
             C_name.next_to(C_dot, RIGHT+0.5*DOWN)
-            new_C_to_L = Line(new_C_dot, np.array([new_C_point[0],0,0])+c*DOWN)
-            i_name.next_to(new_C_to_L)
-            new_C_to_F = Line(new_C_dot.get_center(), F_dot.get_center())
-            j_name.next_to(new_C_to_F.get_center(), RIGHT+0.5*UP)
-
-            new_C_circle = Circle(radius=new_C_point[1] + c, stroke_width=2, stroke_opacity=0.8).move_to(new_C_point)
-
-            C_dot.become(new_C_dot)
-            C_to_L.become(new_C_to_L)
-            C_to_F.become(new_C_to_F)
-            C_circle.become(new_C_circle)
+            C_to_L.set_start_and_end(C_dot, np.array([new_C_point[0],0,0])+c*DOWN)
+            i_name.next_to(C_to_L)
+            C_to_F.set_start_and_end(new_C_point, F_dot.get_center())
+            j_name.next_to(C_to_F.get_center(), RIGHT+0.5*UP)
+            C_circle.set_center_and_radius(new_C_point, new_C_point[1] + c)
 #            tangent.become(new_tangent)
 #            vertical.become(new_vertical)
             self.bring_to_front(F_dot)
 
+        C_circle.set_stroke(opacity=0.8)
         group.add_updater(update_group)
         self.add(group)
 
@@ -292,7 +238,7 @@ class ParabolaExample(Scene):
         self.play(FadeOut(C_name[0]), FadeOut(E_name), FadeOut(i_name[0]), FadeOut(j_name[0]), FadeOut(equation1), FadeOut(tangent), FadeOut(vertical), FadeOut(E_circle), FadeOut(F_circle))
         self.play(MoveAlongPath(dot_guide,P_graph_left),run_time=2)
         self.wait(1)
-        C_dot_trace = TracedPath(C_dot.get_center, color=YELLOW, stroke_width=2, stroke_opacity=0.6)
+        C_dot_trace = TracedPath(C_dot.get_center, color=YELLOW, stroke_width=2, stroke_opacity=0.6, tolerance=0.005)
         self.add(C_dot_trace)
         self.play(MoveAlongPath(dot_guide,P_graph_right1),run_time=2)
         self.wait(1)
@@ -310,6 +256,7 @@ class ParabolaExample(Scene):
         self.play(ShowCreation(OX))
         self.play(Write(X_name), Write(Y_name))
         self.play(ShowCreation(grid))
+        mark_static(grid, OX, OY)
         self.wait()
 
         for eq in equations:
@@ -424,19 +371,22 @@ class CartesianProductOfSets(Scene):
         suits = ["$\\clubsuit$", "$\\spadesuit$"]
         values = ["2", "3", "4"]
 
-        setA = FiniteNamedSetBag(values, set_draw_dots=False, set_boundary=True, color=BLUE).move_to(4*LEFT+2*DOWN)
+        A = FinSet(values)
+        B = FinSet(suits)
+        AxB = product(A, B, pair=lambda x, y: x + y)
+        pi1, pi2 = AxB.projections
+
+        setA = FiniteNamedSetBag(A, set_draw_dots=False, set_boundary=True, color=BLUE).move_to(4*LEFT+2*DOWN)
         A_name = TexMobject("A", color=BLUE).next_to(setA, 2*UP)
 
-        setB = FiniteNamedSetBag(suits, set_draw_dots=False, set_boundary=True, color=BLUE).move_to(4*RIGHT+2*DOWN)
+        setB = FiniteNamedSetBag(B, set_draw_dots=False, set_boundary=True, color=BLUE).move_to(4*RIGHT+2*DOWN)
         B_name = TexMobject("B", color=BLUE).next_to(setB, 2*UP)
 
-        AxB = [x + y for y in setB.elements for x in setA.elements]
-
-        setC = FiniteNamedSetBag(AxB, set_element_lines=len(setB.elements), set_orientation=1.5*DOWN, set_boundary=True, set_draw_dots=False, color=YELLOW).move_to(2*DOWN)
+        setC = FiniteNamedSetBag(AxB, set_element_lines=len(B), set_orientation=1.5*DOWN, set_boundary=True, set_draw_dots=False, color=YELLOW).move_to(2*DOWN)
         C_name = TexMobject(r"A \times B", color=YELLOW).next_to(setC, 2*UP)
 
-        AxB_to_A = FiniteMapping(setC, setA, lambda s: s[:1], stroke_opacity=0.8)
-        AxB_to_B = FiniteMapping(setC, setB, lambda s: s[1:], stroke_opacity=0.8)
+        AxB_to_A = FiniteMapping(setC, setA, pi1, stroke_opacity=0.8)
+        AxB_to_B = FiniteMapping(setC, setB, pi2, stroke_opacity=0.8)
 
         pi1_name = TexMobject("\pi_1", color=YELLOW).next_to(AxB_to_A, DOWN).shift(0.5*LEFT)
         pi2_name = TexMobject("\pi_2", color=YELLOW).next_to(AxB_to_B, DOWN).shift(0.5*RIGHT)
@@ -0,0 +1,6 @@
+"""
+Rendering helpers shared by the ETCS scene files.
+
+Scene files are loaded by manim straight from their path, so they add
+the etcs/ directory to sys.path before importing anything from here.
+"""
@@ -0,0 +1,174 @@
+"""
+Cached plans for aligning the points of two mobjects before a Transform.
+
+To transform one VMobject into another, manim splits the curves of
+either so that both have the same number of curves in each subpath,
+one partial_bezier_points call per new curve.  Which curve each new
+curve comes from, and which part of it, only depends on how many curves
+the subpaths of the two mobjects have, and each part is a fixed linear
+combination of the four points of its curve.  So once the plan for a
+pair of structures is known, aligning any pair of mobjects with that
+structure is a gather and a batched matrix product:
+
+    install_alignment_cache()
+    precompute_alignment((equation1, equation2), (setA, objA))
+
+precompute_alignment aligns copies of the given pairs, so that the
+plans are ready before the transforms which need them are played.
+Splitting submobjects to match their numbers uses cached split factors
+in the same way.
+"""
+import functools
+
+import numpy as np
+
+from manimlib.mobject.mobject import Mobject
+from manimlib.mobject.types.vectorized_mobject import VMobject
+from manimlib.utils.bezier import partial_bezier_points
+
+
+@functools.lru_cache()
+def get_split_factors(current, target):
+    """
+    Into how many pieces each of `current` things is split to make
+    `target` of them, as Mobject.add_n_more_submobjects and
+    VMobject.insert_n_curves_to_point_list split them.
+    """
+    repeat_indices = (np.arange(target) * current) // target
+    return tuple(np.bincount(repeat_indices, minlength=current))
+
+
+@functools.lru_cache()
+def get_piece_matrices(n_pieces, nppcc):
+    """
+    Matrices taking the points of a bezier curve to the points of each
+    of `n_pieces` equal parts of it, in terms of its parameter.
+    """
+    alphas = np.linspace(0, 1, n_pieces + 1)
+    return np.array([
+        partial_bezier_points(np.identity(nppcc), a1, a2)
+        for a1, a2 in zip(alphas, alphas[1:])
+    ])
+
+
+@functools.lru_cache(maxsize=4096)
+def get_alignment_plan(curve_counts1, curve_counts2, nppcc):
+    """
+    For two paths with the given numbers of curves in their subpaths,
+    the plan for aligning each of them with the other, as in
+    VMobject.align_points: for every curve of the aligned path, the
+    index of the curve it is part of, and the matrix taking the points
+    of that curve to its own.
+    """
+    # A missing subpath is a null curve at the very end of the path
+    end_matrix = np.zeros((nppcc, nppcc))
+    end_matrix[:, -1] = 1
+    plans = []
+    for counts, other_counts in (curve_counts1, curve_counts2), (curve_counts2, curve_counts1):
+        sources = []
+        matrices = []
+        offset = 0
+        for n in range(max(len(counts), len(other_counts))):
+            if n < len(counts):
+                count = counts[n]
+                first, base = offset, None
+                offset += count
+            else:
+                count = 1
+                first, base = sum(counts) - 1, end_matrix
+            other_count = other_counts[n] if n < len(other_counts) else 1
+            split_factors = get_split_factors(count, max(count, other_count))
+            for i, n_pieces in enumerate(split_factors):
+                for matrix in get_piece_matrices(n_pieces, nppcc):
+                    sources.append(first + i)
+                    matrices.append(matrix if base is None else matrix.dot(base))
+        plans.append((np.array(sources, dtype=int), np.array(matrices)))
+    return tuple(plans)
+
+
+def get_subpath_curve_counts(vmobject):
+    """
+    The number of curves in each subpath of `vmobject`, split where
+    VMobject.get_subpaths splits them, or None if its points do not
+    make whole curves.
+    """
+    points = vmobject.points
+    nppcc = vmobject.n_points_per_cubic_curve
+    if len(points) == 0 or len(points) % nppcc != 0:
+        return None
+    # As consider_points_equals, for all ends of curves at once
+    ends = points[nppcc - 1:-1:nppcc]
+    starts = points[nppcc::nppcc]
+    equal = (np.abs(ends - starts) <= vmobject.tolerance_for_point_equality + 1e-5 * np.abs(starts)).all(axis=1)
+    split_curves = np.flatnonzero(~equal) + 1
+    bounds = np.concatenate([[0], split_curves, [len(points) // nppcc]])
+    return tuple(np.diff(bounds).tolist())
+
+
+def apply_alignment_plan(vmobject, plan):
+    sources, matrices = plan
+    nppcc = vmobject.n_points_per_cubic_curve
+    curves = vmobject.points.reshape((-1, nppcc, vmobject.dim))[sources]
+    vmobject.set_points(np.matmul(matrices, curves).reshape((-1, vmobject.dim)))
+
+
+def align_points(self, vmobject):
+    # VMobject.align_points, with the subdivision planned once per
+    # pair of structures
+    self.align_rgbas(vmobject)
+    if self.get_num_points() == vmobject.get_num_points():
+        return
+    for mob in self, vmobject:
+        if mob.has_no_points():
+            mob.start_new_path(mob.get_center())
+        if mob.has_new_path_started():
+            mob.add_line_to(mob.get_last_point())
+    counts1 = get_subpath_curve_counts(self)
+    counts2 = get_subpath_curve_counts(vmobject)
+    if counts1 is None or counts2 is None or \
+            self.n_points_per_cubic_curve != vmobject.n_points_per_cubic_curve:
+        return original_align_points(self, vmobject)
+    plan1, plan2 = get_alignment_plan(counts1, counts2, self.n_points_per_cubic_curve)
+    apply_alignment_plan(self, plan1)
+    apply_alignment_plan(vmobject, plan2)
+    return self
+
+
+def add_n_more_submobjects(self, n):
+    # Mobject.add_n_more_submobjects, with cached split factors
+    if n == 0:
+        return
+    current = len(self.submobjects)
+    if current == 0:
+        self.submobjects = [self.get_point_mobject() for k in range(n)]
+        return
+    new_submobs = []
+    for submob, split_factor in zip(
+        self.submobjects, get_split_factors(current, current + n),
+    ):
+        new_submobs.append(submob)
+        for k in range(1, split_factor):
+            new_submobs.append(submob.copy().fade(1))
+    self.submobjects = new_submobs
+    return self
+
+
+original_align_points = VMobject.align_points
+
+
+def install_alignment_cache():
+    """
+    Makes Transforms align mobjects by cached plans instead of manim's
+    curve by curve subdivision.
+    """
+    VMobject.align_points = align_points
+    Mobject.add_n_more_submobjects = add_n_more_submobjects
+
+
+def precompute_alignment(*pairs):
+    """
+    Computes the alignment plans for transforming the first mobject of
+    each pair into the second, by aligning copies of them.
+    """
+    for source, target in pairs:
+        source.copy().align_data(target.copy())
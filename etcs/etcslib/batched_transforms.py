@@ -0,0 +1,197 @@
+"""
+Interpolating many transforms of one play() together.
+
+Every Transform interpolates the points and colors of each of its
+submobjects in Python on every frame, so a play() with dozens of
+ReplacementTransforms spends its time in the per-submobject overhead
+rather than the arithmetic.  A scene with BatchedTransformSceneMixin
+packs the aligned starting and target values of all the plain
+transforms of a play() into contiguous arrays once, when they begin,
+and makes the points and colors of their submobjects views into one
+more array, which each frame recomputes in a single operation.
+
+Only transforms which interpolate as Transform itself does, along a
+straight path, between vectorized mobjects without updaters, are
+batched; everything else is interpolated as usual.
+"""
+import numpy as np
+
+from manimlib.animation.animation import Animation
+from manimlib.animation.transform import Transform
+from manimlib.mobject.mobject import Mobject
+from manimlib.mobject.types.vectorized_mobject import VMobject
+from manimlib.utils.paths import straight_path
+
+from etcslib.config import subclass_scene
+from etcslib.tracing import span
+
+
+# What VMobject.interpolate interpolates, besides the points
+INTERPOLATED_ATTRIBUTES = [
+    "points",
+    "fill_rgbas",
+    "stroke_rgbas",
+    "background_stroke_rgbas",
+    "stroke_width",
+    "background_stroke_width",
+    "sheen_direction",
+    "sheen_factor",
+]
+
+
+def get_interpolated_values(vmobject):
+    return [np.asarray(getattr(vmobject, attr), dtype=float) for attr in INTERPOLATED_ATTRIBUTES]
+
+
+def can_batch(animation):
+    """
+    Whether interpolating `animation` amounts to interpolating the
+    values of its submobjects in INTERPOLATED_ATTRIBUTES on a straight
+    path, each by its own sub alpha.
+    """
+    cls = type(animation)
+    if not isinstance(animation, Transform) or \
+            cls.interpolate is not Animation.interpolate or \
+            cls.interpolate_mobject is not Animation.interpolate_mobject or \
+            cls.interpolate_submobject is not Transform.interpolate_submobject:
+        return False
+    if animation.path_func is not straight_path or not animation.suspend_mobject_updating:
+        return False
+    # Updaters of the start and target would move them under the batch
+    for mob in (animation.starting_mobject, animation.target_copy):
+        if mob.get_family_updaters():
+            return False
+    for submob, start, target in animation.get_all_families_zipped():
+        for mob in (submob, start, target):
+            if not isinstance(mob, VMobject) or \
+                    type(mob).interpolate is not Mobject.interpolate or \
+                    type(mob).interpolate_color is not VMobject.interpolate_color:
+                return False
+        for start_value, target_value in zip(
+            get_interpolated_values(start), get_interpolated_values(target),
+        ):
+            if start_value.shape != target_value.shape:
+                return False
+    return True
+
+
+class TransformBatch(object):
+    """
+    The transforms of one play() that can be batched, with the values
+    of all their submobjects packed into flat arrays.
+    """
+
+    def __init__(self, animations):
+        self.animations = animations
+        self.alphas = np.zeros(len(animations))
+        starts = []
+        targets = []
+        shapes = []
+        submob_sizes = []
+        # Per submobject, which animation it belongs to and what its
+        # sub alpha is computed from, as in Animation.get_sub_alpha
+        submob_animations = []
+        submob_indices = []
+        submob_lags = []
+        submob_full_lengths = []
+        self.submobjects = []
+        for i, animation in enumerate(animations):
+            families = list(animation.get_all_families_zipped())
+            lag_ratio = animation.lag_ratio
+            full_length = (len(families) - 1) * lag_ratio + 1
+            for index, (submob, start, target) in enumerate(families):
+                self.submobjects.append(submob)
+                start_values = get_interpolated_values(start)
+                starts.extend(value.ravel() for value in start_values)
+                targets.extend(value.ravel() for value in get_interpolated_values(target))
+                shapes.append([value.shape for value in start_values])
+                submob_sizes.append(sum(value.size for value in start_values))
+                submob_animations.append(i)
+                submob_indices.append(index)
+                submob_lags.append(lag_ratio)
+                submob_full_lengths.append(full_length)
+        self.starts = np.concatenate(starts)
+        self.targets = np.concatenate(targets)
+        self.values = self.starts.copy()
+        self.value_submobjects = np.repeat(np.arange(len(submob_sizes)), submob_sizes)
+        self.submob_animations = np.array(submob_animations, dtype=int)
+        self.submob_lowers = np.array(submob_indices) * np.array(submob_lags)
+        self.submob_full_lengths = np.array(submob_full_lengths)
+        self.views = self.get_views(shapes)
+
+    def get_views(self, shapes):
+        views = []
+        offset = 0
+        for submob_shapes in shapes:
+            submob_views = []
+            for shape in submob_shapes:
+                size = int(np.prod(shape))
+                submob_views.append(self.values[offset:offset + size].reshape(shape))
+                offset += size
+            views.append(submob_views)
+        return views
+
+    def attach(self):
+        # The submobjects draw straight from the values from now on,
+        # until their animations finish and set values of their own
+        for submob, submob_views in zip(self.submobjects, self.views):
+            for attr, view in zip(INTERPOLATED_ATTRIBUTES, submob_views):
+                setattr(submob, attr, view)
+
+    def set_alpha(self, i, alpha):
+        animation = self.animations[i]
+        self.alphas[i] = animation.rate_func(np.clip(alpha, 0, 1))
+
+    def interpolate(self):
+        with span("TransformBatch.interpolate", animations=len(self.animations)):
+            sub_alphas = np.clip(
+                self.alphas[self.submob_animations] * self.submob_full_lengths - self.submob_lowers,
+                0, 1,
+            )
+            alphas = sub_alphas[self.value_submobjects]
+            # As manimlib.utils.bezier.interpolate, so that the values
+            # are the same as those of the transforms themselves
+            np.multiply(1 - alphas, self.starts, out=self.values)
+            self.values += alphas * self.targets
+
+
+class BatchedTransformSceneMixin(object):
+    CONFIG = {
+        # Fewer transforms than this are interpolated one by one
+        "min_batched_transforms": 2,
+    }
+
+    def begin_animations(self, animations):
+        super().begin_animations(animations)
+        self.transform_batch = None
+        batched = [animation for animation in animations if can_batch(animation)]
+        if len(batched) < self.min_batched_transforms:
+            return
+        batch = TransformBatch(batched)
+        batch.attach()
+        for i, animation in enumerate(batched):
+            # Scene.progress_through_animations still calls interpolate
+            # on each animation, which now only records its alpha
+            animation.interpolate = (lambda alpha, i=i: batch.set_alpha(i, alpha))
+        self.transform_batch = batch
+
+    def update_mobjects(self, dt):
+        # Called on every frame right after the animations interpolate
+        if getattr(self, "transform_batch", None) is not None:
+            self.transform_batch.interpolate()
+        super().update_mobjects(dt)
+
+    def finish_animations(self, animations):
+        if getattr(self, "transform_batch", None) is not None:
+            for animation in self.transform_batch.animations:
+                del animation.interpolate
+            self.transform_batch = None
+        super().finish_animations(animations)
+
+
+def with_batched_transforms(scene_class):
+    """
+    scene_class interpolating the transforms of each play() as one
+    batch.
+    """
+    return subclass_scene(scene_class, BatchedTransformSceneMixin)
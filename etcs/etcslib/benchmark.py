@@ -0,0 +1,373 @@
+"""
+Render benchmarks of a fixed set of scenes, for telling whether a
+change to a scene, to etcslib or to manim made rendering slower.
+
+    cd etcs
+    python -m etcslib.benchmark [--qualities low medium] [--repeat 3]
+        [--output benchmark.json] [--baseline baseline.json] [--threshold 0.1]
+
+Every scene is rendered headless into a temporary media directory, in a
+process of its own, with a cold TeX cache.  For each scene and quality
+the wall time is split into the time spent compiling TeX, drawing
+frames, encoding them with ffmpeg, and everything else (construct),
+next to the peak memory and the frames per second of rendering, that
+is over the rasterize and encode phases only.
+
+The results are written as JSON.  Given a baseline, which is simply the
+JSON of an earlier run, times or memory that grew by more than the
+threshold are reported as regressions and the exit status is 1.
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import manimlib.config
+import manimlib.constants as consts
+import manimlib.mobject.svg.tex_mobject as tex_mobject
+from manimlib.scene.scene import Scene
+from manimlib.scene.scene_file_writer import SceneFileWriter
+
+from etcslib.alignment import install_alignment_cache
+from etcslib.tex import install_tex_cache
+from etcslib.tex import placeholder_tex
+
+BENCHMARK_VERSION = 1
+
+ETCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENES = [
+    ("set_arrow_test.py", "FourSetsExample"),
+    ("set_arrow_test.py", "SetArrowExample"),
+    ("05-algebraization-of-geometry.py", "ParabolaExample"),
+    ("05-algebraization-of-geometry.py", "CartesianProductOfSets"),
+    ("05-algebraization-of-geometry.py", "AxiomOfOrderedPairs"),
+]
+
+QUALITIES = {
+    "low": consts.LOW_QUALITY_CAMERA_CONFIG,
+    "medium": consts.MEDIUM_QUALITY_CAMERA_CONFIG,
+    "high": consts.HIGH_QUALITY_CAMERA_CONFIG,
+    "production": consts.PRODUCTION_QUALITY_CAMERA_CONFIG,
+}
+
+PHASES = ["construct", "tex", "rasterize", "encode"]
+
+# What each phase other than construct is timed by
+TIMED_FUNCTIONS = [
+    (tex_mobject, "tex_to_svg_file", "tex"),
+    (Scene, "update_frame", "rasterize"),
+    (SceneFileWriter, "open_movie_pipe", "encode"),
+    (SceneFileWriter, "write_frame", "encode"),
+    (SceneFileWriter, "close_movie_pipe", "encode"),
+    (SceneFileWriter, "combine_movie_files", "encode"),
+]
+
+# Phases shorter than this in the baseline are too noisy to compare
+MIN_COMPARED_SECONDS = 0.5
+
+
+class PhaseTimer(object):
+    """
+    Adds up the time spent in each of TIMED_FUNCTIONS while patched.
+    Time in a timed function called from another one counts for the
+    outer one only.
+    """
+
+    def __init__(self):
+        self.seconds = dict([(phase, 0.0) for phase in PHASES[1:]])
+        self.n_frames = 0
+        self.active_phase = None
+
+    def wrap(self, function, phase):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if self.active_phase is not None:
+                return function(*args, **kwargs)
+            self.active_phase = phase
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.seconds[phase] += time.perf_counter() - start
+                self.active_phase = None
+        return wrapper
+
+    def count_frame(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            self.n_frames += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    @contextlib.contextmanager
+    def patched(self):
+        originals = [
+            (owner, name, getattr(owner, name))
+            for owner, name, phase in TIMED_FUNCTIONS
+        ]
+        for owner, name, phase in TIMED_FUNCTIONS:
+            setattr(owner, name, self.wrap(getattr(owner, name), phase))
+        SceneFileWriter.write_frame = self.count_frame(SceneFileWriter.write_frame)
+        try:
+            yield self
+        finally:
+            for owner, name, function in originals:
+                setattr(owner, name, function)
+
+
+def get_peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # In bytes there, in kilobytes on Linux
+        return peak / 1024**2
+    return peak / 1024
+
+
+def run_benchmark(file_name, scene_name, quality, use_placeholder_tex=False):
+    """
+    Renders one scene, which should happen in a fresh process for the
+    peak memory to mean anything, and returns its measurements.
+    """
+    camera_config = dict(QUALITIES[quality])
+    file_path = os.path.join(ETCS_DIR, file_name)
+    result = {
+        "scene": scene_name,
+        "file": file_name,
+        "quality": quality,
+        "resolution": "{}x{}".format(
+            camera_config["pixel_width"], camera_config["pixel_height"],
+        ),
+        "frame_rate": camera_config["frame_rate"],
+    }
+    log = io.StringIO()
+    with tempfile.TemporaryDirectory() as media_dir, \
+            contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log):
+        consts.initialize_directories({
+            "media_dir": media_dir,
+            "video_dir": None,
+            "video_output_dir": None,
+            "tex_dir": None,
+        })
+        install_tex_cache()
+        install_alignment_cache()
+        scene_class = getattr(manimlib.config.get_module(file_path), scene_name)
+        timer = PhaseTimer()
+        tex = placeholder_tex() if use_placeholder_tex else contextlib.nullcontext()
+        start = time.perf_counter()
+        try:
+            with tex, timer.patched():
+                scene_class(
+                    camera_config=camera_config,
+                    file_writer_config={
+                        "write_to_movie": True,
+                        "save_last_frame": False,
+                        "file_name": scene_name,
+                        "input_file_path": file_path,
+                    },
+                )
+        except Exception as err:
+            traceback.print_exc()
+            result["error"] = "{}: {}".format(type(err).__name__, err)
+            return result
+        wall_time = time.perf_counter() - start
+
+    phases = dict(timer.seconds)
+    phases["construct"] = wall_time - sum(phases.values())
+    render_time = phases["rasterize"] + phases["encode"]
+    result.update({
+        "wall_time": wall_time,
+        "phases": dict([(phase, phases[phase]) for phase in PHASES]),
+        "peak_rss_mb": get_peak_rss_mb(),
+        "frames": timer.n_frames,
+        "fps": timer.n_frames / render_time if render_time else 0.0,
+    })
+    return result
+
+
+def run_in_fresh_process(*args):
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run_benchmark, *args).result()
+
+
+def get_median_result(results):
+    """
+    The measurements of several runs of one benchmark, each the median
+    over the runs.
+    """
+    failed = [result for result in results if "error" in result]
+    if failed:
+        return failed[0]
+    median = dict(results[0])
+    for key in ["wall_time", "peak_rss_mb", "frames", "fps"]:
+        median[key] = statistics.median(result[key] for result in results)
+    median["phases"] = dict([
+        (phase, statistics.median(result["phases"][phase] for result in results))
+        for phase in PHASES
+    ])
+    median["runs"] = len(results)
+    return median
+
+
+def get_key(result):
+    return (result["scene"], result["quality"])
+
+
+def find_regressions(results, baseline, threshold):
+    """
+    Descriptions of every time or peak memory in `results` which is more
+    than `threshold` (a fraction) above the one in `baseline`.
+    """
+    old_results = dict([
+        (get_key(result), result)
+        for result in baseline["results"]
+        if "error" not in result
+    ])
+    regressions = []
+
+    def compare(result, name, new, old, unit, min_old=0):
+        if old < min_old or new <= old * (1 + threshold):
+            return
+        regressions.append("{} ({}) {}: {:.2f}{} -> {:.2f}{} (+{:.0%})".format(
+            result["scene"], result["quality"], name,
+            old, unit, new, unit, new / old - 1,
+        ))
+
+    for result in results:
+        old = old_results.get(get_key(result))
+        if old is None or "error" in result:
+            continue
+        compare(result, "wall time", result["wall_time"], old["wall_time"], "s")
+        for phase in PHASES:
+            compare(
+                result, phase, result["phases"][phase], old["phases"][phase], "s",
+                min_old=MIN_COMPARED_SECONDS,
+            )
+        compare(result, "peak RSS", result["peak_rss_mb"], old["peak_rss_mb"], "MB")
+    return regressions
+
+
+def print_results(results):
+    width = max(len(result["scene"]) for result in results)
+    print("{}  {:<10}{:>9}{}{:>10}{:>8}".format(
+        "scene".ljust(width), "quality", "wall",
+        "".join("{:>11}".format(phase) for phase in PHASES),
+        "peak RSS", "fps",
+    ))
+    for result in results:
+        line = "{}  {:<10}".format(result["scene"].ljust(width), result["quality"])
+        if "error" in result:
+            print(line + "FAILED: " + result["error"])
+            continue
+        print(line + "{:>8.1f}s{}{:>8.0f}MB{:>8.1f}".format(
+            result["wall_time"],
+            "".join("{:>10.1f}s".format(result["phases"][phase]) for phase in PHASES),
+            result["peak_rss_mb"],
+            result["fps"],
+        ))
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Render benchmarks of the ETCS scenes"
+    )
+    parser.add_argument(
+        "--scenes", nargs="+", default=None,
+        metavar="SCENE",
+        help="Only benchmark these scenes (default: {})".format(
+            ", ".join(name for file_name, name in SCENES)
+        ),
+    )
+    parser.add_argument(
+        "--qualities", nargs="+", default=["low", "medium"],
+        choices=list(QUALITIES),
+        help="Quality presets to render each scene at (default: low medium)",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1,
+        help="Render each scene this many times and take the medians",
+    )
+    parser.add_argument(
+        "--placeholder_tex", action="store_true",
+        help="Build TeX labels from placeholders instead of running LaTeX",
+    )
+    parser.add_argument(
+        "--output", default="benchmark.json",
+        help="JSON file to write the results to (default: benchmark.json)",
+    )
+    parser.add_argument(
+        "--baseline", default=None,
+        help="JSON results of an earlier run to compare with",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="Fraction by which a time may grow before it is a regression "
+             "(default: 0.1)",
+    )
+    return parser
+
+
+def main():
+    args = get_parser().parse_args()
+    scenes = SCENES
+    if args.scenes is not None:
+        unknown = set(args.scenes) - set(name for file_name, name in SCENES)
+        if unknown:
+            sys.exit("Unknown scenes: {}".format(", ".join(sorted(unknown))))
+        scenes = [scene for scene in SCENES if scene[1] in args.scenes]
+
+    results = []
+    for file_name, scene_name in scenes:
+        for quality in args.qualities:
+            runs = [
+                run_in_fresh_process(
+                    file_name, scene_name, quality, args.placeholder_tex,
+                )
+                for i in range(args.repeat)
+            ]
+            results.append(get_median_result(runs))
+            print("{} ({}) {}".format(
+                scene_name, quality,
+                "failed" if "error" in results[-1] else "done",
+            ))
+    print()
+    print_results(results)
+
+    with open(args.output, "w") as output:
+        json.dump({
+            "version": BENCHMARK_VERSION,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "placeholder_tex": args.placeholder_tex,
+            "results": results,
+        }, output, indent=2)
+    print("\nResults written to {}".format(args.output))
+
+    failed = any("error" in result for result in results)
+    if args.baseline is None:
+        sys.exit(1 if failed else 0)
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = find_regressions(results, baseline, args.threshold)
+    if not regressions:
+        print("No regressions against {}".format(args.baseline))
+    else:
+        print("\nRegressions against {}:".format(args.baseline))
+        for regression in regressions:
+            print("  " + regression)
+    sys.exit(1 if failed or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,523 @@
+"""
+Checkpoints of the state of a scene before each of its animations, so
+that rendering from the middle of a scene does not replay construct()
+from its start.
+
+A scene with CheckpointSceneMixin which runs its construct() pickles,
+right before each play() and wait(), the mobjects of the scene, the
+attributes construct() gave it, the random state and the arguments of
+the call, and at the end the state construct() leaves the scene in.
+Functions which pickle cannot find by name, such as lambdas and
+updaters defined in construct(), are pickled by value.
+
+Each checkpoint is enough to render its animation on its own, so once a
+scene has gone through its whole construct() with checkpoints, later
+renders which start in the middle load them instead:
+
+* -n <n>[,<m>] renders animations n to m from their checkpoints;
+* -s takes the last frame from the state at the end;
+* seek_time renders just the frame at that time of the movie, stepping
+  through the animation it falls in without drawing, and saves it as -s
+  would.
+
+Checkpoints are kept in <media_dir>/checkpoints/<module>/<scene>/<key>,
+where the key hashes the code of the scene and the definitions of its
+file it uses, the sources of etcslib and manimlib, the TeX template and
+the camera settings, so that any change to them makes the scene record
+anew.  The svg and image files the scene reads while recording, other
+than TeX's, are listed with their hashes in its index, and checkpoints
+whose files changed since are recorded anew as well.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import marshal
+import os
+import pickle
+import random
+import shutil
+import sys
+import types
+
+import numpy as np
+
+import manimlib
+import manimlib.constants as consts
+import manimlib.mobject.types.image_mobject as image_mobject
+from manimlib.mobject.svg.svg_mobject import SVGMobject
+from manimlib.scene.scene import EndSceneEarlyException
+
+from etcslib.config import subclass_scene
+from etcslib.scene_digests import get_scene_digests
+
+CHECKPOINT_VERSION = 2
+
+# Module globals of scene files, which manim loads without putting them
+# in sys.modules, by module name
+scene_globals = {}
+
+
+def register_scene_globals(scene_class):
+    for cls in scene_class.__mro__:
+        for value in vars(cls).values():
+            if isinstance(value, types.FunctionType) and value.__module__ not in sys.modules:
+                scene_globals[value.__module__] = value.__globals__
+
+
+def get_module_globals(module_name):
+    if module_name in sys.modules:
+        return vars(sys.modules[module_name])
+    if module_name in scene_globals:
+        return scene_globals[module_name]
+    raise Exception("Module {} of a checkpoint is not loaded".format(module_name))
+
+
+def find_global(module_name, qualname):
+    if module_name is None or "<locals>" in qualname:
+        return None
+    try:
+        namespace = get_module_globals(module_name)
+    except Exception:
+        return None
+    first, *rest = qualname.split(".")
+    obj = namespace.get(first)
+    for name in rest:
+        obj = getattr(obj, name, None)
+    return obj
+
+
+def get_global(module_name, qualname):
+    obj = find_global(module_name, qualname)
+    if obj is None:
+        raise Exception("{}.{} of a checkpoint no longer exists".format(module_name, qualname))
+    return obj
+
+
+def make_function(code, module_name, name, qualname, n_cells):
+    globals_dict = get_module_globals(module_name) if module_name is not None else {}
+    closure = tuple(types.CellType() for i in range(n_cells)) or None
+    function = types.FunctionType(marshal.loads(code), globals_dict, name, None, closure)
+    function.__qualname__ = qualname
+    return function
+
+
+def set_function_state(function, state):
+    # Set after the function exists, since its closure may refer to it
+    defaults, kwdefaults, attributes, cells = state
+    function.__defaults__ = defaults
+    function.__kwdefaults__ = kwdefaults
+    function.__dict__.update(attributes)
+    for cell, (is_set, value) in zip(function.__closure__ or (), cells):
+        if is_set:
+            cell.cell_contents = value
+
+
+def reduce_function(function):
+    cells = []
+    for cell in function.__closure__ or ():
+        try:
+            cells.append((True, cell.cell_contents))
+        except ValueError:
+            cells.append((False, None))
+    return (
+        make_function,
+        (
+            marshal.dumps(function.__code__),
+            function.__module__,
+            function.__name__,
+            function.__qualname__,
+            len(cells),
+        ),
+        (function.__defaults__, function.__kwdefaults__, function.__dict__, cells),
+        None,
+        None,
+        set_function_state,
+    )
+
+
+class CheckpointPickler(pickle.Pickler):
+    """
+    Pickles functions and classes of scene files by name, other
+    functions which cannot be found by name by value, and the objects
+    in `persistent` as references to their key.
+    """
+
+    def __init__(self, file, persistent):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.persistent_ids = dict([
+            (id(obj), key) for key, obj in persistent.items()
+        ])
+
+    def persistent_id(self, obj):
+        return self.persistent_ids.get(id(obj))
+
+    def reducer_override(self, obj):
+        if not isinstance(obj, (type, types.FunctionType)):
+            return NotImplemented
+        module_name = getattr(obj, "__module__", None)
+        if find_global(module_name, obj.__qualname__) is obj:
+            if module_name in sys.modules:
+                return NotImplemented
+            return get_global, (module_name, obj.__qualname__)
+        if isinstance(obj, types.FunctionType):
+            return reduce_function(obj)
+        return NotImplemented
+
+
+class CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, persistent):
+        super().__init__(file)
+        self.persistent = persistent
+
+    def persistent_load(self, key):
+        return self.persistent[key]
+
+
+def get_source_digest(directory):
+    """
+    Hash of the Python sources under `directory`.
+    """
+    hasher = hashlib.sha1()
+    for root, dirs, files in sorted(os.walk(directory)):
+        dirs.sort()
+        for file_name in sorted(files):
+            if file_name.endswith(".py"):
+                path = os.path.join(root, file_name)
+                hasher.update(os.path.relpath(path, directory).encode())
+                with open(path, "rb") as source_file:
+                    hasher.update(source_file.read())
+    return hasher.digest()
+
+
+# Hashes of manimlib's sources, which a process does not reload, by
+# directory
+manimlib_digests = {}
+
+
+def get_manimlib_digest():
+    directory = os.path.dirname(os.path.abspath(manimlib.__file__))
+    if directory not in manimlib_digests:
+        manimlib_digests[directory] = get_source_digest(directory)
+    return manimlib_digests[directory]
+
+
+def get_file_digest(path):
+    try:
+        with open(path, "rb") as input_file:
+            return hashlib.sha1(input_file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+# Paths of the files read by SVGMobjects and ImageMobjects since the last
+# scene with checkpoints was set up, or None before any was
+input_files = None
+original_svg_ensure_valid_file = SVGMobject.ensure_valid_file
+original_get_full_raster_image_path = image_mobject.get_full_raster_image_path
+
+
+def recording_svg_ensure_valid_file(self):
+    original_svg_ensure_valid_file(self)
+    if input_files is not None:
+        input_files.add(os.path.abspath(self.file_path))
+
+
+def recording_get_full_raster_image_path(image_file_name):
+    path = original_get_full_raster_image_path(image_file_name)
+    if input_files is not None:
+        input_files.add(os.path.abspath(path))
+    return path
+
+
+def install_input_recording():
+    """
+    Makes SVGMobject and ImageMobject note the files they read while a
+    scene records checkpoints.
+    """
+    SVGMobject.ensure_valid_file = recording_svg_ensure_valid_file
+    image_mobject.get_full_raster_image_path = recording_get_full_raster_image_path
+
+
+def get_input_digests(paths):
+    """
+    Hashes of the files at `paths`, leaving out TeX's svg files, which
+    the scene's code and the TeX template already cover.
+    """
+    tex_dir = os.path.abspath(consts.TEX_DIR) + os.sep
+    return dict([
+        (path, get_file_digest(path))
+        for path in sorted(paths)
+        if not path.startswith(tex_dir)
+    ])
+
+
+def get_checkpoint_key(scene):
+    """
+    Hash of everything the checkpoints of `scene` were made from.
+    """
+    scene_name = type(scene).__name__
+    with open(scene.file_writer.input_file_path) as scene_file:
+        source = scene_file.read()
+    hasher = hashlib.sha1()
+    hasher.update(str(CHECKPOINT_VERSION).encode())
+    # Code is pickled as marshal data, which depends on the version
+    hasher.update(sys.version.encode())
+    hasher.update(get_scene_digests(source, [scene_name])[scene_name])
+    library_files = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py")))
+    for file_name in library_files:
+        with open(file_name, "rb") as library_file:
+            hasher.update(library_file.read())
+    # Checkpoints pickle manim's objects by their classes' layout
+    hasher.update(get_manimlib_digest())
+    hasher.update(consts.TEMPLATE_TEX_FILE_BODY.encode())
+    # The settings rather than the camera, whose class other mixins change
+    hasher.update(repr(sorted(scene.camera_config.items())).encode())
+    return hasher.hexdigest()
+
+
+class CheckpointSceneMixin(object):
+    CONFIG = {
+        # A time in seconds of the movie, to save only the frame at that
+        # time instead of rendering
+        "seek_time": None,
+    }
+
+    def setup(self):
+        global input_files
+        # From the start, since setup() may read files as construct() does
+        install_input_recording()
+        input_files = set()
+        super().setup()
+        register_scene_globals(type(self))
+        self.checkpoint_directory = os.path.join(
+            consts.MEDIA_DIR,
+            "checkpoints",
+            self.file_writer.get_default_module_directory(),
+            type(self).__name__,
+        )
+        self.checkpoint_key = get_checkpoint_key(self)
+        self.recording_checkpoints = False
+        # Frames written by each animation, unless it was skipped
+        self.animation_frames = {}
+        self.input_files = input_files
+        self.seek_frame = None
+        self.seek_frames_added = 0
+        # Anything set later is construct()'s, and goes into checkpoints
+        self.setup_attributes = set(vars(self)) | {"setup_attributes"}
+
+    def get_checkpoint_path(self, name):
+        return os.path.join(
+            self.checkpoint_directory, self.checkpoint_key,
+            "{}.pkl.gz".format(name if name == "end" else "{:05}".format(name)),
+        )
+
+    def get_persistent_objects(self):
+        persistent = {
+            "scene": self,
+            "camera": self.camera,
+            "file_writer": self.file_writer,
+        }
+        if hasattr(self.camera, "frame"):
+            persistent["camera_frame"] = self.camera.frame
+        return persistent
+
+    def save_checkpoint(self, name, call=None):
+        state = {
+            "call": call,
+            "attributes": dict([
+                (key, value)
+                for key, value in vars(self).items()
+                if key not in self.setup_attributes
+            ]),
+            "mobjects": self.mobjects,
+            "foreground_mobjects": self.foreground_mobjects,
+            "time": self.time,
+            "random_state": (random.getstate(), np.random.get_state()),
+            "camera_frame": vars(self.camera.frame) if hasattr(self.camera, "frame") else None,
+        }
+        path = self.get_checkpoint_path(name)
+        temp_file = "{}.{}.tmp".format(path, os.getpid())
+        try:
+            with gzip.open(temp_file, "wb", compresslevel=1) as checkpoint_file:
+                CheckpointPickler(checkpoint_file, self.get_persistent_objects()).dump(state)
+        except Exception as err:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            print("Not saving checkpoints of {}: {}: {}".format(self, type(err).__name__, err))
+            self.recording_checkpoints = False
+            return
+        os.replace(temp_file, path)
+
+    def load_checkpoint(self, name):
+        """
+        Puts the scene into the state of a checkpoint, and returns the
+        call it was taken before.
+        """
+        with gzip.open(self.get_checkpoint_path(name), "rb") as checkpoint_file:
+            state = CheckpointUnpickler(checkpoint_file, self.get_persistent_objects()).load()
+        self.__dict__.update(state["attributes"])
+        self.mobjects = state["mobjects"]
+        self.foreground_mobjects = state["foreground_mobjects"]
+        self.time = state["time"]
+        random.setstate(state["random_state"][0])
+        np.random.set_state(state["random_state"][1])
+        if state["camera_frame"] is not None:
+            self.camera.frame.__dict__.update(state["camera_frame"])
+        return state["call"]
+
+    def get_checkpoint_index(self):
+        try:
+            with open(os.path.join(self.checkpoint_directory, self.checkpoint_key, "index.json")) as index_file:
+                return json.load(index_file)
+        except FileNotFoundError:
+            return None
+
+    def write_checkpoint_index(self):
+        n_plays = self.num_plays
+        old_index = self.get_checkpoint_index() or {"frames": []}
+        old_frames = old_index["frames"] + [None] * n_plays
+        index = {
+            "plays": n_plays,
+            "inputs": get_input_digests(self.input_files),
+            "frames": [
+                self.animation_frames.get(i, old_frames[i])
+                for i in range(n_plays)
+            ],
+        }
+        path = os.path.join(self.checkpoint_directory, self.checkpoint_key, "index.json")
+        with open(path + ".tmp", "w") as index_file:
+            json.dump(index, index_file)
+        os.replace(path + ".tmp", path)
+
+    def start_recording(self):
+        # Checkpoints made from other code or settings are of no more use
+        if os.path.isdir(self.checkpoint_directory):
+            for key in os.listdir(self.checkpoint_directory):
+                if key != self.checkpoint_key:
+                    shutil.rmtree(os.path.join(self.checkpoint_directory, key), ignore_errors=True)
+        os.makedirs(os.path.join(self.checkpoint_directory, self.checkpoint_key), exist_ok=True)
+        self.recording_checkpoints = True
+
+    def get_replay_plan(self):
+        """
+        The animations to render from their checkpoints and the
+        checkpoint to end with, or None if construct() has to run.
+        """
+        index = self.get_checkpoint_index()
+        if index is None:
+            return None
+        for path, digest in index["inputs"].items():
+            if get_file_digest(path) != digest:
+                return None
+        n_plays = index["plays"]
+        if self.seek_time is not None:
+            animation, frame = self.find_frame(index["frames"])
+            self.seek_frame = frame
+            plan = ([animation], None)
+        elif self.start_at_animation_number is not None or self.skip_animations:
+            # -n, or -s, which skips every animation
+            if self.start_at_animation_number is not None:
+                start = min(self.start_at_animation_number, n_plays)
+            else:
+                start = n_plays
+            end = self.end_at_animation_number
+            if end is not None and end < n_plays:
+                plan = (list(range(start, end)), end)
+            else:
+                plan = (list(range(start, n_plays)), "end")
+        else:
+            # A whole render records the checkpoints anew
+            return None
+        animations, final = plan
+        names = animations + ([final] if final is not None else [])
+        if not all(os.path.exists(self.get_checkpoint_path(name)) for name in names):
+            return None
+        return plan
+
+    def find_frame(self, animation_frames):
+        """
+        The animation and its frame which are shown at seek_time.
+        """
+        target = int(self.seek_time * self.camera.frame_rate + 1e-6)
+        first_frame = 0
+        for animation, n_frames in enumerate(animation_frames):
+            if n_frames is None:
+                raise Exception(
+                    "Animation {} of {} was skipped when its checkpoints were saved, "
+                    "render it in full once to seek in it".format(animation, self)
+                )
+            if target < first_frame + n_frames:
+                return animation, target - first_frame
+            first_frame += n_frames
+        raise Exception("{} is only {:.2f}s long".format(self, first_frame / self.camera.frame_rate))
+
+    def construct(self):
+        plan = self.get_replay_plan()
+        if plan is None:
+            if self.seek_time is not None:
+                raise Exception(
+                    "{} has no checkpoints to seek in, render it once with them".format(self)
+                )
+            self.start_recording()
+            super().construct()
+            if self.recording_checkpoints:
+                self.save_checkpoint("end")
+                self.write_checkpoint_index()
+            return
+        animations, final = plan
+        for animation in animations:
+            method, args, kwargs = self.load_checkpoint(animation)
+            self.num_plays = animation
+            getattr(super(), method)(*args, **kwargs)
+        if final == "end":
+            self.load_checkpoint("end")
+            self.num_plays = self.get_checkpoint_index()["plays"]
+        elif final is not None:
+            self.load_checkpoint(final)
+            self.num_plays = final
+
+    def play(self, *args, **kwargs):
+        return self.run_checkpointed("play", *args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        return self.run_checkpointed("wait", *args, **kwargs)
+
+    def run_checkpointed(self, method, *args, **kwargs):
+        animation = self.num_plays
+        if self.recording_checkpoints:
+            self.save_checkpoint(animation, (method, args, kwargs))
+        result = getattr(super(), method)(*args, **kwargs)
+        if not self.skip_animations:
+            self.animation_frames.setdefault(animation, 0)
+        return result
+
+    def update_frame(self, *args, **kwargs):
+        # Nothing is drawn on the way to the frame sought
+        if self.seek_frame is not None:
+            return
+        return super().update_frame(*args, **kwargs)
+
+    def add_frames(self, *frames):
+        if self.seek_frame is not None:
+            self.seek_frames_added += len(frames)
+            if self.seek_frames_added > self.seek_frame:
+                # The file writer saves this state as the last frame
+                self.seek_frame = None
+                self.time = self.seek_time
+                raise EndSceneEarlyException()
+            self.increment_time(len(frames) / self.camera.frame_rate)
+            return
+        if not self.skip_animations:
+            animation = self.num_plays
+            self.animation_frames[animation] = self.animation_frames.get(animation, 0) + len(frames)
+        return super().add_frames(*frames)
+
+
+def with_checkpoints(scene_class, seek_time=None):
+    """
+    scene_class saving checkpoints before its animations and rendering
+    from them where it can.  With a seek_time, it only saves the frame
+    at that time of the movie.
+    """
+    return subclass_scene(scene_class, CheckpointSceneMixin, seek_time=seek_time)
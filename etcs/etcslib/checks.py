@@ -0,0 +1,289 @@
+"""
+Checks that the options of etcslib.render draw what manim would.
+
+    cd etcs
+    python -m etcslib.checks
+    python -m etcslib.checks spotlight_frames -m
+    python -m etcslib.checks tiled_pixels --high_quality
+
+Each check renders small scenes headless, with TeX labels built from
+placeholders, and prints what it found wrong.  The exit status is 1 if
+any check failed.
+"""
+import argparse
+import sys
+import tempfile
+
+import manimlib.constants as consts
+from manimlib.imports import *
+
+from etcslib.dots import DotSpriteCamera
+from etcslib.finite import FiniteMapping
+from etcslib.finite import FiniteNamedSetBag
+from etcslib.repeated_frames import RepeatedFrameFileWriter
+from etcslib.repeated_frames import get_frame_runs
+from etcslib.repeated_frames import with_repeated_frames
+from etcslib.spotlight import GroupOpacityCamera
+from etcslib.spotlight import get_ancestors
+from etcslib.spotlight import get_product_opacity
+from etcslib.spotlight import spotlight
+from etcslib.tex import placeholder_tex
+from etcslib.tiles import with_tiled_rasterization
+
+
+class FrameRecorder(RepeatedFrameFileWriter):
+    """
+    Keeps every frame handed to it, rather than writing it.
+    """
+
+    def __init__(self, scene, **kwargs):
+        self.frames = []
+        super().__init__(scene, **kwargs)
+
+    def write_frame(self, frame, n_times=1):
+        self.frames += [frame] * n_times
+
+
+class SpotlightFrames(Scene):
+    CONFIG = {
+        "camera_class": GroupOpacityCamera,
+    }
+
+    def setup(self):
+        self.file_writer = FrameRecorder(self, **self.file_writer_config)
+        super().setup()
+
+    def construct(self):
+        # Group opacities only change on groups without points of their
+        # own, as for the labels and arrows of FourSetsExample
+        labels = VGroup(TexMobject("A"), TexMobject("B").shift(RIGHT))
+        shapes = VGroup(VGroup(Circle()), Square().shift(2*RIGHT))
+        self.add(labels, shapes)
+        self.wait()
+        self.file_writer.frames = []
+        self.play(*spotlight([labels, shapes], [shapes[0]]))
+        self.n_frames = int(np.ceil(self.camera.frame_rate))
+
+
+def check_spotlight_frames(scene_kwargs):
+    """
+    A play() of nothing but spotlight animations changes every frame,
+    so --repeat_frames must draw each of them.
+    """
+    scene = with_repeated_frames(SpotlightFrames)(**scene_kwargs)
+    frames = scene.file_writer.frames
+    if len(frames) != scene.n_frames:
+        return ["{} frames written instead of {}".format(len(frames), scene.n_frames)]
+    # A frame which was not drawn again is handed on as the same array
+    runs = get_frame_runs(frames)
+    if len(runs) != len(frames):
+        return ["only {} of {} frames were drawn, the others repeated".format(
+            len(runs), len(frames),
+        )]
+    return []
+
+
+def check_spotlight_opacity(scene_kwargs, n_steps=20):
+    """
+    Every mobject is drawn with an opacity changing in one direction
+    through a spotlight() moving from one lit set to another, as through
+    one undoing it.
+    """
+    square = Square(fill_opacity=0.5)
+    inner = VGroup(square, Circle())
+    groups = [VGroup(inner, Dot()), VGroup(Dot())]
+    family = [mob for group in groups for mob in group.get_family()]
+    ancestors = get_ancestors(groups, family)
+    problems = []
+    for lit, opacity in [([square], 0.2), ([inner[1], groups[0][1]], 0.2),
+                         ([inner, square], 0.2), ([], 1)]:
+        animations = spotlight(groups, lit, opacity, rate_func=linear)
+        for animation in animations:
+            animation.begin()
+        drawn = []
+        for alpha in np.linspace(0, 1, n_steps + 1):
+            for animation in animations:
+                animation.interpolate(alpha)
+            drawn.append([
+                get_product_opacity(ancestors[mob] + [mob]) for mob in family
+            ])
+        for animation in animations:
+            animation.finish()
+        steps = np.diff(drawn, axis=0)
+        for i, mob in enumerate(family):
+            if (steps[:, i] > 1e-9).any() and (steps[:, i] < -1e-9).any():
+                problems.append("{} goes from {:.2f} to {:.2f}, peaking at {:.2f}".format(
+                    type(mob).__name__, drawn[0][i], drawn[-1][i],
+                    max(row[i] for row in drawn),
+                ))
+    return problems
+
+
+class FrameScene(Scene):
+    """
+    Draws the mobjects of get_mobjects() once, into camera's pixel array.
+    """
+
+    def construct(self):
+        self.add(*self.get_mobjects())
+        self.update_frame()
+
+
+class MappingFrame(FrameScene):
+    def get_mobjects(self):
+        setA = FiniteNamedSetBag(range(3), color=BLUE, element_label_at=LEFT)
+        setA.move_to(3*LEFT + UP)
+        setB = FiniteNamedSetBag(range(4), color=RED, element_label_at=RIGHT)
+        setB.move_to(LEFT + UP)
+        # Large enough for a DotCloud and an ArrowBundle
+        setC = FiniteNamedSetBag(
+            range(120), color=BLUE, set_draw_labels=False, set_element_lines=6,
+            set_orientation=0.05*RIGHT,
+        ).move_to(3*RIGHT + 2*UP)
+        setD = FiniteNamedSetBag(
+            range(120), color=RED, set_draw_labels=False, set_element_lines=6,
+            set_orientation=0.05*RIGHT,
+        ).move_to(3*RIGHT + 2*DOWN)
+        return [
+            setA, setB, setC, setD,
+            FiniteMapping(setA, setB, lambda x: x + 1, color=YELLOW),
+            FiniteMapping(setC, setD, lambda x: (7 * x) % 120, color=YELLOW),
+            TexMobject("f", ":", "A", r"\to", "B").move_to(2*DOWN + 2*LEFT),
+        ]
+
+
+class DotSpriteMappingFrame(MappingFrame):
+    CONFIG = {
+        "camera_class": DotSpriteCamera,
+    }
+
+
+class NumberPlaneFrame(FrameScene):
+    def get_mobjects(self):
+        grid = NumberPlane(y_max=2*FRAME_Y_RADIUS).fade(0.6)
+        parabola = grid.get_graph(lambda x: x**2 / 8, color=YELLOW, stroke_opacity=0.6)
+        circle = Circle(radius=2, stroke_width=1, stroke_opacity=0.5).move_to(UP)
+        return [
+            grid, parabola, circle,
+            Polygon(LEFT, UP, RIGHT, fill_opacity=0.5, color=BLUE),
+            Dot(2*UP, color=BLUE),
+            TexMobject("y = {x^2 \\over 8}").to_corner(UL),
+        ]
+
+
+def check_tiled_pixels(scene_kwargs, tile_threads=4):
+    """
+    A frame drawn in tiles has exactly the pixels of the same frame
+    drawn on one thread.
+    """
+    problems = []
+    for scene_class in [MappingFrame, DotSpriteMappingFrame, NumberPlaneFrame]:
+        serial = scene_class(**scene_kwargs).camera
+        tiled = with_tiled_rasterization(scene_class, tile_threads)(**scene_kwargs).camera
+        if len(tiled.get_tiles()) < 2:
+            problems.append("{}: the frame was not split into tiles".format(
+                scene_class.__name__,
+            ))
+            continue
+        difference = serial.get_pixel_array() != tiled.get_pixel_array()
+        if difference.any():
+            rows = np.nonzero(difference.any(axis=(1, 2)))[0]
+            problems.append("{}: {} pixels differ, in rows {} to {}".format(
+                scene_class.__name__,
+                int(difference.any(axis=2).sum()), rows[0], rows[-1],
+            ))
+    return problems
+
+
+def check_sprite_pixels(scene_kwargs, max_difference=64, max_fraction=0.001):
+    """
+    A frame drawn with DotSpriteCamera has the pixels of the same frame
+    drawn by cairo, up to the antialiasing of the edges of dots: no
+    channel differs by more than `max_difference` (a quarter of the
+    range, for an edge pixel's coverage off by a quarter), and no more
+    than `max_fraction` of the pixels differ at all.
+    """
+    drawn = MappingFrame(**scene_kwargs).camera.get_pixel_array()
+    stamped = DotSpriteMappingFrame(**scene_kwargs).camera.get_pixel_array()
+    difference = np.abs(drawn.astype(int) - stamped.astype(int)).max(axis=2)
+    problems = []
+    if difference.max() > max_difference:
+        problems.append("a channel differs by {}, more than {}".format(
+            difference.max(), max_difference,
+        ))
+    fraction = (difference > 0).mean()
+    if fraction > max_fraction:
+        problems.append("{:.2%} of the pixels differ, more than {:.2%}".format(
+            fraction, max_fraction,
+        ))
+    return problems
+
+
+CHECKS = {
+    "spotlight_frames": check_spotlight_frames,
+    "spotlight_opacity": check_spotlight_opacity,
+    "tiled_pixels": check_tiled_pixels,
+    "sprite_pixels": check_sprite_pixels,
+}
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Check that the options of etcslib.render draw what manim would"
+    )
+    parser.add_argument(
+        "checks", nargs="*",
+        help="Checks to run, of {} (default: all)".format(", ".join(CHECKS)),
+    )
+    quality = parser.add_mutually_exclusive_group()
+    quality.add_argument(
+        "-l", "--low_quality", action="store_true",
+        help="Render at low quality (the default)",
+    )
+    quality.add_argument(
+        "-m", "--medium_quality", action="store_true",
+        help="Render at medium quality",
+    )
+    quality.add_argument(
+        "--high_quality", action="store_true",
+        help="Render at production quality",
+    )
+    return parser
+
+
+def get_camera_config(args):
+    if args.medium_quality:
+        return dict(consts.MEDIUM_QUALITY_CAMERA_CONFIG)
+    if args.high_quality:
+        return dict(consts.PRODUCTION_QUALITY_CAMERA_CONFIG)
+    return dict(consts.LOW_QUALITY_CAMERA_CONFIG)
+
+
+def main():
+    parser = get_parser()
+    args = parser.parse_args()
+    for name in args.checks:
+        if name not in CHECKS:
+            parser.error("no check named {}".format(name))
+    failed = False
+    with tempfile.TemporaryDirectory() as output_directory, placeholder_tex():
+        scene_kwargs = {
+            "camera_config": get_camera_config(args),
+            "file_writer_config": {
+                "write_to_movie": False,
+                "save_last_frame": False,
+                "output_directory": output_directory,
+                "file_name": "check",
+            },
+        }
+        for name in args.checks or list(CHECKS):
+            problems = CHECKS[name](scene_kwargs)
+            print("{}: {}".format(name, "failed" if problems else "ok"))
+            for problem in problems:
+                print("  " + problem)
+            failed = failed or bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
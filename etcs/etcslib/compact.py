@@ -0,0 +1,118 @@
+"""
+A more compact representation of mobjects, for scenes which hold many
+of them at once.
+
+compact(mob) changes how the family of `mob` is stored, not what it
+looks like:
+
+* points are kept in single precision, which is still far finer than a
+  pixel; anything which moves the points may bring back double precision,
+  so mobjects are compacted again whenever they are added to a scene with
+  CompactSceneMixin;
+* fill and stroke colors and sheen directions equal to those of another
+  compacted mobject are the same read-only array, which set_fill and
+  set_stroke copy before changing, once install_compact_styles() is in
+  place.
+
+Classes are left alone: attributes at their CONFIG defaults stay in each
+instance, since moving them onto manim's classes would change those for
+every scene in the process.
+"""
+import sys
+import weakref
+
+import numpy as np
+
+from manimlib.mobject.types.vectorized_mobject import VMobject
+
+from etcslib.config import subclass_scene
+
+
+SHARED_ARRAY_ATTRIBUTES = [
+    "fill_rgbas",
+    "stroke_rgbas",
+    "background_stroke_rgbas",
+    "sheen_direction",
+]
+
+shared_arrays = weakref.WeakValueDictionary()
+
+
+def get_shared_array(array):
+    key = (array.dtype.str, array.shape, array.tobytes())
+    shared = shared_arrays.get(key)
+    if shared is None:
+        shared = np.array(array)
+        shared.flags.writeable = False
+        shared_arrays[key] = shared
+    return shared
+
+
+def compact(*mobjects):
+    for mobject in mobjects:
+        for mob in mobject.get_family():
+            if mob.points.dtype == np.float64:
+                mob.points = mob.points.astype(np.float32)
+            if isinstance(mob, VMobject):
+                for attr in SHARED_ARRAY_ATTRIBUTES:
+                    value = getattr(mob, attr, None)
+                    if isinstance(value, np.ndarray):
+                        setattr(mob, attr, get_shared_array(value))
+    return mobjects
+
+
+original_update_rgbas_array = VMobject.update_rgbas_array
+
+
+def update_rgbas_array(self, array_name, color=None, opacity=None):
+    # VMobject.update_rgbas_array changes the array in place, so a
+    # shared one is copied first
+    rgbas = getattr(self, array_name, None)
+    if isinstance(rgbas, np.ndarray) and not rgbas.flags.writeable:
+        setattr(self, array_name, np.array(rgbas))
+    return original_update_rgbas_array(self, array_name, color, opacity)
+
+
+def install_compact_styles():
+    """
+    Makes setting the colors of a compacted mobject copy its shared
+    arrays rather than fail on them.
+    """
+    VMobject.update_rgbas_array = update_rgbas_array
+
+
+class CompactSceneMixin(object):
+    def setup(self):
+        install_compact_styles()
+        super().setup()
+
+    def add(self, *mobjects):
+        compact(*mobjects)
+        return super().add(*mobjects)
+
+
+def with_compact_mobjects(scene_class):
+    """
+    scene_class compacting every mobject added to it.
+    """
+    return subclass_scene(scene_class, CompactSceneMixin)
+
+
+def get_mobject_memory(mobjects):
+    """
+    Bytes taken by the instance dictionaries and arrays of the families
+    of `mobjects`, counting every shared array once.
+    """
+    seen = set()
+    total = 0
+    family = [mob for mobject in mobjects for mob in mobject.get_family()]
+    for mob in family:
+        if id(mob) in seen:
+            continue
+        seen.add(id(mob))
+        total += sys.getsizeof(mob.__dict__)
+        for value in vars(mob).values():
+            if isinstance(value, np.ndarray) and id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value) if value.base is None else value.nbytes
+    return total
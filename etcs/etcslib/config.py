@@ -0,0 +1,115 @@
+import sys
+
+import manimlib.config
+import manimlib.constants
+import manimlib.extract_scene
+
+
+def parse_cli(parser):
+    """
+    Parses the options known to `parser` and passes everything else on
+    to manim's own parser, so that the usual manim flags (-l, -w, -n, -r,
+    --media_dir, ...) keep working for our entry points.
+
+    Returns a pair of our parsed arguments and manim's configuration.
+    """
+    args, manim_argv = parser.parse_known_args()
+    sys.argv = sys.argv[:1] + manim_argv
+    manim_args = manimlib.config.parse_cli()
+    config = manimlib.config.get_configuration(manim_args)
+    manimlib.constants.initialize_directories(config)
+    return args, config
+
+
+def get_scene_classes(config):
+    all_scene_classes = manimlib.extract_scene.get_scene_classes_from_module(
+        config["module"]
+    )
+    return manimlib.extract_scene.get_scenes_to_render(all_scene_classes, config)
+
+
+def get_scene_kwargs(config):
+    return dict([
+        (key, config[key])
+        for key in [
+            "camera_config",
+            "file_writer_config",
+            "skip_animations",
+            "start_at_animation_number",
+            "end_at_animation_number",
+            "leave_progress_bars",
+        ]
+    ])
+
+
+def get_silent_scene_kwargs(scene_kwargs):
+    """
+    Scene kwargs for running construct() without writing anything:
+    animations are skipped and the file writer is switched off.
+    """
+    result = dict(scene_kwargs)
+    result["file_writer_config"] = dict(
+        scene_kwargs.get("file_writer_config", {}),
+        write_to_movie=False,
+        save_last_frame=False,
+    )
+    result["skip_animations"] = True
+    result["start_at_animation_number"] = None
+    result["end_at_animation_number"] = None
+    return result
+
+
+def get_single_frame_scene_kwargs(scene_kwargs):
+    """
+    Scene kwargs for going through animations without writing them,
+    and saving the frame the scene ends on as an image.
+    """
+    result = dict(scene_kwargs)
+    result["file_writer_config"] = dict(
+        scene_kwargs.get("file_writer_config", {}),
+        write_to_movie=False,
+        save_last_frame=True,
+    )
+    result["skip_animations"] = False
+    result["start_at_animation_number"] = None
+    result["end_at_animation_number"] = None
+    return result
+
+
+def get_config_value(cls, key):
+    # As digest_config would find it, without making an instance
+    for base in cls.__mro__:
+        config = base.__dict__.get("CONFIG", {})
+        if key in config:
+            return config[key]
+    raise KeyError(key)
+
+
+def subclass_scene(scene_class, *mixins, **config):
+    """
+    A subclass of scene_class with `mixins` in front of it and `config`
+    as its CONFIG.  It keeps the name, module and docstring of
+    scene_class, so that it writes to the same files.
+    """
+    return type(scene_class.__name__, mixins + (scene_class,), {
+        "CONFIG": config,
+        "__module__": scene_class.__module__,
+        "__doc__": scene_class.__doc__,
+    })
+
+
+def subclass_camera(scene_class, mixin, **config):
+    """
+    A subclass of scene_class, as by subclass_scene, whose camera class
+    is that of scene_class with `mixin` in front of it and `config` as
+    its CONFIG.
+    """
+    camera_class = get_config_value(scene_class, "camera_class")
+    # E.g. TiledCameraMixin on GroupOpacityCamera is TiledGroupOpacityCamera
+    name = mixin.__name__.replace("CameraMixin", "") + camera_class.__name__
+    return subclass_scene(scene_class, camera_class=type(
+        name, (mixin, camera_class), {
+            "CONFIG": config,
+            "__module__": mixin.__module__,
+        },
+    ))
@@ -0,0 +1,313 @@
+"""
+Many dots of the same size and style as a single mobject, and a camera
+which draws them by stamping a pre-rendered sprite.
+
+A DotCloud keeps every dot as one closed subpath of its points, so that
+moving, scaling or fading thousands of dots is a handful of array
+operations, and cairo fills all of them as one compound path.  A camera
+with DotSpriteCameraMixin goes further: as long as the dots are plain
+filled circles, it renders a single dot once and composites that sprite
+at the position of every dot, all of them in a few array operations
+instead of a path per dot.  Anything else, like a cloud halfway through ShowCreation or
+with a stroke, is drawn by cairo as usual.
+"""
+import functools
+
+import numpy as np
+
+from manimlib.camera.camera import Camera
+from manimlib.constants import *
+from manimlib.mobject.geometry import DEFAULT_DOT_RADIUS
+from manimlib.mobject.geometry import Dot
+from manimlib.mobject.types.vectorized_mobject import VMobject
+
+
+class DotCloud(VMobject):
+    """
+    Dots of the given radius centered at the rows of `positions`, each
+    with the points a Dot there would have.
+    """
+    CONFIG = {
+        "radius": DEFAULT_DOT_RADIUS,
+        "stroke_width": 0,
+        "fill_opacity": 1.0,
+        "color": WHITE,
+    }
+
+    def __init__(self, positions, **kwargs):
+        self.positions = np.array(positions, dtype=float).reshape((-1, 3))
+        VMobject.__init__(self, **kwargs)
+
+    def generate_points(self):
+        dot_points = Dot(radius=self.radius).points
+        self.n_dots = len(self.positions)
+        self.n_points_per_dot = len(dot_points)
+        self.set_points(
+            (self.positions[:, None, :] + dot_points[None]).reshape((-1, 3))
+        )
+        # The points are what gets transformed from now on
+        del self.positions
+
+    def get_dot_points(self):
+        """
+        The points of every dot as an (n_dots, n_points_per_dot, 3) view,
+        or None if the cloud no longer has one subpath per dot.
+        """
+        n = self.n_dots
+        if n == 0 or len(self.points) != n * self.n_points_per_dot:
+            return None
+        return self.points.reshape((n, self.n_points_per_dot, 3))
+
+    def get_dot_anchors(self):
+        # As get_anchors of each dot, start and end of every curve in turn
+        nppcc = self.n_points_per_cubic_curve
+        dot_points = self.get_dot_points()
+        curves = dot_points.reshape((self.n_dots, -1, nppcc, 3))
+        return curves[:, :, [0, nppcc - 1]].reshape((self.n_dots, -1, 3))
+
+    def get_dot_centers(self):
+        # The center of the bounding box of each dot, as Dot.get_center
+        dot_points = self.get_dot_points()
+        if dot_points is None:
+            raise Exception(
+                "Cannot find the dots of a cloud whose points have been realigned"
+            )
+        return (dot_points.min(axis=1) + dot_points.max(axis=1)) / 2
+
+    def hide_dots(self, index):
+        """
+        Collapses the dots at `index` to their centers, so that they are
+        no longer drawn as part of the cloud.
+        """
+        dot_points = self.get_dot_points()
+        if dot_points is None:
+            return self
+        centers = self.get_dot_centers()[index]
+        dot_points[index] = centers[:, None, :]
+        return self
+
+
+@functools.lru_cache()
+def get_unit_dot_norms():
+    # Distances of the points of a Dot from its center, per unit radius
+    return np.linalg.norm(Dot(radius=1).points, axis=1)
+
+
+# Dot sprites are sampled at 8 x 8 points per pixel, a pixel's samples
+# being the bits of a 64 bit mask
+DOT_SPRITE_SAMPLES = 8
+
+
+def count_bits(masks):
+    # The number of bits set in each 64 bit mask, summed in ever wider
+    # fields of the masks themselves
+    masks = masks - ((masks >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    masks = (masks & np.uint64(0x3333333333333333)) + \
+        ((masks >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    masks = (masks + (masks >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (masks * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+def render_dot_sprite(radius, phase):
+    """
+    The pixels around a disk of `radius` pixels whose center is `phase`
+    (in [0, 1)^2) from the corner of the middle pixel, as masks of which
+    of their DOT_SPRITE_SAMPLES x DOT_SPRITE_SAMPLES points lie in it.
+    """
+    samples = DOT_SPRITE_SAMPLES
+    half_size = int(np.ceil(radius)) + 1
+    size = 2 * half_size + 1
+    offsets = (np.arange(samples) + 0.5) / samples
+    coords = (np.arange(size)[:, None] + offsets[None, :]).reshape(-1) - half_size
+    dx = coords[None, :] - phase[0]
+    dy = coords[:, None] - phase[1]
+    inside = (dx**2 + dy**2) <= radius**2
+    inside = inside.reshape((size, samples, size, samples)).transpose((0, 2, 1, 3))
+    bits = np.left_shift(np.uint64(1), np.arange(samples * samples, dtype=np.uint64))
+    return (inside.reshape((size, size, -1)) * bits).sum(axis=2, dtype=np.uint64)
+
+
+class DotSpriteCameraMixin(object):
+    CONFIG = {
+        # Sprites are rendered for this many positions within a pixel
+        # along each axis, so dots do not snap to whole pixels
+        "dot_sprite_phases": 8,
+        # Relative difference in shape up to which dots count as circles
+        # of the same size
+        "dot_sprite_tolerance": 1e-3,
+    }
+    # Sprites rendered so far, left out of the segment cache's keys
+    digest_ignored_attributes = [
+        "dot_sprites",
+    ]
+
+    def __init__(self, *args, **kwargs):
+        self.dot_sprites = {}
+        super().__init__(*args, **kwargs)
+
+    def display_multiple_non_background_colored_vmobjects(self, vmobjects, pixel_array):
+        ctx = self.get_cairo_context(pixel_array)
+        for vmobject in vmobjects:
+            if isinstance(vmobject, DotCloud) and self.can_stamp_dots(vmobject):
+                surface = ctx.get_target()
+                surface.flush()
+                self.stamp_dots(vmobject, pixel_array)
+                surface.mark_dirty()
+            else:
+                self.display_vectorized(vmobject, ctx)
+
+    def can_stamp_dots(self, cloud):
+        if cloud.get_dot_points() is None:
+            return False
+        if len(self.get_fill_rgbas(cloud)) != 1:
+            return False
+        for background in (False, True):
+            if cloud.get_stroke_width(background) > 0 and \
+                    cloud.get_stroke_opacity(background) > 0:
+                return False
+        return self.get_dot_radius(cloud) is not None
+
+    def get_dot_radius(self, cloud):
+        """
+        The radius, in frame units, which every visible dot of the cloud
+        has, or None unless all of them are circles of the same size.
+        """
+        dot_points = cloud.get_dot_points()
+        centers = cloud.get_dot_centers()
+        offsets = dot_points - centers[:, None, :]
+        sizes = np.abs(offsets).max(axis=(1, 2))
+        visible = sizes > 0
+        if not visible.any():
+            return 0
+        offsets = offsets[visible]
+        tolerance = self.dot_sprite_tolerance * sizes[visible][0]
+        if np.abs(offsets - offsets[0]).max() > tolerance:
+            return None
+        # Rotating or flipping a circle leaves it a circle, so the shape
+        # is compared by the distances of its points from the center
+        norms = np.linalg.norm(offsets[0], axis=1)
+        unit_norms = get_unit_dot_norms()
+        if len(norms) != len(unit_norms):
+            return None
+        radius = norms.max() / unit_norms.max()
+        if np.abs(norms - radius * unit_norms).max() > tolerance:
+            return None
+        return radius
+
+    def get_dot_sprites(self, radius):
+        """
+        The sample masks of the pixels around a dot of `radius` pixels,
+        indexed by the subpixel cells of its center along x and y, then
+        by row and column, the center lying in the middle pixel.
+        """
+        key = round(radius, 2)
+        if key not in self.dot_sprites:
+            n_phases = self.dot_sprite_phases
+            self.dot_sprites[key] = np.array([
+                [
+                    render_dot_sprite(radius, (np.array([x_phase, y_phase]) + 0.5) / n_phases)
+                    for y_phase in range(n_phases)
+                ]
+                for x_phase in range(n_phases)
+            ])
+        return self.dot_sprites[key]
+
+    def stamp_dots(self, cloud, pixel_array):
+        radius = self.get_dot_radius(cloud)
+        dot_points = cloud.get_dot_points()
+        visible = np.abs(dot_points - dot_points[:, :1]).max(axis=(1, 2)) > 0
+        if radius == 0 or not visible.any():
+            return
+        centers = self.transform_points_pre_display(
+            cloud, cloud.get_dot_centers()[visible]
+        )
+
+        ph, pw = pixel_array.shape[:2]
+        fw = self.get_frame_width()
+        fh = self.get_frame_height()
+        fc = self.get_frame_center()
+        # As cairo maps frame coordinates to pixels, pixel (i, j)
+        # covering [j, j + 1) x [i, i + 1)
+        xs = (centers[:, 0] - fc[0]) * pw / fw + pw / 2
+        ys = (fc[1] - centers[:, 1]) * ph / fh + ph / 2
+        radius_px = radius * pw / fw
+
+        sprites = self.get_dot_sprites(radius_px)
+        n_phases, size = self.dot_sprite_phases, sprites.shape[-1]
+        half_size = size // 2
+        columns = np.floor(xs).astype(int)
+        rows = np.floor(ys).astype(int)
+        on_screen = (rows >= -half_size) & (rows < ph + half_size) & \
+            (columns >= -half_size) & (columns < pw + half_size)
+        if not on_screen.any():
+            return
+        xs, ys = xs[on_screen], ys[on_screen]
+        columns, rows = columns[on_screen], rows[on_screen]
+        x_phases = np.minimum(((xs - columns) * n_phases).astype(int), n_phases - 1)
+        y_phases = np.minimum(((ys - rows) * n_phases).astype(int), n_phases - 1)
+
+        # Like cairo filling the cloud as one path, a pixel is covered by
+        # the union of the dots over it, counted in samples: the sprites
+        # are or-ed into the masks of the cloud's bounding box one pixel
+        # offset at a time, and a pixel holding several centers is left
+        # to later layers so that no pixel is written twice at once
+        top, left = rows.min() - half_size, columns.min() - half_size
+        masks = np.zeros(
+            (rows.max() - top + half_size + 1, columns.max() - left + half_size + 1),
+            dtype=sprites.dtype,
+        )
+        cells = (rows - top) * masks.shape[1] + (columns - left)
+        by_cell = np.argsort(cells, kind="stable")
+        index = np.arange(len(cells))
+        is_first = np.diff(cells[by_cell], prepend=-1) != 0
+        layers = np.empty_like(index)
+        layers[by_cell] = index - np.maximum.accumulate(np.where(is_first, index, 0))
+        flat_masks = masks.reshape(-1)
+        corners = cells - half_size * (masks.shape[1] + 1)
+        for layer in range(layers.max() + 1):
+            selected = layers == layer
+            layer_corners = corners[selected]
+            layer_sprites = np.moveaxis(
+                sprites[x_phases[selected], y_phases[selected]], 0, -1,
+            ).copy()
+            for i in range(size):
+                for j in range(size):
+                    indices = layer_corners + (i * masks.shape[1] + j)
+                    flat_masks[indices] |= layer_sprites[i, j]
+        # Only the part of the box on screen is drawn
+        box = masks[
+            max(-top, 0):ph - top,
+            max(-left, 0):pw - left,
+        ]
+        region = pixel_array[
+            max(top, 0):max(top, 0) + box.shape[0],
+            max(left, 0):max(left, 0) + box.shape[1],
+        ]
+        covered = box != 0
+        masks = box[covered]
+
+        # Composited as pixman does OVER onto the premultiplied pixel
+        # array: the coverage and opacity become an 8 bit alpha, and the
+        # source and the destination are each scaled by it with rounding
+        coverage = count_bits(masks) / DOT_SPRITE_SAMPLES**2
+        opacity = self.get_fill_rgbas(cloud)[0, 3]
+        alpha = np.rint(255 * opacity * coverage).astype(np.uint16)[:, None]
+        color = self.rgb_max_val * np.append(self.get_fill_rgbas(cloud)[0, :3], 1)
+        color = np.rint(color).astype(np.uint16)
+        region[covered] = (
+            multiply_un8(color, alpha) +
+            multiply_un8(region[covered].astype(np.uint16), 255 - alpha)
+        ).astype(pixel_array.dtype)
+
+
+def multiply_un8(a, b):
+    """
+    a * b / 255 rounded to the nearest integer, for 8 bit a and b, the
+    way pixman computes it.  The intermediate values fit in 16 bits.
+    """
+    t = a * b + 128
+    return (t + (t >> 8)) >> 8
+
+
+class DotSpriteCamera(DotSpriteCameraMixin, Camera):
+    pass
@@ -0,0 +1,235 @@
+"""
+Running scenes without drawing or encoding anything, to see their
+timeline and whether they get to the end.
+
+    cd etcs
+    python -m etcslib.dry_run 05-algebraization-of-geometry.py ParabolaExample -l
+    python -m etcslib.dry_run 05-algebraization-of-geometry.py -a --json timeline.json
+
+construct() runs completely, with animations and updaters stepped at
+the frame rate of the chosen quality, so that the timing is that of the
+real render.  Every play() and wait() is listed with its start time,
+duration, and animations with the mobjects they animate.  TeX labels
+are built from placeholders unless --tex is given.
+
+Since a dry run only finds errors in code that runs, the methods of
+each scene are also checked for names that are not defined anywhere,
+like a misspelt class in a method that is not called yet.
+
+The exit status is 1 if any scene failed or uses undefined names.
+"""
+import argparse
+import builtins
+import contextlib
+import dis
+import json
+import sys
+import traceback
+import types
+
+from manimlib.animation.animation import Animation
+
+from etcslib.config import get_scene_classes
+from etcslib.config import get_scene_kwargs
+from etcslib.config import parse_cli
+from etcslib.config import subclass_scene
+from etcslib.tex import install_tex_cache
+from etcslib.tex import placeholder_tex
+
+
+def describe_mobject(mobject):
+    name = type(mobject).__name__
+    tex_string = getattr(mobject, "tex_string", None)
+    if isinstance(tex_string, str):
+        if len(tex_string) > 30:
+            tex_string = tex_string[:27] + "..."
+        return "{}({!r})".format(name, tex_string)
+    return name
+
+
+class DryRunSceneMixin(object):
+    def __init__(self, **kwargs):
+        self.timeline = []
+        self.error = None
+        try:
+            super().__init__(**kwargs)
+        except Exception:
+            # Kept along with the timeline up to the failure
+            self.error = traceback.format_exc()
+
+    def play(self, *args, **kwargs):
+        return self.record(super().play, "play", *args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        return self.record(super().wait, "wait", *args, **kwargs)
+
+    def record(self, method, kind, *args, **kwargs):
+        entry = {
+            "num_play": self.num_plays,
+            "kind": kind,
+            "start": self.time,
+            "animations": [],
+        }
+        self.timeline.append(entry)
+        result = method(*args, **kwargs)
+        entry["duration"] = self.time - entry["start"]
+        return result
+
+    def begin_animations(self, animations):
+        self.timeline[-1]["animations"] = [
+            {
+                "type": type(animation).__name__,
+                "mobject": describe_mobject(animation.mobject),
+            }
+            for animation in animations
+            if isinstance(animation, Animation)
+        ]
+        return super().begin_animations(animations)
+
+    def update_frame(self, *args, **kwargs):
+        pass
+
+    def get_frame(self):
+        return None
+
+    def add_frames(self, *frames):
+        self.increment_time(len(frames) / self.camera.frame_rate)
+
+
+def with_dry_run(scene_class):
+    """
+    scene_class only stepping through its animations and recording its
+    timeline.
+    """
+    return subclass_scene(scene_class, DryRunSceneMixin)
+
+
+def get_dry_run_scene_kwargs(scene_kwargs):
+    result = dict(scene_kwargs)
+    result["file_writer_config"] = dict(
+        scene_kwargs.get("file_writer_config", {}),
+        write_to_movie=False,
+        save_last_frame=False,
+    )
+    result["skip_animations"] = False
+    result["start_at_animation_number"] = None
+    result["end_at_animation_number"] = None
+    return result
+
+
+def get_code_objects(code):
+    yield code
+    for constant in code.co_consts:
+        if isinstance(constant, types.CodeType):
+            yield from get_code_objects(constant)
+
+
+def find_undefined_names(scene_class, module):
+    """
+    (method, line, name) of every global name used in the methods that
+    scene_class and its bases from the same file define, which is
+    neither in `module`, the scene's file, nor a builtin.
+    """
+    known_names = set(vars(module)) | set(dir(builtins))
+    undefined = []
+    for cls in scene_class.__mro__:
+        if cls.__module__ != scene_class.__module__:
+            continue
+        for name, function in vars(cls).items():
+            if isinstance(function, (staticmethod, classmethod)):
+                function = function.__func__
+            if not isinstance(function, types.FunctionType):
+                continue
+            for code in get_code_objects(function.__code__):
+                line = code.co_firstlineno
+                for instruction in dis.get_instructions(code):
+                    if instruction.starts_line:
+                        line = getattr(instruction, "line_number", instruction.starts_line)
+                    if instruction.opname not in ("LOAD_GLOBAL", "LOAD_NAME"):
+                        continue
+                    if instruction.argval not in known_names:
+                        undefined.append((
+                            "{}.{}".format(cls.__name__, name),
+                            line,
+                            instruction.argval,
+                        ))
+    return undefined
+
+
+def format_time(seconds):
+    return "{}:{:05.2f}".format(int(seconds // 60), seconds % 60)
+
+
+def print_timeline(scene):
+    print("\n{}".format(type(scene).__name__))
+    for entry in scene.timeline:
+        print("  {:>3}  {}  {:6.2f}s  {}  {}".format(
+            entry["num_play"],
+            format_time(entry["start"]),
+            entry.get("duration", 0),
+            entry["kind"],
+            ", ".join(
+                "{}({})".format(animation["type"], animation["mobject"])
+                for animation in entry["animations"]
+            ),
+        ))
+    print("  total {}".format(format_time(scene.time)))
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument(
+        "--tex",
+        action="store_true",
+        help="Compile TeX instead of using placeholders",
+    )
+    parser.add_argument(
+        "--json",
+        default=None,
+        metavar="FILE",
+        help="Also write the timelines to FILE as JSON",
+    )
+    return parser
+
+
+def main():
+    args, config = parse_cli(get_parser())
+    scene_kwargs = get_dry_run_scene_kwargs(get_scene_kwargs(config))
+    scene_classes = get_scene_classes(config)
+
+    tex = placeholder_tex()
+    if args.tex:
+        install_tex_cache()
+        tex = contextlib.nullcontext()
+    results = []
+    failed = False
+    with tex:
+        for SceneClass in scene_classes:
+            undefined = find_undefined_names(SceneClass, config["module"])
+            scene = with_dry_run(SceneClass)(**scene_kwargs)
+            print_timeline(scene)
+            for method, line, name in undefined:
+                print("  {}, line {}: {} is not defined".format(method, line, name))
+            if scene.error is not None:
+                print("  failed at {}:\n{}".format(format_time(scene.time), scene.error))
+            failed = failed or bool(undefined) or scene.error is not None
+            results.append({
+                "scene": SceneClass.__name__,
+                "frame_rate": scene.camera.frame_rate,
+                "total": scene.time,
+                "timeline": scene.timeline,
+                "undefined_names": [
+                    {"method": method, "line": line, "name": name}
+                    for method, line, name in undefined
+                ],
+                "error": scene.error,
+            })
+
+    if args.json is not None:
+        with open(args.json, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
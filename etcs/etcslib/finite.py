@@ -0,0 +1,474 @@
+"""
+Finite sets, drawn as a bag of named elements, and mappings between
+them, drawn as one arrow per element.
+"""
+import numpy as np
+
+from manimlib.constants import *
+from manimlib.mobject.geometry import Circle
+from manimlib.mobject.geometry import Dot
+from manimlib.mobject.svg.tex_mobject import TextMobject
+from manimlib.mobject.types.vectorized_mobject import VMobject
+from manimlib.utils.config_ops import digest_config
+from manimlib.utils.space_ops import rotate_vector
+
+from etcslib.dots import DotCloud
+from etcslib.finset import FinFunction
+from etcslib.finset import FinSet
+from etcslib.finset import get_index_map
+
+
+def get_boundary_point_clouds(mobjects):
+    """
+    Points defining the boundary of each mobject, padded with NaN
+    into a single (n, max_points, 3) array.
+    """
+    clouds = [mob.get_points_defining_boundary() for mob in mobjects]
+    size = max([len(cloud) for cloud in clouds] + [1])
+    result = np.full((len(clouds), size, 3), np.nan)
+    for i, (mob, cloud) in enumerate(zip(mobjects, clouds)):
+        if len(cloud) == 0:
+            result[i, 0] = mob.get_center()
+        else:
+            result[i, :len(cloud)] = cloud
+    return result
+
+
+def get_element_centers(dots):
+    """
+    Centers of the dots of a set as an (n, 3) array, without splitting
+    the dots of a compact set out of their cloud.
+    """
+    if isinstance(dots, LazyDotList):
+        return dots.get_centers()
+    return np.array([dot.get_center() for dot in dots]).reshape((-1, 3))
+
+
+def get_element_boundary_point_clouds(dots):
+    if isinstance(dots, LazyDotList):
+        return dots.get_boundary_point_clouds()
+    return get_boundary_point_clouds(list(dots))
+
+
+def get_boundary_points(clouds, directions):
+    """
+    Vectorized Mobject.get_boundary_point: for each row of `clouds`
+    the point furthest in the matching row of `directions`.
+    """
+    projections = np.einsum("ijk,ik->ij", clouds, directions)
+    indices = np.nanargmax(projections, axis=1)
+    return clouds[np.arange(len(clouds)), indices]
+
+
+def get_corner_points(corners):
+    """
+    Vectorized VMobject.set_points_as_corners for n polylines given as
+    a list of (n, 3) arrays, one per corner.  Returns (n, k, 3) points.
+    """
+    starts = np.stack(corners[:-1], axis=1)
+    ends = np.stack(corners[1:], axis=1)
+    alphas = np.linspace(0, 1, VMobject.CONFIG["n_points_per_cubic_curve"])
+    points = starts[:, :, None, :] + \
+        alphas[None, None, :, None] * (ends - starts)[:, :, None, :]
+    return points.reshape((len(starts), -1, 3))
+
+
+def get_arrow_points(starts, ends, tip_length, buff=0,
+                     max_tip_length_to_length_ratio=0.25):
+    """
+    Shaft and tip points for n straight arrows from starts[i] to ends[i],
+    laid out the same way Arrow(start, end, buff=buff, tip_length=tip_length)
+    would do it.  Returns the points of shafts, the points of tips and
+    the lengths of the arrows.
+    """
+    vects = ends - starts
+    lengths = np.linalg.norm(vects, axis=1)
+    units = np.zeros(vects.shape)
+    nonzero = lengths > 0
+    units[nonzero] = vects[nonzero] / lengths[nonzero, None]
+
+    buffs = np.where(lengths >= 2 * buff, buff, 0)
+    starts = starts + buffs[:, None] * units
+    ends = ends - buffs[:, None] * units
+    lengths = lengths - 2 * buffs
+
+    tip_lengths = np.minimum(
+        tip_length, max_tip_length_to_length_ratio * lengths
+    )
+    bases = ends - tip_lengths[:, None] * units
+    normals = np.zeros(units.shape)
+    normals[:, 0] = -units[:, 1]
+    normals[:, 1] = units[:, 0]
+    half_widths = tip_lengths[:, None] / 2 * normals
+
+    shafts = get_corner_points([starts, bases])
+    tips = get_corner_points([
+        ends, bases + half_widths, bases - half_widths, ends
+    ])
+    return shafts, tips, lengths
+
+
+class MappingArrow(VMobject):
+    """
+    A straight arrow with a tip, built directly from precomputed points.
+    Looks like an Arrow, without the cost of constructing one.
+    """
+    CONFIG = {
+        "tip_style": {
+            "fill_opacity": 1,
+            "stroke_width": 0,
+        },
+    }
+
+    def __init__(self, shaft_points, tip_points, **kwargs):
+        VMobject.__init__(self, **kwargs)
+        self.set_points(shaft_points)
+        color = self.get_color()
+        style = {"fill_color": color, "stroke_color": color}
+        style.update(self.tip_style)
+        self.tip = VMobject(**style)
+        self.tip.set_points(tip_points)
+        self.add(self.tip)
+
+    def get_start(self):
+        return self.points[0]
+
+    def get_end(self):
+        return self.tip.points[0]
+
+
+class ArrowBundle(MappingArrow):
+    """
+    Many arrows stored as one mobject: every shaft is a subpath of its
+    points, and every tip is a subpath of its tip.
+    """
+
+    def __init__(self, shaft_points, tip_points, **kwargs):
+        self.n_arrows = len(shaft_points)
+        MappingArrow.__init__(
+            self,
+            shaft_points.reshape((-1, 3)),
+            tip_points.reshape((-1, 3)),
+            **kwargs
+        )
+
+    def get_arrow_points(self, index):
+        """
+        Current shaft and tip points of the arrows at `index`, or None
+        if the bundle no longer has one subpath per arrow.
+        """
+        n = self.n_arrows
+        if n == 0 or len(self.points) % n or len(self.tip.points) % n:
+            return None
+        shafts = self.points.reshape((n, -1, 3))
+        tips = self.tip.points.reshape((n, -1, 3))
+        return shafts[index], tips[index]
+
+    def hide_arrows(self, index):
+        """
+        Collapses the arrows at `index` to a single point each, so that
+        they are no longer drawn as part of the bundle.
+        """
+        if self.get_arrow_points(index) is None:
+            return self
+        for points in self.points, self.tip.points:
+            # A view, as points are always C-contiguous
+            arrows = points.reshape((self.n_arrows, -1, 3))
+            arrows[index] = arrows[index][:, :1]
+        return self
+
+
+class LazyArrowList(object):
+    """
+    The arrows of a compound FiniteMapping.  An arrow is split out of
+    the bundle into its own MappingArrow the first time it is accessed,
+    so scenes can animate single arrows of very large mappings.
+    """
+
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.arrows = {}
+
+    def __len__(self):
+        return self.mapping.bundle.n_arrows
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.get_arrows(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("arrow index out of range")
+        return self.get_arrows([index])[0]
+
+    def __iter__(self):
+        return iter(self.get_arrows(range(len(self))))
+
+    def get_arrows(self, indices):
+        indices = list(indices)
+        new_indices = [i for i in indices if i not in self.arrows]
+        if new_indices:
+            bundle = self.mapping.bundle
+            arrow_points = bundle.get_arrow_points(new_indices)
+            if arrow_points is None:
+                raise Exception(
+                    "Cannot split arrows out of a bundle whose points "
+                    "have been realigned"
+                )
+            for i, shaft, tip in zip(new_indices, *arrow_points):
+                arrow = MappingArrow(
+                    shaft.copy(), tip.copy(), **self.mapping.arrow_config
+                )
+                arrow.match_style(bundle)
+                self.arrows[i] = arrow
+                self.mapping.add(arrow)
+            bundle.hide_arrows(new_indices)
+        return [self.arrows[i] for i in indices]
+
+
+class LazyDotList(object):
+    """
+    The dots of a compact FiniteNamedSetBag.  A dot is split out of the
+    cloud into its own Dot the first time it is accessed, so scenes can
+    animate single elements of very large sets.
+    """
+
+    def __init__(self, bag):
+        self.bag = bag
+        self.dots = {}
+
+    def __len__(self):
+        return self.bag.cloud.n_dots
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.get_dots(range(len(self))[index])
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dot index out of range")
+        return self.get_dots([index])[0]
+
+    def __iter__(self):
+        return iter(self.get_dots(range(len(self))))
+
+    def get_dots(self, indices):
+        indices = list(indices)
+        new_indices = [i for i in indices if i not in self.dots]
+        if new_indices:
+            cloud = self.bag.cloud
+            dot_points = cloud.get_dot_points()
+            if dot_points is None:
+                raise Exception(
+                    "Cannot split dots out of a cloud whose points "
+                    "have been realigned"
+                )
+            for i in new_indices:
+                dot = Dot(radius=cloud.radius)
+                dot.set_points(dot_points[i].copy())
+                dot.match_style(cloud)
+                self.dots[i] = dot
+                self.bag.add(dot)
+            cloud.hide_dots(new_indices)
+        return [self.dots[i] for i in indices]
+
+    def get_centers(self):
+        centers = self.bag.cloud.get_dot_centers()
+        for i, dot in self.dots.items():
+            centers[i] = dot.get_center()
+        return centers
+
+    def get_boundary_point_clouds(self):
+        """
+        As get_boundary_point_clouds of all the dots, which for the
+        dots still in the cloud are simply their anchors.
+        """
+        clouds = self.bag.cloud.get_dot_anchors()
+        if not self.dots:
+            return clouds
+        indices = list(self.dots)
+        split_clouds = get_boundary_point_clouds([self.dots[i] for i in indices])
+        size = max(clouds.shape[1], split_clouds.shape[1])
+        result = np.full((len(clouds), size, 3), np.nan)
+        result[:, :clouds.shape[1]] = clouds
+        result[indices] = np.nan
+        result[indices, :split_clouds.shape[1]] = split_clouds
+        return result
+
+
+class FiniteNamedSetBag(VMobject):
+    """
+    The elements `names` of a finite set, or of a FinSet, each drawn as
+    a dot with its name as a label, laid out in set_element_lines rows along
+    set_orientation, optionally in a bag with a name.
+
+    Sets of at least compact_dots_threshold elements keep all their dots
+    in a single DotCloud, whose dots split off on access through
+    .dots[i].  For sets that large, set_draw_labels=False leaves out the
+    labels, which are still one TextMobject per element.
+    """
+    CONFIG = {
+        "compact_dots_threshold": 100,
+    }
+
+    def __init__(self, names, set_name=None, set_boundary=False, set_draw_dots=True,
+                 set_draw_labels=True, set_element_lines=1, set_orientation=DOWN,
+                 element_label_at=None, **kwargs):
+        VMobject.__init__(self, **kwargs)
+
+        if element_label_at is None:
+            if set_draw_dots:
+                element_label_at = 0.7 * rotate_vector(set_orientation, np.pi/2)
+            else:
+                element_label_at = 0
+
+        if isinstance(names, FinSet):
+            self.finset = names
+            names = names.elements
+        else:
+            self.finset = FinSet(names)
+        self.elements = names
+        n = len(names)
+
+        if set_name:
+            self.set_name = TextMobject(str(set_name), **kwargs).move_to(n/2 * UP)
+            self.add(self.set_name)
+
+        positions = self.get_element_positions(n, set_element_lines, set_orientation)
+        compact = set_draw_dots and n >= self.compact_dots_threshold
+        if compact:
+            self.cloud = DotCloud(positions, **kwargs)
+            self.add(self.cloud)
+            self.dots = LazyDotList(self)
+            # Labels are placed next to a stand-in for each dot
+            label_dot = Dot(**kwargs)
+            label_dots = (label_dot.move_to(position) for position in positions)
+        else:
+            self.dots = [Dot(position, **kwargs) for position in positions]
+            label_dots = self.dots
+
+        self.labels = []
+        for (dot, name) in zip(label_dots, names):
+            if set_draw_dots and not compact:
+                self.add(dot)
+            if set_draw_labels:
+                label = TextMobject(str(name), **kwargs).scale(0.8).next_to(dot, element_label_at)
+                self.labels.append(label)
+                self.add(label)
+
+        if not set_draw_dots:
+            self.dots = self.labels
+
+        if set_boundary:
+            self.bag = Circle(**kwargs)
+            self.bag.surround(self)
+            self.add(self.bag)
+
+    def get_element_positions(self, n, set_element_lines, set_orientation):
+        """
+        Centers of the n elements, in lines of line_k elements along
+        set_orientation, every other line shifted by half an element.
+        """
+        line_k = 1 + (n - 1) // set_element_lines
+        dx = set_orientation/2
+        dy = rotate_vector(dx, np.pi/2)
+        start = - ((line_k - 1) * dx / 2 + (set_element_lines - 1) * dy / 2)
+        i = np.arange(n)[:, None]
+        return start + (i % line_k + 0.5 * ((i // line_k) % 2)) * dx + (i // line_k) * dy
+
+
+class FiniteMapping(VMobject):
+    """
+    A mapping f from set_from to set_to, with one arrow from each
+    element x of set_from to f(x) in set_to.
+
+    When f is a FinFunction between the FinSets of the two bags, its
+    table gives the targets; otherwise f is called on every element
+    and targets are found through an element -> index map.  The geometry
+    of all arrows is computed at once.  Mappings with at least
+    compound_arrows_threshold arrows are kept as a single ArrowBundle
+    whose arrows split off on access through .arrows[i]; smaller ones
+    have one MappingArrow per element as submobjects.
+    """
+    CONFIG = {
+        "tip_length": 0.15,
+        "arrow_stroke_width": 2,
+        "arrow_buff": 0.1,
+        "max_tip_length_to_length_ratio": 0.25,
+        "max_stroke_width_to_length_ratio": 5,
+        "compound_arrows_threshold": 100,
+    }
+
+    def __init__(self, set_from, set_to, f, f_name=None, **kwargs):
+        digest_config(self, kwargs)
+        VMobject.__init__(self, **kwargs)
+        self.set_from = set_from
+        self.set_to = set_to
+        self.arrow_config = dict(kwargs, stroke_width=self.arrow_stroke_width)
+
+        targets = self.get_targets(f)
+        shafts, tips, lengths = self.get_arrow_geometry(targets)
+
+        if len(targets) >= self.compound_arrows_threshold:
+            self.bundle = ArrowBundle(shafts, tips, **self.arrow_config)
+            self.add(self.bundle)
+            self.arrows = LazyArrowList(self)
+        else:
+            self.arrows = []
+            stroke_widths = np.minimum(
+                self.arrow_stroke_width,
+                self.max_stroke_width_to_length_ratio * lengths,
+            )
+            for shaft, tip, stroke_width in zip(shafts, tips, stroke_widths):
+                arrow = MappingArrow(shaft, tip, **self.arrow_config)
+                arrow.set_stroke(width=stroke_width, family=False)
+                self.arrows.append(arrow)
+                self.add(arrow)
+
+        if f_name:
+            self.f_name = TextMobject(str(f_name), **kwargs).next_to(self, UP)
+            self.add(self.f_name)
+
+    @classmethod
+    def for_each(cls, set_from, set_to, functions, **kwargs):
+        """
+        A mapping for each of `functions`, for example the FinFunctions
+        of a HomSet(set_from.finset, set_to.finset), each only made when
+        it is taken from the generator.
+        """
+        for f in functions:
+            yield cls(set_from, set_to, f, **kwargs)
+
+    def get_targets(self, f):
+        if isinstance(f, FinFunction) and \
+                getattr(self.set_from, "finset", None) is f.domain and \
+                getattr(self.set_to, "finset", None) is f.codomain:
+            return f.table
+        index_of = get_index_map(self.set_to.elements)
+        return np.array(
+            [index_of(f(x)) for x in self.set_from.elements],
+            dtype=int,
+        )
+
+    def get_arrow_geometry(self, targets):
+        centers_from = get_element_centers(self.set_from.dots)
+        centers_to = get_element_centers(self.set_to.dots)[targets]
+        if len(targets) == 0:
+            empty = np.zeros((0, 3))
+            return empty.reshape((0, 4, 3)), empty.reshape((0, 12, 3)), np.zeros(0)
+
+        vects = centers_to - centers_from
+        norms = np.linalg.norm(vects, axis=1)
+        units = np.zeros(vects.shape)
+        units[norms > 0] = vects[norms > 0] / norms[norms > 0, None]
+
+        clouds_from = get_element_boundary_point_clouds(self.set_from.dots)
+        clouds_to = get_element_boundary_point_clouds(self.set_to.dots)[targets]
+        starts = get_boundary_points(clouds_from, units)
+        ends = get_boundary_points(clouds_to, -units)
+        return get_arrow_points(
+            starts, ends,
+            tip_length=self.tip_length,
+            buff=self.arrow_buff,
+            max_tip_length_to_length_ratio=self.max_tip_length_to_length_ratio,
+        )
@@ -0,0 +1,527 @@
+"""
+Finite sets and functions between them, computed with index arrays.
+
+The elements of a FinSet are numbered 0, ..., n-1 in order, and a
+FinFunction is the array of the indices of its values, its table, so
+that composing functions, pairing them, or checking that two of them
+agree is a NumPy operation over all elements at once.  Products,
+coproducts, equalizers and pullbacks come with their projections or
+injections and universal maps:
+
+    A = FinSet(["2", "3", "4"])
+    B = FinSet(["$\\clubsuit$", "$\\spadesuit$"])
+    AxB = product(A, B, pair=lambda a, b: a + b)
+    pi1, pi2 = AxB.projections
+    h = AxB.pairing(f, g)       # <f, g>, with pi1 @ h == f, pi2 @ h == g
+
+Elements of constructed sets are only built when they are asked for,
+so sets with millions of elements are fine as long as nothing lists
+them.  Python functions on elements are called once per element by
+FinFunction.from_function, and nowhere else.
+
+FiniteNamedSetBag and FiniteMapping draw FinSets and FinFunctions
+directly.
+"""
+import itertools
+
+import numpy as np
+
+
+def get_index_map(elements):
+    """
+    Returns a function giving the position of an element in `elements`,
+    looked up in a dict when the elements are hashable.
+    """
+    index = {}
+    try:
+        for i, x in enumerate(elements):
+            index.setdefault(x, i)
+    except TypeError:
+        return list(elements).index
+    return index.__getitem__
+
+
+def compose_tables(g_tables, f_tables):
+    """
+    Tables of g o f for tables of f: A -> B and g: B -> C, where either
+    may have leading batch dimensions, which are broadcast.
+    """
+    g_tables = np.asarray(g_tables)
+    f_tables = np.asarray(f_tables)
+    if g_tables.ndim == 1:
+        return g_tables[f_tables]
+    batch_shape = np.broadcast_shapes(g_tables.shape[:-1], f_tables.shape[:-1])
+    return np.take_along_axis(
+        np.broadcast_to(g_tables, batch_shape + g_tables.shape[-1:]),
+        np.broadcast_to(f_tables, batch_shape + f_tables.shape[-1:]),
+        axis=-1,
+    )
+
+
+class FinSet(object):
+    """
+    A finite set, given by its elements in order.
+    """
+
+    def __init__(self, elements):
+        if elements is None:
+            raise Exception("A FinSet needs its elements")
+        self.elements = list(elements)
+        self.index_map = None
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, len(self))
+
+    def index(self, x):
+        if self.index_map is None:
+            self.index_map = get_index_map(self.elements)
+        try:
+            return self.index_map(x)
+        except (KeyError, TypeError, ValueError):
+            raise Exception("{!r} is not an element of {}".format(x, self))
+
+    def indices(self, xs):
+        return np.array([self.index(x) for x in xs], dtype=int)
+
+    def identity(self):
+        return FinFunction(self, self, np.arange(len(self)))
+
+    def constant(self, codomain, y):
+        """
+        The function from this set to `codomain` with the value y.
+        """
+        return FinFunction(self, codomain, np.full(len(self), codomain.index(y)))
+
+
+class FinFunction(object):
+    """
+    A function from `domain` to `codomain`, whose value at the element
+    number i of domain is the element number table[i] of codomain.
+    """
+
+    def __init__(self, domain, codomain, table):
+        table = np.asarray(table, dtype=int)
+        if table.shape != (len(domain),):
+            raise Exception("A function on {} needs {} values, not {}".format(
+                domain, len(domain), table.shape,
+            ))
+        if len(table) and (table.min() < 0 or table.max() >= len(codomain)):
+            raise Exception("Values out of range for {}".format(codomain))
+        self.domain = domain
+        self.codomain = codomain
+        self.table = table
+
+    @classmethod
+    def from_function(cls, domain, codomain, f):
+        """
+        The function x -> f(x), with f called once for every element.
+        """
+        return cls(domain, codomain, codomain.indices(f(x) for x in domain.elements))
+
+    def __call__(self, x):
+        return self.codomain.elements[self.table[self.domain.index(x)]]
+
+    def __repr__(self):
+        return "FinFunction({} -> {})".format(self.domain, self.codomain)
+
+    def compose(self, other):
+        """
+        self o other, that is other first.
+        """
+        if other.codomain is not self.domain:
+            raise Exception("Cannot compose {} after {}".format(self, other))
+        return FinFunction(other.domain, self.codomain, self.table[other.table])
+
+    __matmul__ = compose
+
+    def disagreements(self, other):
+        """
+        Indices of the elements of the domain where self and other differ.
+        """
+        if other.domain is not self.domain or other.codomain is not self.codomain:
+            raise Exception("Cannot compare {} with {}".format(self, other))
+        return np.flatnonzero(self.table != other.table)
+
+    def equals(self, other):
+        return len(self.disagreements(other)) == 0
+
+    def image(self):
+        return SubSet(self.codomain, np.unique(self.table))
+
+    def is_injective(self):
+        return len(np.unique(self.table)) == len(self.table)
+
+    def is_surjective(self):
+        return len(np.unique(self.table)) == len(self.codomain)
+
+
+class ConstructedSet(FinSet):
+    """
+    A FinSet whose elements are only built, by the get_elements of its
+    class, when they are first asked for.  Its class also defines
+    __len__, which must not need them.
+    """
+
+    def __init__(self):
+        self.element_list = None
+        self.index_map = None
+
+    @property
+    def elements(self):
+        if self.element_list is None:
+            self.element_list = self.get_elements()
+        return self.element_list
+
+
+class SubSet(ConstructedSet):
+    """
+    The elements of `parent` at the sorted `indices`, with the
+    inclusion into parent.
+    """
+
+    def __init__(self, parent, indices):
+        ConstructedSet.__init__(self)
+        self.parent = parent
+        self.parent_indices = np.asarray(indices, dtype=int)
+        self.inclusion = FinFunction(self, parent, self.parent_indices)
+
+    def __len__(self):
+        return len(self.parent_indices)
+
+    def get_elements(self):
+        elements = self.parent.elements
+        return [elements[i] for i in self.parent_indices]
+
+    def restrict(self, f):
+        """
+        The function f on parent, restricted to this subset.
+        """
+        return f.compose(self.inclusion)
+
+    def factor(self, h):
+        """
+        The function k into this subset with inclusion o k = h, for h
+        whose values all lie in it.
+        """
+        positions = np.searchsorted(self.parent_indices, h.table)
+        positions = np.minimum(positions, len(self) - 1)
+        if len(h.table) and (
+                len(self) == 0 or
+                (self.parent_indices[positions] != h.table).any()):
+            raise Exception("{} does not factor through {}".format(h, self))
+        return FinFunction(h.domain, self, positions)
+
+
+class ProductSet(ConstructedSet):
+    """
+    The product of A and B, whose element number i_b * |A| + i_a is
+    pair(a, b) for the element number i_a of A and i_b of B, that is in
+    the order of [pair(a, b) for b in B for a in A].
+    """
+
+    def __init__(self, A, B, pair=None):
+        ConstructedSet.__init__(self)
+        self.factors = (A, B)
+        self.pair = pair or (lambda a, b: (a, b))
+        indices = np.arange(len(A) * len(B))
+        self.projections = (
+            FinFunction(self, A, indices % max(len(A), 1)),
+            FinFunction(self, B, indices // max(len(A), 1)),
+        )
+
+    def __len__(self):
+        A, B = self.factors
+        return len(A) * len(B)
+
+    def get_elements(self):
+        A, B = self.factors
+        return [self.pair(a, b) for b in B.elements for a in A.elements]
+
+    def pairing(self, f, g):
+        """
+        <f, g>: D -> A x B, for f: D -> A and g: D -> B.
+        """
+        A, B = self.factors
+        if f.codomain is not A or g.codomain is not B or f.domain is not g.domain:
+            raise Exception("Cannot pair {} and {} into {}".format(f, g, self))
+        return FinFunction(f.domain, self, g.table * len(A) + f.table)
+
+
+class CoproductSet(ConstructedSet):
+    """
+    The disjoint union of A and B, the elements of A first, each
+    element a of A being left(a) and each b of B being right(b).
+    """
+
+    def __init__(self, A, B, left=None, right=None):
+        ConstructedSet.__init__(self)
+        self.summands = (A, B)
+        self.left = left or (lambda a: (0, a))
+        self.right = right or (lambda b: (1, b))
+        self.injections = (
+            FinFunction(A, self, np.arange(len(A))),
+            FinFunction(B, self, len(A) + np.arange(len(B))),
+        )
+
+    def __len__(self):
+        A, B = self.summands
+        return len(A) + len(B)
+
+    def get_elements(self):
+        A, B = self.summands
+        return [self.left(a) for a in A.elements] + [self.right(b) for b in B.elements]
+
+    def copairing(self, f, g):
+        """
+        [f, g]: A + B -> C, for f: A -> C and g: B -> C.
+        """
+        A, B = self.summands
+        if f.domain is not A or g.domain is not B or f.codomain is not g.codomain:
+            raise Exception("Cannot copair {} and {} from {}".format(f, g, self))
+        return FinFunction(self, f.codomain, np.concatenate([f.table, g.table]))
+
+
+def product(A, B, pair=None):
+    return ProductSet(A, B, pair)
+
+
+def coproduct(A, B, left=None, right=None):
+    return CoproductSet(A, B, left, right)
+
+
+def equalizer(f, g):
+    """
+    The subset of the domain of f and g where they agree.  Its inclusion
+    e satisfies f o e = g o e, and any h with f o h = g o h factors
+    through it as h = e o equalizer.factor(h).
+    """
+    if f.domain is not g.domain or f.codomain is not g.codomain:
+        raise Exception("Cannot equalize {} and {}".format(f, g))
+    return SubSet(f.domain, np.flatnonzero(f.table == g.table))
+
+
+def pullback(f, g, pair=None):
+    """
+    The pairs pair(a, b) with f(a) = g(b), for f: A -> C and g: B -> C,
+    as a subset of product(A, B, pair) with the two projections in
+    .projections, so that f o p1 = g o p2.
+    """
+    if f.codomain is not g.codomain:
+        raise Exception("Cannot pull back {} and {}".format(f, g))
+    AxB = product(f.domain, g.domain, pair)
+    pi1, pi2 = AxB.projections
+    P = equalizer(f.compose(pi1), g.compose(pi2))
+    P.projections = (pi1.compose(P.inclusion), pi2.compose(P.inclusion))
+    return P
+
+
+def is_commuting_square(top, left, right, bottom):
+    """
+    Whether bottom o left = right o top, for the square
+
+        A --top--> B
+        |          |
+      left       right
+        |          |
+        v          v
+        C -bottom-> D
+    """
+    return bottom.compose(left).equals(right.compose(top))
+
+
+class HomSet(object):
+    """
+    The functions from A to B, or those of them satisfying some
+    constraints, enumerated lazily in batches of tables.
+
+    Each element a of A may be limited to a set of allowed values, and
+    the functions are every choice of one allowed value per element,
+    in the order of itertools.product over A, so the last elements of A
+    change fastest.  Constraints that only limit single values, like
+    composing_to with after, narrow these sets and so cut down the
+    enumeration itself; any other constraint is a vectorized predicate
+    on a batch of tables, applied to each batch as it is made.
+
+        injections = HomSet(A, B).injective()
+        for f in itertools.islice(injections, 5):
+            ...
+    """
+
+    def __init__(self, A, B, allowed_values=None, predicates=(), distinct_values=False,
+                 batch_size=4096):
+        self.A = A
+        self.B = B
+        if allowed_values is None:
+            allowed_values = [np.arange(len(B))] * len(A)
+        self.allowed_values = [np.asarray(values, dtype=int) for values in allowed_values]
+        self.predicates = list(predicates)
+        # Whether only injections are wanted, so that choices repeating
+        # a value can be skipped while enumerating
+        self.distinct_values = distinct_values
+        self.batch_size = batch_size
+
+    def __repr__(self):
+        return "HomSet({} -> {})".format(self.A, self.B)
+
+    def copy(self, allowed_values=None, predicates=(), distinct_values=False):
+        if allowed_values is None:
+            allowed_values = self.allowed_values
+        return HomSet(
+            self.A, self.B, allowed_values,
+            self.predicates + list(predicates),
+            self.distinct_values or distinct_values,
+            self.batch_size,
+        )
+
+    def get_n_candidates(self):
+        """
+        How many functions are enumerated before the predicates, as a
+        Python int, since it is easily more than 2^64.
+        """
+        result = 1
+        for values in self.allowed_values:
+            result *= len(values)
+        return result
+
+    def get_batch_elements(self):
+        """
+        Number of trailing elements of A whose values are enumerated
+        together within a batch.
+        """
+        n_low = 0
+        size = 1
+        for values in reversed(self.allowed_values):
+            if n_low > 0 and size * len(values) > self.batch_size:
+                break
+            size *= len(values)
+            n_low += 1
+        return n_low
+
+    def iter_candidate_batches(self):
+        n = len(self.A)
+        if n == 0:
+            yield np.zeros((1, 0), dtype=int)
+            return
+        if self.get_n_candidates() == 0:
+            return
+        n_high = n - self.get_batch_elements()
+        high_values = self.allowed_values[:n_high]
+        low_values = self.allowed_values[n_high:]
+        # Every combination of the low values, as columns
+        grids = np.meshgrid(*low_values, indexing="ij")
+        low_tables = np.stack([grid.reshape(-1) for grid in grids], axis=1)
+        for high in self.iter_high_values(high_values):
+            tables = low_tables
+            if self.distinct_values and n_high > 0:
+                tables = tables[~np.isin(tables, high).any(axis=1)]
+            high_tables = np.empty((len(tables), n), dtype=int)
+            high_tables[:, :n_high] = high
+            high_tables[:, n_high:] = tables
+            yield high_tables
+
+    def iter_high_values(self, high_values):
+        if not self.distinct_values:
+            yield from itertools.product(*high_values)
+            return
+
+        def extend(prefix):
+            if len(prefix) == len(high_values):
+                yield prefix
+                return
+            for value in high_values[len(prefix)]:
+                if value not in prefix:
+                    yield from extend(prefix + (value,))
+        yield from extend(())
+
+    def iter_batches(self):
+        """
+        Tables of the functions, as arrays of shape (k, |A|), with
+        every predicate applied.
+        """
+        for tables in self.iter_candidate_batches():
+            for predicate in self.predicates:
+                tables = tables[predicate(tables)]
+                if len(tables) == 0:
+                    break
+            if len(tables):
+                yield tables
+
+    def __iter__(self):
+        for tables in self.iter_batches():
+            for table in tables:
+                yield FinFunction(self.A, self.B, table)
+
+    def count(self):
+        return sum(len(tables) for tables in self.iter_batches())
+
+    def get_candidate(self, index):
+        """
+        The function number `index` in the enumeration before the
+        predicates, computed directly from its digits.
+        """
+        if not 0 <= index < self.get_n_candidates():
+            raise IndexError("function index out of range")
+        table = []
+        for values in reversed(self.allowed_values):
+            index, digit = divmod(index, len(values))
+            table.append(values[digit])
+        return FinFunction(self.A, self.B, table[::-1])
+
+    def where(self, predicate):
+        """
+        Only the functions whose tables `predicate` accepts: called with
+        an array of shape (k, |A|), it returns a boolean array of k.
+        """
+        return self.copy(predicates=[predicate])
+
+    def injective(self):
+        if len(self.A) > len(self.B):
+            return self.copy(allowed_values=[[]] * len(self.A))
+
+        def is_injective(tables):
+            ordered = np.sort(tables, axis=1)
+            return (ordered[:, 1:] != ordered[:, :-1]).all(axis=1)
+        return self.copy(predicates=[is_injective], distinct_values=True)
+
+    def surjective(self):
+        n_values = len(self.B)
+
+        def is_surjective(tables):
+            hits = np.zeros((len(tables), n_values), dtype=bool)
+            hits[np.arange(len(tables))[:, None], tables] = True
+            return hits.all(axis=1)
+        return self.where(is_surjective)
+
+    def composing_to(self, target, before=None, after=None):
+        """
+        Only the functions h with after o h o before = target, where
+        before: D -> A and after: B -> C are optional.
+        """
+        if after is not None:
+            if before is None:
+                # Each h(a) must be one of the values after sends to
+                # target(a), which narrows the enumeration itself
+                return self.copy(allowed_values=[
+                    np.intersect1d(values, np.flatnonzero(after.table == t))
+                    for values, t in zip(self.allowed_values, target.table)
+                ])
+            after_table = after.table
+        else:
+            after_table = np.arange(len(self.B))
+        before_table = np.arange(len(self.A)) if before is None else before.table
+
+        def composes_to_target(tables):
+            return (after_table[tables[:, before_table]] == target.table).all(axis=1)
+        return self.where(composes_to_target)
+
+    def sections_of(self, p):
+        """
+        The sections s of p: B -> A, with p o s the identity of A.
+        """
+        return self.composing_to(self.A.identity(), after=p)
@@ -0,0 +1,94 @@
+"""
+Circles, dots and lines given by a few parameters, whose points can be
+rewritten in place.
+
+Updaters which rebuild a mobject on every frame and copy it over with
+become() allocate a whole new mobject per frame.  These only overwrite
+the points array they already have.
+"""
+import numpy as np
+
+from manimlib.mobject.geometry import Circle
+from manimlib.mobject.geometry import Dot
+from manimlib.mobject.geometry import Line
+
+
+class ParametricMobject(object):
+    """
+    Mixin for mobjects determined by a few parameters, which each class
+    using it sets with its own set_parameters.
+    """
+
+    def add_parametric_updater(self, get_parameters):
+        """
+        Moves the mobject to the parameters returned by get_parameters()
+        on every frame.
+        """
+        self.add_updater(lambda mob: mob.set_parameters(*get_parameters()))
+        return self
+
+
+def get_points_array(mobject, shape):
+    # After a transform the mobject may have a different number of points
+    if mobject.points.shape != shape:
+        mobject.points = np.zeros(shape)
+    return mobject.points
+
+
+class ParametricCircle(ParametricMobject, Circle):
+    """
+    A Circle keeping its points on the unit circle, from which it is
+    placed by set_center_and_radius.
+    """
+
+    def generate_points(self):
+        self.set_pre_positioned_points()
+        self.unit_points = self.points.copy()
+        self.set_center_and_radius(self.arc_center, self.radius)
+
+    def set_center_and_radius(self, center, radius):
+        self.arc_center = center
+        self.radius = radius
+        points = get_points_array(self, self.unit_points.shape)
+        np.multiply(self.unit_points, radius, out=points)
+        points += center
+        return self
+
+    def set_parameters(self, center, radius):
+        return self.set_center_and_radius(center, radius)
+
+
+class ParametricDot(ParametricCircle, Dot):
+    def set_center(self, center):
+        return self.set_center_and_radius(center, self.radius)
+
+    def set_parameters(self, center):
+        return self.set_center(center)
+
+
+class ParametricLine(ParametricMobject, Line):
+    """
+    A straight Line whose start and end are set with set_start_and_end.
+    As for Line, either of them may be a mobject, and the line then
+    starts or ends on its boundary.
+    """
+
+    def generate_points(self):
+        alphas = np.linspace(0, 1, self.n_points_per_cubic_curve)
+        self.start_weights = (1 - alphas)[:, np.newaxis]
+        self.end_weights = alphas[:, np.newaxis]
+        Line.generate_points(self)
+
+    def set_start_and_end(self, start, end):
+        self.set_start_and_end_attrs(start, end)
+        if self.path_arc:
+            self.generate_points()
+            return self
+        points = get_points_array(self, (len(self.start_weights), 3))
+        np.multiply(self.start_weights, self.start, out=points)
+        points += self.end_weights * self.end
+        self.account_for_buff()
+        return self
+
+    def set_parameters(self, start, end):
+        return self.set_start_and_end(start, end)
@@ -0,0 +1,174 @@
+"""
+Z-index layers for the mobjects of a scene.
+
+Manim draws the mobjects of a scene in the order of scene.mobjects, and
+bring_to_front/bring_to_back reorder that list by removing the mobjects
+and adding them again, which walks the family of every mobject in the
+scene.  An updater which brings a mobject to the front on every frame,
+as ParabolaExample's does, pays for that on every frame, although the
+order is already right after the first one.
+
+In a scene with LayeredSceneMixin every mobject has a z-index, 0 unless
+set with set_z_index, and scene.mobjects is kept sorted by it: mobjects
+of a higher z-index are drawn in front of those of a lower one, whenever
+they were added, and mobjects of the same z-index in the order they were
+added, as before.  Foreground mobjects stay in front of all layers.
+
+bring_to_front and bring_to_back move mobjects to the front or the back
+of their own layer.  The scene keeps the position of every mobject and
+where each layer starts and ends, worked out again only when
+scene.mobjects or a z-index changed, so finding that the mobjects are
+there already only takes their positions and their families.  That
+takes manim's word for it that no mobject of the scene is part of
+another one's family, which add makes sure of, unless a group is changed
+after it was added.
+
+Scenes which use layers derive from LayeredScene rather than Scene.
+Without set_z_index, every mobject is in layer 0 and the frames are the
+same as those of a plain Scene.
+"""
+from manimlib.scene.scene import Scene
+
+# Bumped by set_z_index, so that scenes know when to sort again
+z_index_version = 0
+
+
+def set_z_index(z_index, *mobjects):
+    """
+    Puts `mobjects` and their families into layer `z_index`.  A scene
+    they are in sorts them into place on its next frame.
+    """
+    global z_index_version
+    for mobject in mobjects:
+        for mob in mobject.get_family():
+            mob.z_index = z_index
+    z_index_version += 1
+    return mobjects
+
+
+def get_z_index(mobject):
+    return getattr(mobject, "z_index", 0)
+
+
+class LayerPositions(object):
+    """
+    Where each mobject of a scene's mobject list is, and the first and
+    end index of each layer in it, keyed as by get_layer_key.
+    """
+
+    def __init__(self, mobjects, foreground_mobjects, version):
+        self.mobjects = mobjects
+        self.length = len(mobjects)
+        self.version = version
+        self.foreground = set(map(id, foreground_mobjects))
+        self.indices = {}
+        self.layers = {}
+        for index, mob in enumerate(mobjects):
+            self.indices[id(mob)] = index
+            key = self.get_key(mob)
+            start = self.layers.get(key, (index, index))[0]
+            self.layers[key] = (start, index + 1)
+        # Scene.add puts the foreground mobjects back in this order
+        tail = mobjects[len(mobjects) - len(foreground_mobjects):]
+        self.foreground_in_order = len(tail) == len(foreground_mobjects) and \
+            all(a is b for a, b in zip(tail, foreground_mobjects))
+
+    def get_key(self, mobject):
+        return (id(mobject) in self.foreground, get_z_index(mobject))
+
+    def is_valid_for(self, mobjects, version):
+        # Manim always changes the list by making a new one, or by adding
+        # to one it just made
+        return mobjects is self.mobjects and len(mobjects) == self.length and \
+            version == self.version
+
+
+class LayeredSceneMixin(object):
+    def setup(self):
+        self.layer_positions = None
+        self.sorted_z_index_version = None
+        super().setup()
+
+    def get_layer_key(self):
+        foreground = set(map(id, self.foreground_mobjects))
+        return lambda mob: (id(mob) in foreground, get_z_index(mob))
+
+    def sort_layers(self):
+        # A stable sort, so each layer keeps its order; a list which is
+        # sorted already is only looked at
+        key = self.get_layer_key()
+        keys = [key(mob) for mob in self.mobjects]
+        if any(a > b for a, b in zip(keys, keys[1:])):
+            self.mobjects = sorted(self.mobjects, key=key)
+        self.sorted_z_index_version = z_index_version
+        return self
+
+    def get_layer_positions(self):
+        if self.sorted_z_index_version != z_index_version:
+            self.sort_layers()
+        positions = self.layer_positions
+        version = z_index_version
+        if positions is None or not positions.is_valid_for(self.mobjects, version):
+            positions = LayerPositions(
+                self.mobjects, self.foreground_mobjects, version,
+            )
+            self.layer_positions = positions
+        return positions
+
+    def is_in_order(self, mobjects, in_front):
+        """
+        Whether moving `mobjects` to the front (or back) of their layers
+        would leave scene.mobjects as it is: those of each layer must
+        already be its last (or first) mobjects, in the same order.
+        """
+        positions = self.get_layer_positions()
+        if not positions.foreground_in_order:
+            return False
+        moved = {}
+        for mobject in mobjects:
+            index = positions.indices.get(id(mobject))
+            key = positions.get_key(mobject)
+            if index is None or key[0]:
+                return False
+            moved.setdefault(key, []).append(index)
+        for key, indices in moved.items():
+            start, end = positions.layers[key]
+            if in_front:
+                expected = range(end - len(indices), end)
+            else:
+                expected = range(start, start + len(indices))
+            if indices != list(expected):
+                return False
+        if in_front:
+            # add would also take their submobjects out of the scene
+            for mobject in mobjects:
+                family = mobject.get_family()[1:]
+                if any(id(mob) in positions.indices for mob in family):
+                    return False
+        return True
+
+    def add(self, *mobjects):
+        super().add(*mobjects)
+        return self.sort_layers()
+
+    def bring_to_front(self, *mobjects):
+        if self.is_in_order(mobjects, in_front=True):
+            return self
+        # Scene.bring_to_front adds them again, which sorts them in
+        return super().bring_to_front(*mobjects)
+
+    def bring_to_back(self, *mobjects):
+        if self.is_in_order(mobjects, in_front=False):
+            return self
+        super().bring_to_back(*mobjects)
+        return self.sort_layers()
+
+    def update_frame(self, *args, **kwargs):
+        # For z-indices set since the mobjects were last sorted
+        if self.sorted_z_index_version != z_index_version:
+            self.sort_layers()
+        return super().update_frame(*args, **kwargs)
+
+
+class LayeredScene(LayeredSceneMixin, Scene):
+    pass
@@ -0,0 +1,60 @@
+"""
+The options of etcslib.render which change how a scene renders, each
+of them a subclass of the scene made by the with_* function of its
+module.  etcslib.render, its workers in etcslib.parallel and
+etcslib.preview all apply them with apply_render_options, so that they
+wrap each other in the same order wherever a scene renders.
+"""
+from etcslib.batched_transforms import with_batched_transforms
+from etcslib.checkpoints import with_checkpoints
+from etcslib.compact import with_compact_mobjects
+from etcslib.repeated_frames import with_repeated_frames
+from etcslib.segments import with_parallel_segments
+from etcslib.static_layers import with_static_layers
+from etcslib.streaming import with_streaming
+from etcslib.tiles import with_tiled_rasterization
+
+# Every option, switched off
+DEFAULT_RENDER_OPTIONS = {
+    "static_layers": False,
+    # Passed on to with_tiled_rasterization
+    "tile_threads": None,
+    "stream": False,
+    "batch_transforms": False,
+    "repeat_frames": False,
+    "compact": False,
+    # Keyword arguments of with_checkpoints
+    "checkpoint_options": None,
+    # Keyword arguments of with_parallel_segments
+    "segment_options": None,
+}
+
+
+def apply_render_options(scene_class, options):
+    """
+    scene_class with the options in `options` applied, a dict with any
+    of the keys of DEFAULT_RENDER_OPTIONS.  The camera options come
+    first and the parallel segments last, since they fork processes
+    running the scene with everything else.
+    """
+    for key in options:
+        if key not in DEFAULT_RENDER_OPTIONS:
+            raise Exception("No render option named {}".format(key))
+    options = dict(DEFAULT_RENDER_OPTIONS, **options)
+    if options["static_layers"]:
+        scene_class = with_static_layers(scene_class)
+    if options["tile_threads"] is not None:
+        scene_class = with_tiled_rasterization(scene_class, options["tile_threads"])
+    if options["stream"]:
+        scene_class = with_streaming(scene_class)
+    if options["batch_transforms"]:
+        scene_class = with_batched_transforms(scene_class)
+    if options["repeat_frames"]:
+        scene_class = with_repeated_frames(scene_class)
+    if options["compact"]:
+        scene_class = with_compact_mobjects(scene_class)
+    if options["checkpoint_options"] is not None:
+        scene_class = with_checkpoints(scene_class, **options["checkpoint_options"])
+    if options["segment_options"] is not None:
+        scene_class = with_parallel_segments(scene_class, **options["segment_options"])
+    return scene_class
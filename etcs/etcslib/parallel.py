@@ -0,0 +1,144 @@
+"""
+Rendering several scenes of one file at the same time, each in its own
+worker process.
+
+Every worker has a directory <media_dir>/workers/<pid> of its own, where
+it compiles TeX and keeps a log per scene.  Compiled TeX goes into the
+shared TEX_DIR cache, and videos go where manim would put them anyway.
+"""
+import contextlib
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+
+import manimlib.config
+import manimlib.constants as consts
+import manimlib.scene.scene_file_writer as scene_file_writer
+
+from etcslib.alignment import install_alignment_cache
+from etcslib.options import apply_render_options
+from etcslib.tex import install_tex_cache
+
+
+DIRECTORY_NAMES = [
+    "MEDIA_DIR",
+    "VIDEO_DIR",
+    "VIDEO_OUTPUT_DIR",
+    "TEX_DIR",
+    "TEXT_DIR",
+]
+
+worker_modules = {}
+
+
+def get_worker_dir():
+    return os.path.join(consts.MEDIA_DIR, "workers", str(os.getpid()))
+
+
+def guarantee_existence(path):
+    # As manim's, but without failing when another worker creates the
+    # directory between checking for it and making it
+    os.makedirs(path, exist_ok=True)
+    return os.path.abspath(path)
+
+
+def init_worker(directories):
+    # Workers may be spawned rather than forked, and then they
+    # would not see the directories set up from the command line
+    for name, value in directories.items():
+        setattr(consts, name, value)
+    os.makedirs(get_worker_dir(), exist_ok=True)
+    scene_file_writer.guarantee_existence = guarantee_existence
+    install_tex_cache(work_dir=get_worker_dir())
+    install_alignment_cache()
+
+
+def get_worker_module(file_name):
+    if file_name not in worker_modules:
+        worker_modules[file_name] = manimlib.config.get_module(file_name)
+    return worker_modules[file_name]
+
+
+def render_scene(file_name, scene_name, scene_kwargs, render_options=None):
+    """
+    Renders one scene in a worker, with all of its output going to a
+    log file.  Returns the seconds it took, the last line of the error
+    if it failed, and the log file.
+    """
+    log_file = os.path.join(get_worker_dir(), scene_name + ".log")
+    start = time.time()
+    error = None
+    with open(log_file, "w") as log, \
+            contextlib.redirect_stdout(log), \
+            contextlib.redirect_stderr(log):
+        try:
+            SceneClass = getattr(get_worker_module(file_name), scene_name)
+            SceneClass = apply_render_options(SceneClass, render_options or {})
+            SceneClass(**scene_kwargs)
+        except Exception as err:
+            traceback.print_exc()
+            error = "{}: {}".format(type(err).__name__, err)
+    return time.time() - start, error, log_file
+
+
+def render_scenes_in_parallel(scene_classes, scene_kwargs, n_workers=None,
+                              render_options=None):
+    """
+    Renders `scene_classes` on a pool of n_workers processes (default:
+    number of cores) and prints how long each took.  Returns the names
+    of the scenes which failed.
+
+    Each scene renders with render_options, as applied by
+    etcslib.options.apply_render_options.
+    """
+    file_name = scene_kwargs["file_writer_config"]["input_file_path"]
+    directories = dict([
+        (name, getattr(consts, name))
+        for name in DIRECTORY_NAMES
+    ])
+    scene_names = [scene_class.__name__ for scene_class in scene_classes]
+    if len(scene_names) == 0:
+        return []
+    results = {}
+    start = time.time()
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=init_worker,
+        initargs=(directories,),
+    ) as pool:
+        futures = dict([
+            (pool.submit(
+                render_scene, file_name, name, scene_kwargs, render_options,
+            ), name)
+            for name in scene_names
+        ])
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                results[name] = future.result()
+            except Exception as err:
+                # The worker itself died
+                results[name] = (0, "{}: {}".format(type(err).__name__, err), None)
+            seconds, error, log_file = results[name]
+            print("{} {} in {:.1f}s".format(
+                name, "failed" if error else "done", seconds,
+            ))
+
+    print("\nRendered {} scenes on {} workers in {:.1f}s:".format(
+        len(scene_names), n_workers or os.cpu_count(), time.time() - start,
+    ))
+    width = max(len(name) for name in scene_names)
+    failures = []
+    for name in scene_names:
+        seconds, error, log_file = results[name]
+        print("  {}  {:7.1f}s  {}".format(
+            name.ljust(width), seconds, "ok" if error is None else "FAILED",
+        ))
+        if error is not None:
+            failures.append(name)
+            print("      {}".format(error))
+            if log_file is not None:
+                print("      see {}".format(log_file))
+    return failures
@@ -0,0 +1,171 @@
+"""
+Paths for MoveAlongPath and friends, parametrized by arc length through
+a table built once per shape of the path.
+"""
+import numpy as np
+
+from manimlib.mobject.types.vectorized_mobject import VMobject
+from manimlib.utils.bezier import bezier
+from manimlib.utils.simple_functions import choose
+
+
+def get_bernstein_basis(degree, ts):
+    """
+    Bernstein polynomials of `degree` at each of `ts`, as a
+    (len(ts), degree + 1) array.
+    """
+    ts = np.asarray(ts, dtype=float)[:, np.newaxis]
+    ks = np.arange(degree + 1)
+    coefficients = np.array([choose(degree, k) for k in ks])
+    return coefficients * ts**ks * (1 - ts)**(degree - ks)
+
+
+class ArcLengthTable(object):
+    """
+    Cumulative arc length of a chain of bezier curves, sampled at
+    samples_per_curve points along each curve, for finding the point
+    at a given proportion of the length by binary search.
+    """
+
+    def __init__(self, points, n_points_per_curve, samples_per_curve=16):
+        self.points = np.array(points)
+        n_curves = len(points) // n_points_per_curve
+        self.curves = self.points[:n_curves * n_points_per_curve].reshape(
+            (n_curves, n_points_per_curve, -1)
+        )
+        self.degree = n_points_per_curve - 1
+
+        ts = np.linspace(0, 1, samples_per_curve + 1)
+        samples = np.einsum(
+            "sk,ckd->csd",
+            get_bernstein_basis(self.degree, ts),
+            self.curves,
+        )
+        chords = np.linalg.norm(np.diff(samples, axis=1), axis=2)
+        self.lengths = np.concatenate([[0], np.cumsum(chords)])
+        # Curve index plus bezier parameter at each entry of lengths
+        self.parameters = np.append(
+            (np.arange(n_curves)[:, np.newaxis] + ts[np.newaxis, :-1]).ravel(),
+            n_curves,
+        )
+
+    def is_valid_for(self, points):
+        """
+        Whether `points` are still those the table was built from, which
+        is compared whole: manim also changes the points of a mobject in
+        place, where any of them may have moved.
+        """
+        return points.shape == self.points.shape and \
+            np.array_equal(points, self.points)
+
+    def get_length(self):
+        return self.lengths[-1]
+
+    def get_parameter(self, alpha):
+        """
+        Curve index plus bezier parameter of the point at proportion
+        `alpha` of the length.
+        """
+        alpha = min(max(alpha, 0), 1)
+        total = self.get_length()
+        if total == 0:
+            return alpha * len(self.curves)
+        target = alpha * total
+        index = int(np.searchsorted(self.lengths, target, side="right"))
+        index = min(max(index, 1), len(self.lengths) - 1)
+        length0, length1 = self.lengths[index - 1:index + 1]
+        parameter0, parameter1 = self.parameters[index - 1:index + 1]
+        if length1 == length0:
+            return parameter0
+        fraction = (target - length0) / (length1 - length0)
+        return parameter0 + fraction * (parameter1 - parameter0)
+
+    def get_parameters(self, alphas):
+        # get_parameter for a whole array of alphas
+        alphas = np.clip(alphas, 0, 1)
+        n_curves = len(self.curves)
+        total = self.get_length()
+        if total == 0:
+            return alphas * n_curves
+        targets = alphas * total
+        indices = np.searchsorted(self.lengths, targets, side="right")
+        indices = np.clip(indices, 1, len(self.lengths) - 1)
+        lengths0 = self.lengths[indices - 1]
+        lengths1 = self.lengths[indices]
+        steps = lengths1 - lengths0
+        fractions = np.divide(
+            targets - lengths0, steps,
+            out=np.zeros(len(targets)),
+            where=steps > 0,
+        )
+        parameters0 = self.parameters[indices - 1]
+        parameters1 = self.parameters[indices]
+        return parameters0 + fractions * (parameters1 - parameters0)
+
+    def points_from_proportions(self, alphas):
+        """
+        Points at each proportion in `alphas` of the length of the path.
+        """
+        parameters = self.get_parameters(np.asarray(alphas, dtype=float))
+        n_curves = len(self.curves)
+        indices = np.minimum(parameters.astype(int), n_curves - 1)
+        basis = get_bernstein_basis(self.degree, parameters - indices)
+        return np.einsum("ck,ckd->cd", basis, self.curves[indices])
+
+    def point_from_proportion(self, alpha):
+        parameter = self.get_parameter(alpha)
+        index = min(int(parameter), len(self.curves) - 1)
+        return bezier(self.curves[index])(parameter - index)
+
+
+class ArcLengthPath(VMobject):
+    """
+    Follows the curve of `obj` at constant speed, from its start to its
+    end, or the other way around if reverse is set.
+
+    The arc length table is rebuilt whenever the points of obj are no
+    longer those it was built from.
+    """
+    CONFIG = {
+        "reverse": False,
+        "samples_per_curve": 16,
+    }
+
+    def __init__(self, obj, **kwargs):
+        VMobject.__init__(self, **kwargs)
+        self.obj = obj
+        self.arc_length_table = None
+        self.add(obj)
+
+    def get_arc_length_table(self):
+        points = self.obj.points
+        table = self.arc_length_table
+        if table is None or not table.is_valid_for(points):
+            table = ArcLengthTable(
+                points,
+                self.obj.n_points_per_cubic_curve,
+                self.samples_per_curve,
+            )
+            self.arc_length_table = table
+        return table
+
+    def points_from_proportions(self, alphas):
+        alphas = np.asarray(alphas, dtype=float)
+        if self.reverse:
+            alphas = 1 - alphas
+        if len(self.obj.points) < self.obj.n_points_per_cubic_curve:
+            return np.repeat([self.obj.get_center()], len(alphas), axis=0)
+        return self.get_arc_length_table().points_from_proportions(alphas)
+
+    def point_from_proportion(self, alpha):
+        if self.reverse:
+            alpha = 1 - alpha
+        if len(self.obj.points) < self.obj.n_points_per_cubic_curve:
+            return self.obj.get_center()
+        return self.get_arc_length_table().point_from_proportion(alpha)
+
+
+class Reverse(ArcLengthPath):
+    CONFIG = {
+        "reverse": True,
+    }
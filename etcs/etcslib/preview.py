@@ -0,0 +1,194 @@
+"""
+A long running preview, which renders scenes again whenever their file
+changes, without starting a new process.
+
+    cd etcs
+    python -m etcslib.preview 05-algebraization-of-geometry.py ParabolaExample -l
+    python -m etcslib.preview set_arrow_test.py -a -l --segment_cache
+
+The scene file is checked for changes every --interval seconds.  When
+it changes, it is loaded again as a new module, and only the scenes
+whose code changed are rendered: a scene depends on its own class, its
+base classes, and every top level definition of the file it uses,
+directly or through other definitions, plus any top level code which
+is not a definition.  Imports are top level definitions too, but
+etcslib and manim are not reloaded, so changes to them need a restart.
+
+Everything which makes a first render slow stays warm in between: the
+imports, the TeX cache, the geometry parsed from svg files, the
+alignment plans of etcslib.alignment and, with --segment_cache, the
+animations which did not change.  While a scene renders, its latest
+frame is written to <media_dir>/preview/<scene>.png, for an image
+viewer which reloads files as they change.
+"""
+import argparse
+import os
+import time
+import traceback
+
+import numpy as np
+
+import manimlib.config
+import manimlib.constants as consts
+
+from etcslib.alignment import install_alignment_cache
+from etcslib.config import get_scene_classes
+from etcslib.config import get_scene_kwargs
+from etcslib.config import parse_cli
+from etcslib.config import subclass_scene
+from etcslib.options import apply_render_options
+from etcslib.scene_digests import get_scene_digests
+from etcslib.tex import install_svg_cache
+from etcslib.tex import install_tex_cache
+
+
+class PreviewSceneMixin(object):
+    CONFIG = {
+        # Seconds of rendering between two preview images
+        "preview_interval": 0.5,
+    }
+
+    def setup(self):
+        directory = os.path.join(consts.MEDIA_DIR, "preview")
+        os.makedirs(directory, exist_ok=True)
+        self.preview_file = os.path.join(directory, type(self).__name__ + ".png")
+        self.last_preview = None
+        super().setup()
+
+    def add_frames(self, *frames):
+        super().add_frames(*frames)
+        # With parallel segments, the main process only sees hashes
+        if frames and isinstance(frames[-1], np.ndarray):
+            now = time.perf_counter()
+            if self.last_preview is None or now - self.last_preview > self.preview_interval:
+                self.write_preview()
+                self.last_preview = now
+
+    def tear_down(self):
+        super().tear_down()
+        if self.last_preview is not None:
+            self.write_preview()
+
+    def write_preview(self):
+        # Renamed into place, so that a viewer never reads half a file
+        temp_file = self.preview_file + ".tmp.png"
+        self.camera.get_image().save(temp_file)
+        os.replace(temp_file, self.preview_file)
+
+
+def with_preview(scene_class):
+    """
+    scene_class keeping a preview image of its latest frame.
+    """
+    return subclass_scene(scene_class, PreviewSceneMixin)
+
+
+class Preview(object):
+    def __init__(self, file_name, scene_names, scene_kwargs, render_options=None):
+        self.file_name = file_name
+        self.scene_names = scene_names
+        self.scene_kwargs = scene_kwargs
+        # As for etcslib.options.apply_render_options
+        self.render_options = render_options or {}
+        self.mtime = None
+        self.digests = {}
+
+    def render(self, scene_class):
+        scene_class = apply_render_options(
+            with_preview(scene_class), self.render_options,
+        )
+        start = time.time()
+        try:
+            scene_class(**self.scene_kwargs)
+        except Exception:
+            traceback.print_exc()
+            print("{} failed after {:.1f}s".format(scene_class.__name__, time.time() - start))
+            return False
+        print("{} rendered in {:.1f}s".format(scene_class.__name__, time.time() - start))
+        return True
+
+    def update(self):
+        """
+        Loads the scene file again if it changed, and renders the scenes
+        which changed with it.
+        """
+        mtime = os.path.getmtime(self.file_name)
+        if mtime == self.mtime:
+            return
+        self.mtime = mtime
+        with open(self.file_name) as scene_file:
+            source = scene_file.read()
+        try:
+            digests = get_scene_digests(source, self.scene_names)
+            module = manimlib.config.get_module(self.file_name)
+        except Exception:
+            traceback.print_exc()
+            return
+        for name in self.scene_names:
+            if digests[name] == self.digests.get(name):
+                continue
+            scene_class = getattr(module, name, None)
+            if scene_class is None:
+                print("{} is no longer in {}".format(name, self.file_name))
+                continue
+            if self.render(scene_class):
+                self.digests[name] = digests[name]
+            else:
+                # Tried again on the next change, even if it is elsewhere
+                self.digests.pop(name, None)
+
+    def run(self, interval):
+        print("Watching {} for {}, Ctrl-C to stop".format(
+            self.file_name, ", ".join(self.scene_names),
+        ))
+        try:
+            while True:
+                self.update()
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="Seconds between checks of the scene file for changes (default: 0.5)",
+    )
+    parser.add_argument(
+        "--segment_cache",
+        action="store_true",
+        help="Reuse the animations which did not change from the segment cache",
+    )
+    parser.add_argument(
+        "--segment_cache_size",
+        type=int,
+        default=2048,
+        help="Maximal size of the segment cache in MB (default: 2048)",
+    )
+    return parser
+
+
+def main():
+    args, config = parse_cli(get_parser())
+    install_tex_cache()
+    install_svg_cache()
+    install_alignment_cache()
+    render_options = {}
+    if args.segment_cache:
+        render_options["segment_options"] = {
+            "cache_size": args.segment_cache_size * 1024**2,
+        }
+    preview = Preview(
+        config["file_writer_config"]["input_file_path"],
+        [scene_class.__name__ for scene_class in get_scene_classes(config)],
+        get_scene_kwargs(config),
+        render_options,
+    )
+    preview.run(args.interval)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python
+"""
+Drop-in replacement for `python -m manim` with some extra options:
+
+    cd etcs
+    python -m etcslib.render 05-algebraization-of-geometry.py ParabolaExample -l --prefetch_tex
+    python -m etcslib.render 05-algebraization-of-geometry.py -a --workers 6
+    python -m etcslib.render set_arrow_test.py FourSetsExample --segment_workers 8
+    python -m etcslib.render 05-algebraization-of-geometry.py ParabolaExample --segment_cache
+    python -m etcslib.render 05-algebraization-of-geometry.py ParabolaExample --static_layers
+    python -m etcslib.render 05-algebraization-of-geometry.py ParabolaExample --trace trace.json
+    python -m etcslib.render 05-algebraization-of-geometry.py AxiomOfOrderedPairs --stream
+    python -m etcslib.render set_arrow_test.py FourSetsExample --batch_transforms
+    python -m etcslib.render 05-algebraization-of-geometry.py CartesianProductOfSets --repeat_frames
+    python -m etcslib.render 05-algebraization-of-geometry.py -a --workers 6 --compact
+    python -m etcslib.render 05-algebraization-of-geometry.py ParabolaExample --checkpoints -n 40
+    python -m etcslib.render 05-algebraization-of-geometry.py ParabolaExample --seek 42.3
+    python -m etcslib.render set_arrow_test.py FourSetsExample -r 2160 --tile_threads 8
+
+All of manim's own flags are accepted as well.
+"""
+import argparse
+import contextlib
+import sys
+import traceback
+
+from manimlib.extract_scene import open_file_if_needed
+
+from etcslib.alignment import install_alignment_cache
+from etcslib.config import get_scene_classes
+from etcslib.config import get_scene_kwargs
+from etcslib.config import get_single_frame_scene_kwargs
+from etcslib.config import parse_cli
+from etcslib.options import apply_render_options
+from etcslib.parallel import render_scenes_in_parallel
+from etcslib.tex import install_tex_cache
+from etcslib.tex import prefetch_tex
+from etcslib.tracing import tracing
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument(
+        "--prefetch_tex",
+        action="store_true",
+        help="Find and compile all TeX of the scenes in batches before rendering",
+    )
+    parser.add_argument(
+        "--tex_workers",
+        type=int,
+        default=None,
+        help="Number of parallel LaTeX runs (default: number of cores)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Render the scenes in parallel on this many worker processes",
+    )
+    parser.add_argument(
+        "--segment_workers",
+        type=int,
+        default=None,
+        help="Render the animations of each scene in parallel on this many processes",
+    )
+    parser.add_argument(
+        "--segment_cache",
+        action="store_true",
+        help="Reuse animations rendered before from the segment cache",
+    )
+    parser.add_argument(
+        "--segment_cache_size",
+        type=int,
+        default=2048,
+        help="Maximal size of the segment cache in MB (default: 2048)",
+    )
+    parser.add_argument(
+        "--static_layers",
+        action="store_true",
+        help="Draw unchanging mobjects at the back once and reuse their pixels",
+    )
+    parser.add_argument(
+        "--tile_threads",
+        type=int,
+        default=None,
+        help="Rasterize each frame in tiles on this many threads (0: number of cores)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Write each movie through one encoder instead of one per animation",
+    )
+    parser.add_argument(
+        "--batch_transforms",
+        action="store_true",
+        help="Interpolate the transforms of each animation together as one batch",
+    )
+    parser.add_argument(
+        "--repeat_frames",
+        action="store_true",
+        help="Draw and convert frames only once for as long as nothing in them changes",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Store the points of mobjects added to scenes in single precision and share equal colors",
+    )
+    parser.add_argument(
+        "--checkpoints",
+        action="store_true",
+        help="Save the state before each animation, and render -n and -s from there",
+    )
+    parser.add_argument(
+        "--seek",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Save only the frame at this time of the movie, from its checkpoint",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        metavar="FILE",
+        help="Write a Chrome trace of where the render spends its time to FILE",
+    )
+    return parser
+
+
+def get_segment_options(args):
+    """
+    Arguments of with_parallel_segments for the given command line, or
+    None if the scenes should render as usual.
+    """
+    if args.segment_workers is None and not args.segment_cache:
+        return None
+    return {
+        "n_workers": args.segment_workers or 1,
+        "cache_size": args.segment_cache_size * 1024**2 if args.segment_cache else None,
+    }
+
+
+def get_checkpoint_options(args):
+    """
+    Arguments of with_checkpoints for the given command line, or None
+    if the scenes should render without checkpoints.
+    """
+    if not args.checkpoints and args.seek is None:
+        return None
+    return {"seek_time": args.seek}
+
+
+def get_render_options(args):
+    """
+    The options of etcslib.options.apply_render_options for the given
+    command line.
+    """
+    return {
+        "static_layers": args.static_layers,
+        "tile_threads": args.tile_threads,
+        "stream": args.stream,
+        "batch_transforms": args.batch_transforms,
+        "repeat_frames": args.repeat_frames,
+        "compact": args.compact,
+        "checkpoint_options": get_checkpoint_options(args),
+        "segment_options": get_segment_options(args),
+    }
+
+
+def main():
+    args, config = parse_cli(get_parser())
+    install_tex_cache()
+    install_alignment_cache()
+    scene_classes = get_scene_classes(config)
+    scene_kwargs = get_scene_kwargs(config)
+    render_options = get_render_options(args)
+    segment_options = render_options["segment_options"]
+    checkpoint_options = render_options["checkpoint_options"]
+
+    if args.stream and segment_options is not None:
+        sys.exit("--stream writes each movie in one piece, so it cannot be "
+                 "combined with --segment_workers or --segment_cache")
+    if checkpoint_options is not None and (args.compact or segment_options is not None):
+        sys.exit("--checkpoints and --seek replay animations on their own, so they "
+                 "cannot be combined with --compact, --segment_workers or --segment_cache")
+    if args.seek is not None:
+        scene_kwargs = get_single_frame_scene_kwargs(scene_kwargs)
+    if args.trace is not None and (args.workers is not None or segment_options is not None):
+        sys.exit("--trace only records the main process, so it cannot be "
+                 "combined with --workers, --segment_workers or --segment_cache")
+
+    if args.prefetch_tex:
+        prefetch_tex(scene_classes, scene_kwargs, n_workers=args.tex_workers)
+
+    if args.workers is not None:
+        failures = render_scenes_in_parallel(
+            scene_classes, scene_kwargs, n_workers=args.workers,
+            render_options=render_options,
+        )
+        sys.exit(1 if failures else 0)
+
+    trace = contextlib.nullcontext()
+    if args.trace is not None:
+        trace = tracing(args.trace)
+    with trace:
+        for SceneClass in scene_classes:
+            SceneClass = apply_render_options(SceneClass, render_options)
+            try:
+                scene = SceneClass(**scene_kwargs)
+                open_file_if_needed(scene.file_writer, **config)
+            except Exception:
+                print("\n\n")
+                traceback.print_exc()
+                print("\n\n")
+
+
+if __name__ == "__main__":
+    main()
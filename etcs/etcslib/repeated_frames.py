@@ -0,0 +1,121 @@
+"""
+Drawing and converting a frame only once for as long as it does not
+change.
+
+Manim captures every frame of a play(), and of a wait() with updaters,
+even when nothing on screen changes: updaters which do not move anything,
+or an animation whose mobjects have already arrived, e.g. the end of a
+lagged transform.  A scene with RepeatedFrameSceneMixin hashes the state
+of what a frame would be drawn from, as the segment cache does, and
+when that state is the one the previous frame was drawn from, it skips
+drawing and hands on the previous frame again.
+
+Runs of the same frame are then passed to the file writer with a repeat
+count, and RepeatedFrameFileWriter converts a frame to bytes once, not
+once per repetition.  ffmpeg still gets every repetition, since the
+partial movie files have a constant frame rate, but repeated frames
+cost the encoder next to nothing.
+"""
+import numpy as np
+
+from manimlib.scene.scene_file_writer import SceneFileWriter
+
+from etcslib.config import subclass_scene
+from etcslib.segment_cache import get_state_digest
+
+
+class RepeatedFrameFileWriter(SceneFileWriter):
+    def write_frame(self, frame, n_times=1):
+        if self.write_to_movie:
+            data = np.ascontiguousarray(frame).data
+            for i in range(n_times):
+                self.writing_process.stdin.write(data)
+
+
+def get_frame_runs(frames):
+    """
+    (frame, count) for every run of the very same frame in `frames`.
+    """
+    runs = []
+    for frame in frames:
+        if runs and runs[-1][0] is frame:
+            runs[-1][1] += 1
+        else:
+            runs.append([frame, 1])
+    return runs
+
+
+class RepeatedFrameSceneMixin(object):
+    def setup(self):
+        # A writer of another kind, e.g. a streaming one, is kept as it is
+        if type(self.file_writer) is SceneFileWriter:
+            self.file_writer = RepeatedFrameFileWriter(self, **self.file_writer_config)
+        self.drawn_frame_key = None
+        self.last_frame = None
+        super().setup()
+
+    def get_frame_key(self, mobjects, background, include_submobjects, kwargs):
+        """
+        What a frame drawn by update_frame with these arguments depends
+        on, or None for a partial drawing like the static image of a
+        play(), which is not a frame of its own.
+        """
+        if not include_submobjects or kwargs.get("excluded_mobjects"):
+            return None
+        if mobjects is None:
+            if background is not None:
+                return None
+            drawn = self.mobjects + self.foreground_mobjects
+        else:
+            # The moving mobjects of a play(), drawn onto its static image
+            if background is None:
+                return None
+            drawn = mobjects
+        return (mobjects, background, get_state_digest(drawn, self.camera))
+
+    def is_drawn_frame(self, key):
+        if key is None or self.drawn_frame_key is None:
+            return False
+        mobjects, background, digest = key
+        drawn_mobjects, drawn_background, drawn_digest = self.drawn_frame_key
+        return mobjects is drawn_mobjects and background is drawn_background and \
+            digest == drawn_digest
+
+    def update_frame(self, mobjects=None, background=None, include_submobjects=True,
+                     ignore_skipping=True, **kwargs):
+        if self.skip_animations and not ignore_skipping:
+            return
+        key = self.get_frame_key(mobjects, background, include_submobjects, kwargs)
+        if self.is_drawn_frame(key):
+            # Still in the camera, and last_frame if it was taken
+            return
+        self.drawn_frame_key = key
+        self.last_frame = None
+        return super().update_frame(
+            mobjects, background, include_submobjects, ignore_skipping, **kwargs
+        )
+
+    def get_frame(self):
+        if self.last_frame is not None:
+            return self.last_frame
+        frame = super().get_frame()
+        if self.drawn_frame_key is not None:
+            # A whole frame, which is handed on again while it is unchanged
+            self.last_frame = frame
+        return frame
+
+    def add_frames(self, *frames):
+        if self.skip_animations or \
+                not isinstance(self.file_writer, RepeatedFrameFileWriter) or \
+                not all(isinstance(frame, np.ndarray) for frame in frames):
+            return super().add_frames(*frames)
+        self.increment_time(len(frames) / self.camera.frame_rate)
+        for frame, count in get_frame_runs(frames):
+            self.file_writer.write_frame(frame, count)
+
+
+def with_repeated_frames(scene_class):
+    """
+    scene_class drawing unchanged frames only once.
+    """
+    return subclass_scene(scene_class, RepeatedFrameSceneMixin)
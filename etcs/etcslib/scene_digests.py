@@ -0,0 +1,70 @@
+"""
+Hashes of the code each scene of a file depends on: its own class, its
+base classes, and every top level definition of the file it uses,
+directly or through other definitions, plus any top level code which
+is not a definition.  A scene whose hash did not change renders as it
+did, as far as its file goes.
+"""
+import ast
+import hashlib
+
+
+def get_defined_names(node):
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        return [node.name]
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return [
+            (alias.asname or alias.name).split(".")[0]
+            for alias in node.names
+        ]
+    if isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+        targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+        return [
+            name.id
+            for target in targets
+            for name in ast.walk(target)
+            if isinstance(name, ast.Name)
+        ]
+    return []
+
+
+def get_scene_digests(source, scene_names):
+    """
+    A hash, for each of `scene_names`, of the source of everything at
+    the top level of the file `source` which the scene's class uses.
+    """
+    tree = ast.parse(source)
+    definitions = {}
+    always_used = []
+    for node in tree.body:
+        names = get_defined_names(node)
+        for name in names:
+            definitions.setdefault(name, []).append(node)
+        is_docstring = isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)
+        if not names and not is_docstring:
+            always_used.append(node)
+        # A star import may define any name
+        if isinstance(node, ast.ImportFrom) and any(alias.name == "*" for alias in node.names):
+            always_used.append(node)
+
+    digests = {}
+    for scene_name in scene_names:
+        used = []
+        stack = [scene_name]
+        seen = set()
+        while stack:
+            name = stack.pop()
+            if name in seen:
+                continue
+            seen.add(name)
+            for node in definitions.get(name, []):
+                used.append(node)
+                stack.extend(
+                    child.id for child in ast.walk(node)
+                    if isinstance(child, ast.Name)
+                )
+        hasher = hashlib.sha1()
+        for node in sorted(set(used + always_used), key=lambda node: node.lineno):
+            hasher.update(ast.get_source_segment(source, node).encode())
+        digests[scene_name] = hasher.digest()
+    return digests
@@ -0,0 +1,160 @@
+"""
+An on-disk cache of the partial movie files of single animations.
+
+A segment is keyed by a hash of everything its frames are drawn from:
+the state of every mobject on screen at each frame, how many times each
+frame is written, and the camera and movie settings.  A segment whose
+key is in the cache is copied from there instead of being rendered.
+
+The cache is capped in size, dropping the least recently used segments
+first.
+"""
+import hashlib
+import numbers
+import os
+import shutil
+
+import numpy as np
+
+CACHE_VERSION = 2
+DEFAULT_MAX_SIZE = 2 * 1024**3
+
+# Attributes of manim's Camera which are its output rather than its
+# settings.  Camera mixins list attributes of their own which do not
+# change what is drawn in digest_ignored_attributes, and attributes they
+# set on the mobjects they draw in digest_ignored_mobject_attributes.
+IGNORED_CAMERA_ATTRIBUTES = [
+    "pixel_array",
+    "background",
+]
+
+
+def get_ignored_attributes(cls, name):
+    """
+    The attributes listed under `name` by `cls` and its base classes.
+    """
+    ignored = set()
+    for base in cls.__mro__:
+        ignored.update(base.__dict__.get(name, ()))
+    return ignored
+
+
+def update_hash_with_attributes(hasher, obj, ignored=()):
+    """
+    Feeds the class and all plain data attributes of `obj` (numbers,
+    strings and arrays) into `hasher`.  Mobjects keep everything which
+    decides how they are drawn in such attributes.
+    """
+    hasher.update(type(obj).__name__.encode())
+    for key, value in sorted(vars(obj).items()):
+        if key in ignored:
+            continue
+        if isinstance(value, np.ndarray):
+            if value.dtype == object:
+                continue
+            hasher.update(key.encode())
+            hasher.update(str(value.shape).encode())
+            hasher.update(np.ascontiguousarray(value).tobytes())
+        elif isinstance(value, (numbers.Number, str, bool)) or value is None:
+            hasher.update(key.encode())
+            hasher.update(repr(value).encode())
+
+
+def get_state_digest(mobjects, camera):
+    """
+    Hash of what a frame showing `mobjects` through `camera` looks like.
+    """
+    hasher = hashlib.sha1()
+    if hasattr(camera, "frame"):
+        mobjects = [camera.frame, *mobjects]
+    family = camera.extract_mobject_family_members(
+        mobjects, only_those_with_points=True,
+    )
+    ignored = get_ignored_attributes(type(camera), "digest_ignored_mobject_attributes")
+    for mob in family:
+        update_hash_with_attributes(hasher, mob, ignored)
+    # Group opacities are mostly set on groups without points of their
+    # own, so they go in for the whole families, with their shape
+    for mobject in mobjects:
+        for mob in mobject.get_family():
+            hasher.update(repr((
+                getattr(mob, "group_opacity", 1), len(mob.submobjects),
+            )).encode())
+    return hasher.digest()
+
+
+def get_settings_digest(camera, file_writer):
+    hasher = hashlib.sha1()
+    hasher.update(str(CACHE_VERSION).encode())
+    ignored = get_ignored_attributes(type(camera), "digest_ignored_attributes")
+    update_hash_with_attributes(hasher, camera, ignored.union(IGNORED_CAMERA_ATTRIBUTES))
+    hasher.update(file_writer.movie_file_extension.encode())
+    return hasher.digest()
+
+
+class SegmentCache(object):
+    """
+    Partial movie files stored as <directory>/<key><extension>, where
+    the modification time of a file is when it was last used.
+    """
+
+    def __init__(self, directory, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    def get_path(self, key, extension):
+        return os.path.join(self.directory, key + extension)
+
+    def fetch(self, key, destination):
+        """
+        Puts the segment with this key at `destination`, returning
+        whether it was in the cache.
+        """
+        path = self.get_path(key, os.path.splitext(destination)[1])
+        try:
+            link_or_copy(path, destination)
+        except FileNotFoundError:
+            return False
+        os.utime(path)
+        return True
+
+    def store(self, key, source):
+        link_or_copy(source, self.get_path(key, os.path.splitext(source)[1]))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".tmp"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for mtime, size, path in entries)
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def link_or_copy(source, destination):
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        return
+    # Written under a temporary name first, since other processes may
+    # be reading the cache at the same time
+    temp_file = "{}.{}.tmp".format(destination, os.getpid())
+    try:
+        os.link(source, temp_file)
+    except FileNotFoundError:
+        raise
+    except OSError:
+        shutil.copyfile(source, temp_file)
+    os.replace(temp_file, destination)
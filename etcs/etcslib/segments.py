@@ -0,0 +1,201 @@
+"""
+Rendering the play() and wait() calls of one scene in parallel.
+
+construct() runs once, in the main process, stepping through every
+frame of every animation without drawing or encoding anything.  At the
+start of each animation the process forks, and the child renders just
+that animation into its partial movie file from exactly the state the
+serial render would have, then exits.  The partial movie files are
+joined by the file writer as usual, so the result is the same as that
+of a serial render.
+
+With a segment cache, the main process also hashes every frame it steps
+through.  Once an animation is over, its child is told either to render
+it and store the result in the cache, or to exit because the partial
+movie file was already taken from the cache.
+
+This needs os.fork, so it is only available on POSIX systems.
+"""
+import hashlib
+import os
+import sys
+import time
+import traceback
+
+import manimlib.constants as consts
+
+from etcslib.config import subclass_scene
+from etcslib.segment_cache import SegmentCache
+from etcslib.segment_cache import get_settings_digest
+from etcslib.segment_cache import get_state_digest
+
+
+class ParallelSegmentsMixin(object):
+    CONFIG = {
+        "segment_workers": None,
+        # Seconds between checks on the segment processes
+        "segment_poll_interval": 0.01,
+        # In bytes, None for no cache
+        "segment_cache_size": None,
+    }
+
+    def setup(self):
+        self.segment_processes = {}
+        self.failed_segments = []
+        self.rendering_elsewhere = False
+        self.segment_cache = None
+        self.segment_hits = []
+        self.segment_misses = []
+        if self.segment_cache_size is not None and self.file_writer.write_to_movie:
+            self.segment_cache = SegmentCache(
+                os.path.join(consts.MEDIA_DIR, "segment_cache"),
+                self.segment_cache_size,
+            )
+        super().setup()
+
+    def tear_down(self):
+        super().tear_down()
+        while self.segment_processes:
+            self.wait_for_segment()
+        if self.segment_cache is not None:
+            self.print_segment_cache_report()
+        if self.failed_segments:
+            raise Exception("Could not render animations {} of {}".format(
+                ", ".join(map(str, sorted(self.failed_segments))), self,
+            ))
+
+    def play(self, *args, **kwargs):
+        return self.run_segment(super().play, *args, **kwargs)
+
+    def wait(self, *args, **kwargs):
+        return self.run_segment(super().wait, *args, **kwargs)
+
+    def run_segment(self, method, *args, **kwargs):
+        self.update_skipping_status()
+        if self.skip_animations:
+            return method(*args, **kwargs)
+
+        n_workers = self.segment_workers or os.cpu_count() or 1
+        while len(self.segment_processes) >= n_workers:
+            self.wait_for_segment()
+        read_fd = write_fd = None
+        if self.segment_cache is not None:
+            read_fd, write_fd = os.pipe()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        pid = os.fork()
+        if pid == 0:
+            if write_fd is not None:
+                os.close(write_fd)
+            self.render_segment(method, args, kwargs, read_fd)
+
+        self.segment_processes[pid] = self.num_plays
+        if self.segment_cache is None:
+            return self.step_through_segment(method, *args, **kwargs)
+        os.close(read_fd)
+        with os.fdopen(write_fd, "w") as decision:
+            partial_movie_path = self.file_writer.get_next_partial_movie_path()
+            num_play = self.num_plays
+            self.segment_hash = hashlib.sha1(
+                get_settings_digest(self.camera, self.file_writer)
+            )
+            result = self.step_through_segment(method, *args, **kwargs)
+            key = self.segment_hash.hexdigest()
+            if self.segment_cache.fetch(key, partial_movie_path):
+                self.segment_hits.append(num_play)
+            else:
+                self.segment_misses.append(num_play)
+                decision.write(key)
+        return result
+
+    def render_segment(self, method, args, kwargs, read_fd=None):
+        # In the child process, which never returns from here
+        exit_code = 0
+        try:
+            key = None
+            if read_fd is not None:
+                with os.fdopen(read_fd) as decision:
+                    key = decision.read()
+                if not key:
+                    # Taken from the cache, or the main process failed
+                    return
+            method(*args, **kwargs)
+            if key is not None:
+                self.segment_cache.store(
+                    key, self.file_writer.partial_movie_file_path
+                )
+        except BaseException:
+            traceback.print_exc()
+            exit_code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(exit_code)
+
+    def step_through_segment(self, method, *args, **kwargs):
+        write_to_movie = self.file_writer.write_to_movie
+        self.file_writer.write_to_movie = False
+        self.rendering_elsewhere = True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            self.file_writer.write_to_movie = write_to_movie
+            self.rendering_elsewhere = False
+
+    def wait_for_segment(self):
+        # Only our own children are waited for, since the scene, manim
+        # or ffmpeg's callers may have children of their own to reap
+        while True:
+            for pid in list(self.segment_processes):
+                done, status = os.waitpid(pid, os.WNOHANG)
+                if done == pid:
+                    num_play = self.segment_processes.pop(pid)
+                    if status != 0:
+                        self.failed_segments.append(num_play)
+                    return
+            time.sleep(self.segment_poll_interval)
+
+    def print_segment_cache_report(self):
+        print("Segment cache for {}: {} hits, {} misses{}".format(
+            self,
+            len(self.segment_hits),
+            len(self.segment_misses),
+            "" if not self.segment_misses else " (animations {})".format(
+                ", ".join(map(str, self.segment_misses))
+            ),
+        ))
+
+    def update_frame(self, *args, **kwargs):
+        if self.rendering_elsewhere:
+            return
+        return super().update_frame(*args, **kwargs)
+
+    def get_frame(self):
+        if self.rendering_elsewhere:
+            if self.segment_cache is None:
+                return None
+            return get_state_digest(
+                self.mobjects + self.foreground_mobjects, self.camera,
+            )
+        return super().get_frame()
+
+    def add_frames(self, *frames):
+        if self.rendering_elsewhere and self.segment_cache is not None:
+            for frame in frames:
+                self.segment_hash.update(frame)
+        return super().add_frames(*frames)
+
+
+def with_parallel_segments(scene_class, n_workers=None, cache_size=None):
+    """
+    scene_class rendering its animations in parallel on n_workers
+    processes (default: number of cores).  With a cache_size in bytes,
+    animations are also looked up in the segment cache.
+    """
+    if not hasattr(os, "fork"):
+        print("Rendering segments in parallel needs os.fork, rendering serially")
+        return scene_class
+    return subclass_scene(
+        scene_class, ParallelSegmentsMixin,
+        segment_workers=n_workers, segment_cache_size=cache_size,
+    )
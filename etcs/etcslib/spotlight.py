@@ -0,0 +1,230 @@
+"""
+Opacity of whole groups, applied by the camera while drawing.
+
+A mobject's group opacity multiplies the opacity of everything in its
+family, on top of their own fill and stroke opacities, and of the group
+opacities of the mobjects containing it.  Dimming a scene and bringing
+parts of it back is then a matter of changing one number per group,
+rather than rewriting the colors of every submobject on every frame as
+fade() does:
+
+    everything = self.get_top_level_mobjects()
+    self.play(*spotlight(everything, [z_dot, AB_arrows.arrows[1]]))
+    ...
+    self.play(*spotlight(everything, opacity=1))
+
+Group opacities are only drawn by a camera with GroupOpacityCameraMixin,
+e.g. with "camera_class": GroupOpacityCamera in the scene's CONFIG, and
+only for vectorized mobjects.
+"""
+from manimlib.animation.animation import Animation
+from manimlib.camera.camera import Camera
+from manimlib.utils.bezier import interpolate
+
+
+def get_group_opacity(mobject):
+    return getattr(mobject, "group_opacity", 1)
+
+
+def set_group_opacity(mobject, opacity):
+    mobject.group_opacity = opacity
+    return mobject
+
+
+class ChangeGroupOpacity(Animation):
+    """
+    Changes the group opacity of `mobject` to `opacity`, without touching
+    anything else of it or its family.
+    """
+    CONFIG = {
+        "suspend_mobject_updating": False,
+    }
+
+    def __init__(self, mobject, opacity, **kwargs):
+        self.target_opacity = opacity
+        Animation.__init__(self, mobject, **kwargs)
+
+    def create_starting_mobject(self):
+        # Only the one number changes, so there is nothing to copy
+        self.start_opacity = get_group_opacity(self.mobject)
+        return self.mobject
+
+    def interpolate_mobject(self, alpha):
+        set_group_opacity(self.mobject, interpolate(
+            self.start_opacity, self.target_opacity, alpha,
+        ))
+
+
+def get_product_opacity(mobjects, opacities=None):
+    """
+    The product of the group opacities of `mobjects`, taken from
+    `opacities` for those in it.
+    """
+    product = 1
+    for mob in mobjects:
+        if opacities is not None and mob in opacities:
+            product *= opacities[mob]
+        else:
+            product *= get_group_opacity(mob)
+    return product
+
+
+def get_ancestors(groups, mobjects):
+    """
+    For each of `mobjects`, the members of the families of `groups`, the
+    groups included, which have it in their own families, other than
+    itself.
+    """
+    ancestors = {mob: [] for mob in mobjects}
+    seen = {mob: set() for mob in mobjects}
+
+    def visit(mob, path):
+        if mob in ancestors:
+            for ancestor in path:
+                if ancestor not in seen[mob]:
+                    seen[mob].add(ancestor)
+                    ancestors[mob].append(ancestor)
+        path.append(mob)
+        for submob in mob.submobjects:
+            visit(submob, path)
+        path.pop()
+
+    for group in groups:
+        visit(group, [])
+    return ancestors
+
+
+class ChangeDisplayOpacity(ChangeGroupOpacity):
+    """
+    Changes the opacity `mobject` is drawn with, its group opacity times
+    those of `ancestors`, to `opacity` along a straight path, whatever the
+    animations of the ancestors do to theirs meanwhile.  It sets the group
+    opacity of mobject on every frame from those of the ancestors, so it
+    must come after their animations in a play().
+    """
+
+    def __init__(self, mobject, ancestors, opacity=1, **kwargs):
+        self.ancestors = ancestors
+        ChangeGroupOpacity.__init__(self, mobject, opacity, **kwargs)
+
+    def get_ancestors_opacity(self):
+        return get_product_opacity(self.ancestors)
+
+    def create_starting_mobject(self):
+        self.start_opacity = get_group_opacity(self.mobject) * \
+            self.get_ancestors_opacity()
+        return self.mobject
+
+    def interpolate_mobject(self, alpha):
+        ancestors_opacity = self.get_ancestors_opacity()
+        if ancestors_opacity > 0:
+            set_group_opacity(self.mobject, interpolate(
+                self.start_opacity, self.target_opacity, alpha,
+            ) / ancestors_opacity)
+
+
+def spotlight(groups, lit=(), opacity=0.2, **kwargs):
+    """
+    Animations dimming each of `groups`, usually the top level mobjects
+    of a scene, to `opacity`, while every mobject in `lit` stays at or
+    comes back to full opacity, even if it is part of a dimmed group.
+    Every other group opacity set within the groups returns to 1, so
+    spotlight(groups, opacity=1) undoes any spotlight on them.
+
+    Everything is drawn with an opacity going straight from where it
+    starts to where it ends, so nothing lit flashes brighter on the way.
+    A lit mobject inside a dimmed group ends with 1 / opacity as its own
+    group opacity, so opacity must be above 0.
+    """
+    targets = {}
+    members = set()
+    for group in groups:
+        for mob in group.get_family():
+            members.add(mob)
+            if get_group_opacity(mob) != 1:
+                targets[mob] = 1
+    for group in groups:
+        targets[group] = opacity
+    for mob in lit:
+        targets[mob] = None
+    ancestors = get_ancestors(groups, targets)
+    animations = []
+    # Ancestors first, as their animations must come before
+    for mob in sorted(targets, key=lambda mob: len(ancestors[mob])):
+        start = get_product_opacity(ancestors[mob])
+        end = get_product_opacity(ancestors[mob], targets)
+        if targets[mob] is None:
+            targets[mob] = 1 / end
+        target = targets[mob]
+        # Lit mobjects from outside the groups are animated anyway, so
+        # that the scene adds them
+        if target != get_group_opacity(mob) or start != end or \
+                mob not in members:
+            animations.append(ChangeDisplayOpacity(
+                mob, ancestors[mob], end * target, **kwargs
+            ))
+    return animations
+
+
+class GroupOpacityCameraMixin(object):
+    # Worked out while drawing from the group opacities, which the
+    # segment cache hashes instead
+    digest_ignored_mobject_attributes = [
+        "display_opacity",
+        "parent_display_opacity",
+    ]
+
+    def get_mobjects_to_display(self, mobjects, include_submobjects=True,
+                                excluded_mobjects=None):
+        if include_submobjects:
+            # Before the families are flattened, and so before anything
+            # else looks at the flattened mobjects
+            visited = set()
+            for mobject in mobjects:
+                if mobject not in visited:
+                    # Moving mobjects come flattened, and may be parts of
+                    # a mobject which is not moving, whose opacity they
+                    # got when the whole scene was last drawn
+                    self.set_display_opacities(
+                        mobject, getattr(mobject, "parent_display_opacity", 1),
+                        visited,
+                    )
+        return super().get_mobjects_to_display(
+            mobjects, include_submobjects, excluded_mobjects,
+        )
+
+    def set_display_opacities(self, mobject, parent_opacity, visited):
+        """
+        Stores on every member of the family of `mobject` the product of
+        the group opacities it is drawn with, so that static layers see
+        it as part of its state.  The segment cache, which hashes frames
+        without drawing them, hashes the group opacities themselves.
+        """
+        visited.add(mobject)
+        opacity = parent_opacity * get_group_opacity(mobject)
+        mobject.parent_display_opacity = parent_opacity
+        mobject.display_opacity = opacity
+        for submobject in mobject.submobjects:
+            self.set_display_opacities(submobject, opacity, visited)
+
+    def apply_display_opacity(self, rgbas, vmobject):
+        opacity = getattr(vmobject, "display_opacity", 1)
+        if opacity == 1:
+            return rgbas
+        rgbas = rgbas.copy()
+        rgbas[:, 3] = (rgbas[:, 3] * opacity).clip(0, 1)
+        return rgbas
+
+    def get_stroke_rgbas(self, vmobject, background=False):
+        return self.apply_display_opacity(
+            super().get_stroke_rgbas(vmobject, background), vmobject,
+        )
+
+    def get_fill_rgbas(self, vmobject):
+        return self.apply_display_opacity(
+            super().get_fill_rgbas(vmobject), vmobject,
+        )
+
+
+class GroupOpacityCamera(GroupOpacityCameraMixin, Camera):
+    pass
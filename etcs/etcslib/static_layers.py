@@ -0,0 +1,149 @@
+"""
+Caching the unchanging back of a frame as a pre-rendered pixel layer.
+
+Mobjects are drawn one after another, so a frame is the same whether
+its first n mobjects are drawn onto the background, or that picture is
+taken from an earlier frame which had the same first n mobjects in the
+same state.  A camera with static layers keeps such a picture of the
+longest run of mobjects at the back of the draw order which have not
+changed since the previous frame, and for every later frame only draws
+the mobjects in front of it.
+
+Every frame, each mobject of the layer is checked against the state it
+was drawn in, so the layer is dropped as soon as anything in it
+changes, moves in the draw order or leaves the scene.  Mobjects can be
+marked with mark_static to go into a layer right away instead of after
+one unchanged frame.
+"""
+import hashlib
+
+from etcslib.config import subclass_camera
+from etcslib.segment_cache import update_hash_with_attributes
+
+
+def mark_static(*mobjects):
+    """
+    Hints that `mobjects` will stay as they are for a while, e.g. a
+    NumberPlane in the background.  This only decides how soon they go
+    into a static layer; they are still redrawn if they do change.
+    """
+    for mobject in mobjects:
+        for mob in mobject.get_family():
+            mob.static_layer_hint = True
+    return mobjects
+
+
+def get_mobject_digest(mobject):
+    hasher = hashlib.sha1()
+    update_hash_with_attributes(hasher, mobject)
+    return hasher.digest()
+
+
+class StaticLayer(object):
+    """
+    What the pixel array looked like after drawing `mobjects`, in the
+    states given by `digests`, onto `base`.
+    """
+
+    def __init__(self, base, view, mobjects, digests, pixels):
+        self.base = base
+        self.view = view
+        self.mobjects = mobjects
+        self.digests = digests
+        self.pixels = pixels
+
+    def is_valid_for(self, base, view, mobjects):
+        if base is not self.base or view != self.view:
+            return False
+        if len(mobjects) < len(self.mobjects):
+            return False
+        for mob, old_mob, digest in zip(mobjects, self.mobjects, self.digests):
+            if mob is not old_mob or get_mobject_digest(mob) != digest:
+                return False
+        return True
+
+
+class StaticLayerCameraMixin(object):
+    CONFIG = {
+        # Fewer mobjects than this are cheaper to draw than to cache
+        "min_static_layer_size": 4,
+    }
+    # What it keeps of earlier frames, left out of the segment cache's keys
+    digest_ignored_attributes = [
+        "pixel_base",
+        "static_layer",
+        "previous_frame",
+    ]
+
+    def __init__(self, *args, **kwargs):
+        self.static_layer = None
+        self.previous_frame = None
+        self.pixel_base = None
+        super().__init__(*args, **kwargs)
+
+    def set_pixel_array(self, pixel_array, convert_from_floats=False):
+        super().set_pixel_array(pixel_array, convert_from_floats)
+        # Both reset() and a static image from Scene.play come through
+        # here, right before the frame is drawn
+        self.pixel_base = pixel_array
+
+    def get_view_digest(self):
+        if not hasattr(self, "frame"):
+            return None
+        return get_mobject_digest(self.frame)
+
+    def capture_mobjects(self, mobjects, **kwargs):
+        base, self.pixel_base = self.pixel_base, None
+        if base is None:
+            # Drawing on top of something already drawn
+            return super().capture_mobjects(mobjects, **kwargs)
+        mobjects = self.get_mobjects_to_display(mobjects, **kwargs)
+        view = self.get_view_digest()
+
+        layer = self.static_layer
+        if layer is not None and layer.is_valid_for(base, view, mobjects):
+            self.pixel_array[:, :, :] = layer.pixels
+            return self.display_mobjects(mobjects[len(layer.mobjects):])
+
+        digests = [get_mobject_digest(mob) for mob in mobjects]
+        n_static = self.get_static_run_length(base, view, mobjects, digests)
+        self.previous_frame = (base, view, mobjects, digests)
+        self.static_layer = None
+        if n_static < self.min_static_layer_size:
+            return self.display_mobjects(mobjects)
+        self.display_mobjects(mobjects[:n_static])
+        self.static_layer = StaticLayer(
+            base, view, mobjects[:n_static], digests[:n_static],
+            self.pixel_array.copy(),
+        )
+        self.display_mobjects(mobjects[n_static:])
+
+    def get_static_run_length(self, base, view, mobjects, digests):
+        """
+        Number of mobjects at the back which were drawn in the same
+        state onto the same base in the previous frame, or are marked
+        static.
+        """
+        old_mobjects = old_digests = []
+        if self.previous_frame is not None:
+            old_base, old_view, old_mobjects, old_digests = self.previous_frame
+            if old_base is not base or old_view != view:
+                old_mobjects = old_digests = []
+        for i, (mob, digest) in enumerate(zip(mobjects, digests)):
+            if getattr(mob, "static_layer_hint", False):
+                continue
+            if i < len(old_mobjects) and old_mobjects[i] is mob and old_digests[i] == digest:
+                continue
+            return i
+        return len(mobjects)
+
+    def display_mobjects(self, mobjects):
+        # The mobjects are already flattened, so they are drawn as they are
+        return super().capture_mobjects(mobjects, include_submobjects=False)
+
+
+def with_static_layers(scene_class):
+    """
+    scene_class with a camera which caches static layers.
+    """
+    return subclass_camera(scene_class, StaticLayerCameraMixin)
@@ -0,0 +1,199 @@
+"""
+Writing a whole scene through one ffmpeg process.
+
+Manim starts an encoder for every play() and wait(), each writing a
+partial movie file, and joins those with another ffmpeg run at the end.
+A streaming scene instead keeps a single encoder open from its first
+animation to its end, writing the movie file directly, and feeds it
+every frame straight from the camera's pixel array.
+
+Where each animation starts and ends is written next to the movie as
+<scene>.sections.json, so that the animations can still be cut out:
+
+    python -m etcslib.streaming media/videos/.../ParabolaExample.mp4 12
+
+Sounds added by the scene are put into the movie once it is written,
+as manim does after joining the partial movie files.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+from pydub import AudioSegment
+
+from manimlib.constants import FFMPEG_BIN
+
+from etcslib.config import subclass_scene
+from etcslib.repeated_frames import RepeatedFrameFileWriter
+
+
+def get_sections_file_path(movie_file_path):
+    return os.path.splitext(movie_file_path)[0] + ".sections.json"
+
+
+class StreamingFileWriter(RepeatedFrameFileWriter):
+    def __init__(self, scene, **kwargs):
+        self.writing_process = None
+        self.sections = []
+        self.n_frames = 0
+        super().__init__(scene, **kwargs)
+
+    def get_next_partial_movie_path(self):
+        # The one stream goes straight to the movie file
+        return self.get_movie_file_path()
+
+    def begin_animation(self, allow_write=False):
+        if self.write_to_movie and allow_write:
+            if self.writing_process is None:
+                self.open_movie_pipe()
+            self.sections.append({
+                "num_play": self.scene.num_plays,
+                "start_frame": self.n_frames,
+            })
+
+    def end_animation(self, allow_write=False):
+        if self.write_to_movie and allow_write:
+            self.sections[-1]["end_frame"] = self.n_frames
+
+    def write_frame(self, frame, n_times=1):
+        super().write_frame(frame, n_times)
+        if self.write_to_movie:
+            self.n_frames += n_times
+
+    def finish(self):
+        if self.write_to_movie:
+            if self.writing_process is None:
+                print("No animations in this scene")
+            else:
+                self.close_movie_pipe()
+                self.writing_process = None
+                if self.includes_sound:
+                    self.add_sound_to_movie()
+                self.write_sections()
+                self.print_file_ready_message(self.get_movie_file_path())
+        if self.save_last_frame:
+            self.scene.update_frame(ignore_skipping=True)
+            self.save_final_image(self.scene.get_image())
+
+    def add_sound_to_movie(self):
+        # As in SceneFileWriter.combine_movie_files
+        movie_file_path = self.get_movie_file_path()
+        sound_file_path = os.path.splitext(movie_file_path)[0] + ".wav"
+        # Makes the sound at least as long as the movie
+        self.add_audio_segment(AudioSegment.silent(0))
+        self.audio_segment.export(sound_file_path, bitrate="312k")
+        root, extension = os.path.splitext(movie_file_path)
+        temp_file_path = root + "_temp" + extension
+        subprocess.check_call([
+            FFMPEG_BIN,
+            '-i', movie_file_path,
+            '-i', sound_file_path,
+            '-y',
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-b:a', '320k',
+            '-map', '0:v:0',
+            '-map', '1:a:0',
+            '-loglevel', 'error',
+            temp_file_path,
+        ])
+        shutil.move(temp_file_path, movie_file_path)
+        os.remove(sound_file_path)
+
+    def write_sections(self):
+        frame_rate = self.scene.camera.frame_rate
+        for section in self.sections:
+            section["start_time"] = section["start_frame"] / frame_rate
+            section["end_time"] = section["end_frame"] / frame_rate
+        with open(get_sections_file_path(self.get_movie_file_path()), "w") as sections_file:
+            json.dump({
+                "frame_rate": frame_rate,
+                "sections": self.sections,
+            }, sections_file, indent=2)
+
+
+class StreamingSceneMixin(object):
+    def setup(self):
+        self.file_writer = StreamingFileWriter(self, **self.file_writer_config)
+        super().setup()
+
+    def get_frame(self):
+        # Frames are written out as soon as they are added, so the
+        # pixel array can be passed on without copying it
+        return self.camera.get_pixel_array()
+
+    def progress_through_animations(self, animations):
+        # As in Scene, except that the static image is a copy, since
+        # get_frame no longer makes one
+        moving_mobjects = self.get_moving_mobjects(*animations)
+        self.update_frame(excluded_mobjects=moving_mobjects)
+        static_image = np.array(self.camera.get_pixel_array())
+        last_t = 0
+        for t in self.get_animation_time_progression(animations):
+            dt = t - last_t
+            last_t = t
+            for animation in animations:
+                animation.update_mobjects(dt)
+                alpha = t / animation.run_time
+                animation.interpolate(alpha)
+            self.update_mobjects(dt)
+            self.update_frame(moving_mobjects, static_image)
+            self.add_frames(self.get_frame())
+
+
+def with_streaming(scene_class):
+    """
+    scene_class writing its movie through a single encoder.
+    """
+    return subclass_scene(scene_class, StreamingSceneMixin)
+
+
+def cut_section(movie_file_path, num_play, output_file_path=None):
+    """
+    Cuts the animation num_play out of a streamed movie into a file of
+    its own, by default named like the partial movie file manim would
+    have written for it.
+    """
+    with open(get_sections_file_path(movie_file_path)) as sections_file:
+        sections = json.load(sections_file)
+    matches = [
+        section for section in sections["sections"]
+        if section["num_play"] == num_play
+    ]
+    if not matches:
+        raise Exception("{} has no animation {}".format(movie_file_path, num_play))
+    section = matches[0]
+    if output_file_path is None:
+        root, extension = os.path.splitext(movie_file_path)
+        output_file_path = "{}_{:05}{}".format(root, num_play, extension)
+    # Re-encoded, since the section need not start at a key frame
+    subprocess.check_call([
+        FFMPEG_BIN,
+        '-y',
+        '-i', movie_file_path,
+        '-vf', 'trim=start_frame={}:end_frame={},setpts=PTS-STARTPTS'.format(
+            section["start_frame"], section["end_frame"],
+        ),
+        '-an',
+        '-loglevel', 'error',
+        output_file_path,
+    ])
+    return output_file_path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Cut one animation out of a streamed movie"
+    )
+    parser.add_argument("movie_file", help="Movie written with --stream")
+    parser.add_argument("num_play", type=int, help="Number of the animation")
+    parser.add_argument("-o", "--output", default=None, help="File to write")
+    args = parser.parse_args()
+    print(cut_section(args.movie_file, args.num_play, args.output))
+
+
+if __name__ == "__main__":
+    main()
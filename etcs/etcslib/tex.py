@@ -0,0 +1,326 @@
+"""
+Batched, parallel compilation of the TeX fragments used by a scene.
+
+Fragments are keyed by manim's own tex_hash, so TEX_DIR works as a
+content-addressed cache: once <hash>.svg is there, no LaTeX is run for
+that fragment again, not even to regenerate the intermediate .dvi.
+"""
+import contextlib
+import functools
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+import manimlib.constants as consts
+import manimlib.mobject.svg.tex_mobject as tex_mobject
+from manimlib.constants import TEX_TEXT_TO_REPLACE
+from manimlib.constants import TEX_USE_CTEX
+from manimlib.mobject.svg.svg_mobject import SVGMobject
+from manimlib.utils import tex_file_writing
+from manimlib.utils.tex_file_writing import tex_hash
+
+from etcslib.config import get_silent_scene_kwargs
+
+
+BATCH_DOCUMENT_CLASS = r"\documentclass[preview,multi]{standalone}"
+BATCH_PAGE = "\\begin{standalone}\n%s\n\\end{standalone}\n"
+
+PLACEHOLDER_GLYPH_WIDTH = 5
+PLACEHOLDER_GLYPH_HEIGHT = 7
+PLACEHOLDER_GLYPH_SPACING = 6
+
+DVI_EXTENSION = ".dvi" if not TEX_USE_CTEX else ".xdv"
+
+
+def get_svg_file(expression, template_tex_file_body):
+    return os.path.join(
+        consts.TEX_DIR,
+        tex_hash(expression, template_tex_file_body)
+    ) + ".svg"
+
+
+def cached_tex_to_svg_file(expression, template_tex_file_body, work_dir=None):
+    svg_file = get_svg_file(expression, template_tex_file_body)
+    if not os.path.exists(svg_file) and work_dir is not None:
+        compile_batch_into_cache([expression], template_tex_file_body, work_dir)
+    if os.path.exists(svg_file):
+        return svg_file
+    return tex_file_writing.tex_to_svg_file(expression, template_tex_file_body)
+
+
+def install_tex_cache(work_dir=None):
+    """
+    Makes every TexMobject look up its svg by hash before
+    falling back to manim's latex -> dvisvgm pipeline.
+
+    With a work_dir, missing fragments are first compiled there and
+    moved into the cache, so that several processes sharing TEX_DIR
+    never write the same intermediate files.
+    """
+    tex_mobject.tex_to_svg_file = functools.partial(
+        cached_tex_to_svg_file, work_dir=work_dir,
+    )
+
+
+# Parsed svg geometry, by svg file
+svg_geometry = {}
+original_svg_generate_points = SVGMobject.generate_points
+
+
+def cached_svg_generate_points(self):
+    key = (
+        type(self), os.path.abspath(self.file_path),
+        os.path.getmtime(self.file_path), self.unpack_groups,
+    )
+    if key not in svg_geometry:
+        original_svg_generate_points(self)
+        # Copies, since the mobject is styled and moved from here on
+        svg_geometry[key] = [mob.copy() for mob in self.submobjects]
+        return
+    self.ref_to_element = {}
+    self.add(*[mob.copy() for mob in svg_geometry[key]])
+
+
+def install_svg_cache():
+    """
+    Makes every SVGMobject, and so every TexMobject, copy the geometry
+    parsed from its file the first time rather than parse it again, for
+    as long as the process lives.
+    """
+    SVGMobject.generate_points = cached_svg_generate_points
+
+
+# Finding the fragments a scene needs
+
+def get_placeholder_svg_file(expression):
+    """
+    An svg with one box per non-space character of `expression`, so
+    that TexMobject can split it into parts and the layout is roughly
+    right without running LaTeX.
+    """
+    n_glyphs = max(len(re.sub(r"\s", "", expression)), 1)
+    directory = os.path.join(consts.TEX_DIR, "placeholders")
+    result = os.path.join(directory, "glyphs_{}.svg".format(n_glyphs))
+    if not os.path.exists(result):
+        os.makedirs(directory, exist_ok=True)
+        w = PLACEHOLDER_GLYPH_WIDTH
+        h = PLACEHOLDER_GLYPH_HEIGHT
+        paths = []
+        for i in range(n_glyphs):
+            x = i * PLACEHOLDER_GLYPH_SPACING
+            paths.append(
+                '<path d="M {x0} 0 L {x1} 0 L {x1} {h} L {x0} {h} Z"/>'.format(
+                    x0=x, x1=x + w, h=h,
+                )
+            )
+        write_atomically(result, "".join([
+            '<svg xmlns="http://www.w3.org/2000/svg">',
+            *paths,
+            '</svg>',
+        ]))
+    return result
+
+
+@contextlib.contextmanager
+def placeholder_tex(fragments=None):
+    """
+    While active, TexMobjects are built from placeholder boxes instead
+    of compiled TeX.  Every (expression, template) pair requested is
+    appended to `fragments`, if given.
+    """
+    def record_tex_to_svg_file(expression, template_tex_file_body):
+        if fragments is not None:
+            fragments.append((expression, template_tex_file_body))
+        return get_placeholder_svg_file(expression)
+
+    original = tex_mobject.tex_to_svg_file
+    tex_mobject.tex_to_svg_file = record_tex_to_svg_file
+    try:
+        yield fragments
+    finally:
+        tex_mobject.tex_to_svg_file = original
+
+
+def collect_tex_fragments(scene_class, scene_kwargs):
+    """
+    Runs construct() of `scene_class` with placeholder TeX and without
+    rendering, returning every TeX fragment it asked for.  A scene that
+    fails part way still reports what it had asked for until then.
+    """
+    fragments = []
+    with placeholder_tex(fragments):
+        try:
+            scene_class(**get_silent_scene_kwargs(scene_kwargs))
+        except Exception:
+            print("Could not collect all TeX of {}:".format(scene_class.__name__))
+            traceback.print_exc()
+    return fragments
+
+
+# Compiling
+
+def compile_tex_fragments(fragments, n_workers=None):
+    """
+    Compiles all fragments which are not yet in the cache.  Fragments
+    sharing a template are split into one chunk per worker, and each
+    chunk is a single multi-page LaTeX run.
+
+    Returns the number of fragments which were compiled.
+    """
+    fragments = list(dict.fromkeys(fragments))
+    missing = [
+        fragment for fragment in fragments
+        if not os.path.exists(get_svg_file(*fragment))
+    ]
+    if len(missing) == 0:
+        return 0
+    n_workers = n_workers or os.cpu_count() or 1
+    by_template = {}
+    for expression, template in missing:
+        by_template.setdefault(template, []).append(expression)
+    batches = []
+    for template, expressions in by_template.items():
+        n_chunks = min(n_workers, len(expressions))
+        for i in range(n_chunks):
+            batches.append((expressions[i::n_chunks], template))
+    with ThreadPoolExecutor(max_workers=n_workers) as pool:
+        list(pool.map(lambda batch: compile_batch(*batch), batches))
+    return len([
+        fragment for fragment in missing
+        if os.path.exists(get_svg_file(*fragment))
+    ])
+
+
+def prefetch_tex(scene_classes, scene_kwargs, n_workers=None):
+    fragments = []
+    for scene_class in scene_classes:
+        fragments += collect_tex_fragments(scene_class, scene_kwargs)
+    n_fragments = len(set(fragments))
+    n_cached = len([
+        fragment for fragment in set(fragments)
+        if os.path.exists(get_svg_file(*fragment))
+    ])
+    n_compiled = compile_tex_fragments(fragments, n_workers)
+    print("TeX prefetch: {} fragments, {} cached, {} compiled, {} failed".format(
+        n_fragments, n_cached, n_compiled, n_fragments - n_cached - n_compiled,
+    ))
+    return fragments
+
+
+def get_batch_tex_file_body(expressions, template_tex_file_body):
+    """
+    Turns a single fragment template into a standalone document with
+    one page per expression, or returns None if the template does not
+    have the expected shape.
+    """
+    match = re.match(
+        r"(?s)(.*?)\\documentclass\[[^\]]*\]\{standalone\}(.*)"
+        r"\\begin\{document\}(.*)\\end\{document\}",
+        template_tex_file_body
+    )
+    if match is None:
+        return None
+    before, preamble, page = match.groups()
+    return "".join([
+        before, BATCH_DOCUMENT_CLASS, preamble,
+        "\\begin{document}\n",
+        *[
+            BATCH_PAGE % page.replace(TEX_TEXT_TO_REPLACE, expression)
+            for expression in expressions
+        ],
+        "\\end{document}\n",
+    ])
+
+
+def compile_batch(expressions, template_tex_file_body):
+    if compile_batch_into_cache(expressions, template_tex_file_body):
+        return
+    # Fall back to compiling one fragment at a time, leaving any
+    # LaTeX errors to be reported by the actual render
+    for expression in expressions:
+        try:
+            tex_file_writing.tex_to_svg_file(expression, template_tex_file_body)
+        except Exception as err:
+            print(err)
+
+
+def compile_batch_into_cache(expressions, template_tex_file_body, work_dir=None):
+    """
+    Compiles all expressions as one document in a temporary directory
+    inside `work_dir` (default: TEX_DIR) and moves the resulting svgs
+    into the cache.  Returns whether that succeeded.
+    """
+    body = get_batch_tex_file_body(expressions, template_tex_file_body)
+    if body is None:
+        return False
+    os.makedirs(work_dir or consts.TEX_DIR, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=work_dir or consts.TEX_DIR) as temp_dir:
+        pages = run_batch(body, temp_dir)
+        if pages is None or len(pages) != len(expressions):
+            return False
+        for expression, page in zip(expressions, pages):
+            move_atomically(
+                page, get_svg_file(expression, template_tex_file_body)
+            )
+    return True
+
+
+def run_batch(body, work_dir):
+    tex_file = os.path.join(work_dir, "batch.tex")
+    with open(tex_file, "w", encoding="utf-8") as outfile:
+        outfile.write(body)
+    if not TEX_USE_CTEX:
+        command = ["latex"]
+    else:
+        command = ["xelatex", "-no-pdf"]
+    command += [
+        "-interaction=batchmode",
+        "-halt-on-error",
+        "-output-directory={}".format(work_dir),
+        tex_file,
+    ]
+    dvi_file = os.path.join(work_dir, "batch" + DVI_EXTENSION)
+    try:
+        exit_code = subprocess.call(
+            command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        if exit_code != 0 or not os.path.exists(dvi_file):
+            return None
+        subprocess.call([
+            "dvisvgm", dvi_file,
+            "-n",
+            "-v", "0",
+            "-p", "1-",
+            "-o", os.path.join(work_dir, "page-%p.svg"),
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    except OSError:
+        return None
+    pages = [
+        (int(match.group(1)), os.path.join(work_dir, name))
+        for name in os.listdir(work_dir)
+        for match in [re.match(r"page-(\d+)\.svg$", name)]
+        if match
+    ]
+    return [path for n, path in sorted(pages)]
+
+
+def move_atomically(source, destination):
+    try:
+        os.replace(source, destination)
+    except OSError:
+        # Different file systems
+        temp_file = "{}.{}.tmp".format(destination, os.getpid())
+        shutil.copyfile(source, temp_file)
+        os.replace(temp_file, destination)
+
+
+def write_atomically(file_path, content):
+    # Several render processes may share one TEX_DIR
+    temp_file = "{}.{}.tmp".format(file_path, os.getpid())
+    with open(temp_file, "w", encoding="utf-8") as outfile:
+        outfile.write(content)
+    os.replace(temp_file, file_path)
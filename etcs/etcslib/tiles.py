@@ -0,0 +1,279 @@
+"""
+Rasterizing the vectorized mobjects of a frame on several threads.
+
+A camera with TiledCameraMixin splits the frame into tiles, bands of
+whole rows, and draws each tile on a thread pool with a cairo context of
+its own on the same pixel array, clipped to the rows of the tile.  Every
+context has the same transformation as the camera's own, so cairo is
+given the very same coordinates as when it draws the whole frame, and
+the clip only decides which pixels it writes: the frame has the same
+pixels as one drawn on a single thread.
+
+The paths and colors of the mobjects are worked out once per frame, as
+Camera.display_vectorized would pass them to cairo, and each tile only
+draws the mobjects whose bounding box, widened by their strokes,
+reaches into it.  pycairo lets go of the GIL while cairo fills and
+strokes, which is where drawing a frame at a high resolution spends
+its time.
+
+Only mobjects drawn by Camera.display_vectorized itself are tiled;
+cameras which draw vectorized mobjects in some other way, and dot
+clouds stamped by etcslib.dots, are left to draw them as usual.
+"""
+import itertools as it
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cairo
+import numpy as np
+
+from manimlib.camera.camera import Camera
+from manimlib.constants import FRAME_WIDTH
+from manimlib.utils.simple_functions import fdiv
+
+from etcslib.config import subclass_camera
+from etcslib.dots import DotCloud
+
+# cairo's default line join is a miter, at most this many line widths long
+CAIRO_MITER_LIMIT = 10
+
+# Camera methods which make what display_vectorized draws, as recorded
+# by get_vectorized_drawing
+CAIRO_DRAWING_METHODS = [
+    "display_vectorized",
+    "set_cairo_context_path",
+    "set_cairo_context_color",
+    "apply_fill",
+    "apply_stroke",
+]
+
+
+class VectorizedDrawing(object):
+    """
+    The cairo calls Camera.display_vectorized makes for one vmobject:
+    its path, as (start, curves, closed) per subpath, and the strokes
+    and fill drawn along it, as (method, source, line_width), where the
+    source is a color or the arguments of a gradient.  rows are the
+    first and last pixel rows it can touch.
+    """
+
+    def __init__(self, subpaths, paints, rows):
+        self.subpaths = subpaths
+        self.paints = paints
+        self.rows = rows
+
+    def draw(self, ctx):
+        ctx.new_path()
+        for start, curves, closed in self.subpaths:
+            ctx.new_sub_path()
+            ctx.move_to(*start)
+            for curve in curves:
+                ctx.curve_to(*curve)
+            if closed:
+                ctx.close_path()
+        for method, source, line_width in self.paints:
+            if source[0] == "color":
+                ctx.set_source_rgba(*source[1])
+            else:
+                pattern = cairo.LinearGradient(*source[1])
+                for stop in source[2]:
+                    pattern.add_color_stop_rgba(*stop)
+                ctx.set_source(pattern)
+            if method == "stroke":
+                ctx.set_line_width(line_width)
+                ctx.stroke_preserve()
+            else:
+                ctx.fill_preserve()
+
+
+class TiledCameraMixin(object):
+    CONFIG = {
+        # None for the number of cores
+        "tile_threads": None,
+        "tiles_per_thread": 2,
+        "min_tile_height": 16,
+    }
+    # None of them changes the pixels, so the segment cache leaves them out
+    digest_ignored_attributes = [
+        "tile_pool_pid",
+        "tile_threads",
+        "tiles_per_thread",
+        "min_tile_height",
+    ]
+
+    def __init__(self, *args, **kwargs):
+        self.tile_pool = None
+        self.tile_pool_pid = None
+        self.tile_contexts = {}
+        super().__init__(*args, **kwargs)
+
+    def get_tile_pool(self):
+        # Threads do not survive a fork, e.g. by etcslib.segments
+        if self.tile_pool is None or self.tile_pool_pid != os.getpid():
+            self.tile_pool = ThreadPoolExecutor(
+                max_workers=self.tile_threads or os.cpu_count() or 1,
+            )
+            self.tile_pool_pid = os.getpid()
+        return self.tile_pool
+
+    def get_tiles(self):
+        """
+        (first row, end row) of every tile.
+        """
+        ph = self.get_pixel_height()
+        n_threads = self.tile_threads or os.cpu_count() or 1
+        n_tiles = min(n_threads * self.tiles_per_thread, ph // self.min_tile_height)
+        if n_tiles < 2:
+            return [(0, ph)]
+        bounds = np.linspace(0, ph, n_tiles + 1).round().astype(int)
+        return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+    def get_tile_context(self, pixel_array, tile):
+        key = (id(pixel_array), tile)
+        if key not in self.tile_contexts:
+            pw = self.get_pixel_width()
+            ph = self.get_pixel_height()
+            surface = cairo.ImageSurface.create_for_data(
+                pixel_array, cairo.FORMAT_ARGB32, pw, ph,
+            )
+            ctx = cairo.Context(surface)
+            # A clip along pixel boundaries, in device space
+            ctx.rectangle(0, tile[0], pw, tile[1] - tile[0])
+            ctx.clip()
+            self.tile_contexts[key] = ctx
+        ctx = self.tile_contexts[key]
+        # Set every time, as get_cairo_context would set it once, so
+        # that it follows the frame
+        ctx.set_matrix(self.get_cairo_matrix())
+        return ctx
+
+    def get_cairo_matrix(self):
+        # As in Camera.get_cairo_context
+        pw = self.get_pixel_width()
+        ph = self.get_pixel_height()
+        fw = self.get_frame_width()
+        fh = self.get_frame_height()
+        fc = self.get_frame_center()
+        return cairo.Matrix(
+            fdiv(pw, fw), 0,
+            0, -fdiv(ph, fh),
+            (pw / 2) - fc[0] * fdiv(pw, fw),
+            (ph / 2) + fc[1] * fdiv(ph, fh),
+        )
+
+    def can_tile(self, vmobject):
+        if any(
+            getattr(type(self), name) is not getattr(Camera, name)
+            for name in CAIRO_DRAWING_METHODS
+        ):
+            return False
+        # etcslib.dots stamps dot clouds itself, onto the whole frame
+        if isinstance(vmobject, DotCloud) and hasattr(self, "can_stamp_dots"):
+            return not self.can_stamp_dots(vmobject)
+        return True
+
+    def get_cairo_source(self, rgbas, vmobject):
+        # What set_cairo_context_color passes to cairo
+        if len(rgbas) == 1:
+            return ("color", (*rgbas[0][2::-1], rgbas[0][3]))
+        points = vmobject.get_gradient_start_and_end_points()
+        points = self.transform_points_pre_display(vmobject, points)
+        step = 1.0 / (len(rgbas) - 1)
+        offsets = np.arange(0, 1 + step, step)
+        return (
+            "gradient",
+            tuple(it.chain(*[point[:2] for point in points])),
+            [(offset, *rgba[2::-1], rgba[3]) for rgba, offset in zip(rgbas, offsets)],
+        )
+
+    def get_stroke_paint(self, vmobject, background=False):
+        # What apply_stroke passes to cairo
+        width = vmobject.get_stroke_width(background)
+        if width == 0:
+            return None
+        line_width = width * self.cairo_line_width_multiple * \
+            (self.get_frame_width() / FRAME_WIDTH)
+        source = self.get_cairo_source(
+            self.get_stroke_rgbas(vmobject, background=background), vmobject,
+        )
+        return ("stroke", source, line_width)
+
+    def get_vectorized_drawing(self, vmobject):
+        """
+        What display_vectorized would draw for `vmobject`, or None if it
+        has no path of its own to draw along.
+        """
+        points = self.transform_points_pre_display(vmobject, vmobject.points)
+        if len(points) == 0:
+            # display_vectorized would paint the path of whatever was
+            # drawn before it
+            return None
+        subpaths = []
+        for subpath in vmobject.gen_subpaths_from_points_2d(points):
+            quads = vmobject.gen_cubic_bezier_tuples_from_points(subpath)
+            subpaths.append((
+                tuple(subpath[0][:2]),
+                [(*p1[:2], *p2[:2], *p3[:2]) for p0, p1, p2, p3 in quads],
+                vmobject.consider_points_equals_2d(subpath[0], subpath[-1]),
+            ))
+
+        paints = [
+            self.get_stroke_paint(vmobject, background=True),
+            ("fill", self.get_cairo_source(self.get_fill_rgbas(vmobject), vmobject), 0),
+            self.get_stroke_paint(vmobject),
+        ]
+        paints = [paint for paint in paints if paint is not None]
+        max_line_width = max(line_width for method, source, line_width in paints)
+
+        # The curves lie within the hull of their control points, and
+        # strokes reach at most half a miter beyond them
+        scale = fdiv(self.get_pixel_height(), self.get_frame_height())
+        ys = (self.get_pixel_height() / 2) + \
+            (self.get_frame_center()[1] - points[:, 1]) * scale
+        margin = max_line_width * scale * CAIRO_MITER_LIMIT / 2 + 2
+        rows = (int(np.floor(ys.min() - margin)), int(np.ceil(ys.max() + margin)))
+        return VectorizedDrawing(subpaths, paints, rows)
+
+    def display_multiple_non_background_colored_vmobjects(self, vmobjects, pixel_array):
+        tiles = self.get_tiles()
+        if len(tiles) < 2:
+            return super().display_multiple_non_background_colored_vmobjects(
+                vmobjects, pixel_array,
+            )
+        for can_tile, batch in it.groupby(vmobjects, self.can_tile):
+            batch = list(batch)
+            drawings = [None]
+            if can_tile:
+                drawings = [self.get_vectorized_drawing(vm) for vm in batch]
+            if any(drawing is None for drawing in drawings):
+                super().display_multiple_non_background_colored_vmobjects(
+                    batch, pixel_array,
+                )
+                continue
+            # Anything drawn on the camera's own context so far is in
+            # the pixel array before the tiles draw over it
+            self.get_cairo_context(pixel_array).get_target().flush()
+            list(self.get_tile_pool().map(
+                lambda tile: self.display_tile(drawings, pixel_array, tile),
+                tiles,
+            ))
+            self.get_cairo_context(pixel_array).get_target().mark_dirty()
+
+    def display_tile(self, drawings, pixel_array, tile):
+        ctx = self.get_tile_context(pixel_array, tile)
+        for drawing in drawings:
+            if drawing.rows[0] < tile[1] and drawing.rows[1] >= tile[0]:
+                drawing.draw(ctx)
+        ctx.get_target().flush()
+
+
+class TiledCamera(TiledCameraMixin, Camera):
+    pass
+
+
+def with_tiled_rasterization(scene_class, n_threads=None):
+    """
+    scene_class with a camera which draws each frame in tiles on
+    n_threads threads (default: number of cores).
+    """
+    return subclass_camera(scene_class, TiledCameraMixin, tile_threads=n_threads)
@@ -0,0 +1,158 @@
+"""
+A TracedPath whose memory and drawing cost stay bounded however long
+the point is traced.
+
+The segments of the path live in a preallocated buffer which grows by
+doubling, and the points of the mobject are a view into it, so adding
+a segment does not copy the path.  On top of that, segments can be
+merged where the path is nearly straight, and the path can be limited
+to its most recent segments, fading towards its end.
+"""
+import numpy as np
+
+from manimlib.mobject.changing import TracedPath as ManimTracedPath
+from manimlib.utils.bezier import interpolate
+from manimlib.utils.space_ops import get_norm
+
+
+class TracedPath(ManimTracedPath):
+    """
+    With tolerance set, a new segment that continues the previous one
+    in nearly the same direction is merged into it, as long as none of
+    the traced points it replaces is further than tolerance from the
+    merged segment.
+
+    With max_segments set, only that many of the most recent segments
+    are kept, for a trail of fixed length behind the traced point.
+
+    With tail_opacity set, the stroke fades from its own opacity at the
+    traced point to tail_opacity at the oldest point kept.  The opacity
+    is a gradient along the line from that point to the traced one, so
+    it follows the path as long as the path does not turn back on
+    itself, as a short trail rarely does.
+    """
+    CONFIG = {
+        "tolerance": None,
+        "max_segments": None,
+        "tail_opacity": None,
+        "initial_capacity": 64,
+    }
+
+    def __init__(self, traced_point_func, **kwargs):
+        self.segment_buffer = None
+        self.first_segment = 0
+        self.n_segments = 0
+        self.run_direction = None
+        super().__init__(traced_point_func, **kwargs)
+        if self.tail_opacity is not None:
+            # The first color is drawn at the tail, the second at the head
+            self.set_stroke(
+                opacity=[self.tail_opacity, self.get_stroke_opacity()],
+                family=False,
+            )
+
+    def get_gradient_start_and_end_points(self):
+        if self.tail_opacity is not None and len(self.points) > 0:
+            tail, head = self.points[0], self.points[-1]
+            if get_norm(head - tail) > 0:
+                return (tail, head)
+        return super().get_gradient_start_and_end_points()
+
+    def get_segments(self):
+        # The segments as an (n_segments, n_points_per_cubic_curve, dim) view
+        self.adopt_points()
+        return self.segment_buffer[
+            self.first_segment:self.first_segment + self.n_segments
+        ]
+
+    def adopt_points(self):
+        # The points of a copy, or points set by something like
+        # apply_function, are no longer a view into the buffer
+        buffer = self.segment_buffer
+        if buffer is not None and self.points.base is buffer:
+            return
+        nppcc = self.n_points_per_cubic_curve
+        n_segments = len(self.points) // nppcc
+        self.segment_buffer = np.zeros((
+            max(2 * n_segments, self.get_min_capacity()), nppcc, self.dim,
+        ))
+        self.segment_buffer[:n_segments] = self.points[:n_segments * nppcc].reshape(
+            (n_segments, nppcc, self.dim)
+        )
+        self.first_segment = 0
+        self.n_segments = n_segments
+        self.run_direction = None
+        self.update_points_view()
+
+    def get_min_capacity(self):
+        if self.max_segments is not None:
+            # Room to keep the trail twice over, so that it only has to
+            # be moved back to the start once every max_segments segments
+            return 2 * self.max_segments
+        return self.initial_capacity
+
+    def update_points_view(self):
+        segments = self.segment_buffer[
+            self.first_segment:self.first_segment + self.n_segments
+        ]
+        self.points = segments.reshape((-1, self.dim))
+
+    def append_segment(self, point):
+        self.adopt_points()
+        if self.max_segments is not None and self.n_segments >= self.max_segments:
+            self.first_segment += 1
+            self.n_segments -= 1
+        end = self.first_segment + self.n_segments
+        if end == len(self.segment_buffer):
+            if self.max_segments is not None:
+                self.segment_buffer[:self.n_segments] = \
+                    self.segment_buffer[self.first_segment:end]
+            else:
+                buffer = np.zeros(
+                    (2 * len(self.segment_buffer),) + self.segment_buffer.shape[1:]
+                )
+                buffer[:self.n_segments] = self.segment_buffer[self.first_segment:end]
+                self.segment_buffer = buffer
+            self.first_segment = 0
+            end = self.n_segments
+        # A line from the point to itself, as VMobject.add_line_to makes it
+        self.segment_buffer[end] = [point] + [
+            interpolate(point, point, a)
+            for a in np.linspace(0, 1, self.n_points_per_cubic_curve)[1:]
+        ]
+        self.n_segments += 1
+        self.update_points_view()
+
+    def update_path(self):
+        new_point = self.traced_point_func()
+        if self.has_no_points():
+            self.append_segment(new_point)
+            return
+        segments = self.get_segments()
+        segments[-1, -1] = new_point
+        if get_norm(new_point - segments[-1, 0]) < self.min_distance_to_new_point:
+            return
+        if self.can_merge_last_segments():
+            # The segment before continues to the new point instead
+            segments[-2, -1] = new_point
+            segments[-1] = new_point
+            return
+        self.run_direction = new_point - segments[-1, 0]
+        self.run_direction /= get_norm(self.run_direction)
+        self.append_segment(new_point)
+
+    def can_merge_last_segments(self):
+        if self.tolerance is None or self.run_direction is None:
+            return False
+        segments = self.get_segments()
+        if len(segments) < 2:
+            return False
+        start = segments[-2, 0]
+        end = segments[-1, -1] - start
+        along = np.dot(end, self.run_direction)
+        if along < np.dot(segments[-1, 0] - start, self.run_direction):
+            # Turning back along the same line
+            return False
+        # Every merged point is within tolerance / 2 of the line through
+        # start in run_direction, so within tolerance of the segment
+        return get_norm(end - along * self.run_direction) <= self.tolerance / 2
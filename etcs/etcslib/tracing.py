@@ -0,0 +1,214 @@
+"""
+Recording where the time of a render goes, as spans in the Chrome trace
+event format, which chrome://tracing and https://ui.perfetto.dev open.
+
+    with tracing("ParabolaExample.trace.json"):
+        ParabolaExample(**scene_kwargs)
+
+While tracing, there is a span for every scene, every play() and wait(),
+every call of an updater, every interpolation step of an animation,
+every TeX compilation, every camera capture and every write to the
+encoder, each with the names of the scene and animations involved.
+Tracing works by patching manim's classes when it starts and restoring
+them when it stops, so when it is off, nothing runs that would not run
+anyway.
+
+Only the process which started tracing is recorded, so to trace a
+scene, render it without --workers and --segment_workers.
+"""
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+import manimlib.mobject.svg.tex_mobject as tex_mobject
+from manimlib.animation.animation import Animation
+from manimlib.camera.camera import Camera
+from manimlib.mobject.mobject import Mobject
+from manimlib.scene.scene import Scene
+from manimlib.scene.scene_file_writer import SceneFileWriter
+from manimlib.utils.simple_functions import get_parameters
+
+
+active_tracer = None
+
+
+class Tracer(object):
+    def __init__(self):
+        self.events = []
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        self.scene_name = None
+        self.patches = []
+
+    def get_timestamp(self):
+        # In microseconds, as the trace format wants them
+        return (time.perf_counter() - self.start) * 1e6
+
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        start = self.get_timestamp()
+        try:
+            yield
+        finally:
+            if self.scene_name is not None:
+                args["scene"] = self.scene_name
+            self.events.append({
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start,
+                "dur": self.get_timestamp() - start,
+                "pid": self.pid,
+                "tid": threading.get_ident(),
+                "args": args,
+            })
+
+    def patch(self, owner, name, make_wrapper):
+        original = getattr(owner, name)
+        self.patches.append((owner, name, original))
+        setattr(owner, name, functools.wraps(original)(make_wrapper(original)))
+
+    def patch_overrides(self, base_class, name, make_wrapper):
+        # Every class from base_class down that has its own `name`
+        classes = [base_class]
+        for cls in classes:
+            classes.extend(cls.__subclasses__())
+        for cls in set(classes):
+            if name in cls.__dict__:
+                self.patch(cls, name, make_wrapper)
+
+    def install(self):
+        tracer = self
+
+        def trace_scene(init):
+            def wrapper(scene, *args, **kwargs):
+                outer_scene_name = tracer.scene_name
+                tracer.scene_name = type(scene).__name__
+                try:
+                    with tracer.span(tracer.scene_name, "scene"):
+                        return init(scene, *args, **kwargs)
+                finally:
+                    tracer.scene_name = outer_scene_name
+            return wrapper
+
+        def trace_play(method, name):
+            def wrapper(scene, *args, **kwargs):
+                animations = ", ".join(
+                    type(arg).__name__ for arg in args
+                    if isinstance(arg, Animation)
+                )
+                with tracer.span(name, "play", num_play=scene.num_plays,
+                                 animations=animations):
+                    return method(scene, *args, **kwargs)
+            return wrapper
+
+        def trace_update(update):
+            # Mobject.update, with a span around each updater
+            def wrapper(mobject, dt=0, recursive=True):
+                if mobject.updating_suspended:
+                    return mobject
+                for updater in mobject.updaters:
+                    with tracer.span(
+                        getattr(updater, "__qualname__", repr(updater)),
+                        "updater", mobject=type(mobject).__name__,
+                    ):
+                        if "dt" in get_parameters(updater):
+                            updater(mobject, dt)
+                        else:
+                            updater(mobject)
+                if recursive:
+                    for submob in mobject.submobjects:
+                        submob.update(dt, recursive)
+                return mobject
+            return wrapper
+
+        def trace_interpolate(interpolate):
+            def wrapper(animation, alpha):
+                with tracer.span(type(animation).__name__, "interpolate",
+                                 animation=str(animation), alpha=alpha):
+                    return interpolate(animation, alpha)
+            return wrapper
+
+        def trace_method(category):
+            def make_wrapper(method):
+                def wrapper(*args, **kwargs):
+                    with tracer.span(method.__name__, category):
+                        return method(*args, **kwargs)
+                return wrapper
+            return make_wrapper
+
+        def trace_tex(tex_to_svg_file):
+            def wrapper(expression, *args, **kwargs):
+                with tracer.span("tex_to_svg_file", "tex", expression=expression):
+                    return tex_to_svg_file(expression, *args, **kwargs)
+            return wrapper
+
+        self.patch(Scene, "__init__", trace_scene)
+        self.patch(Scene, "play", lambda play: trace_play(play, "play"))
+        self.patch(Scene, "wait", lambda wait: trace_play(wait, "wait"))
+        self.patch(Scene, "bring_to_front", trace_method("scene"))
+        self.patch(Scene, "bring_to_back", trace_method("scene"))
+        self.patch(Mobject, "update", trace_update)
+        self.patch_overrides(Animation, "interpolate", trace_interpolate)
+        self.patch_overrides(Camera, "capture_mobjects", trace_method("camera"))
+        self.patch(tex_mobject, "tex_to_svg_file", trace_tex)
+        for name in ["open_movie_pipe", "write_frame", "close_movie_pipe",
+                     "combine_movie_files"]:
+            self.patch_overrides(SceneFileWriter, name, trace_method("encode"))
+
+    def uninstall(self):
+        while self.patches:
+            owner, name, original = self.patches.pop()
+            setattr(owner, name, original)
+
+    def write(self, file_name):
+        metadata = {
+            "name": "process_name",
+            "ph": "M",
+            "pid": self.pid,
+            "args": {"name": "manim"},
+        }
+        with open(file_name, "w") as trace_file:
+            json.dump({
+                "traceEvents": [metadata] + self.events,
+                "displayTimeUnit": "ms",
+            }, trace_file)
+
+
+@contextlib.contextmanager
+def tracing(file_name):
+    """
+    Records spans for everything rendered inside the with block and
+    writes them to `file_name`.
+    """
+    global active_tracer
+    if active_tracer is not None:
+        raise Exception("Already tracing")
+    active_tracer = Tracer()
+    active_tracer.install()
+    try:
+        yield active_tracer
+    finally:
+        tracer, active_tracer = active_tracer, None
+        tracer.uninstall()
+        tracer.write(file_name)
+        print("Trace with {} spans written to {}".format(
+            len(tracer.events), file_name,
+        ))
+
+
+def span(name, **args):
+    """
+    A span around some code of a scene, e.g.
+
+        with span("layout"):
+            ...
+
+    which costs next to nothing when not tracing.
+    """
+    if active_tracer is None:
+        return contextlib.nullcontext()
+    return active_tracer.span(name, "user", **args)
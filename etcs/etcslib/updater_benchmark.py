@@ -0,0 +1,189 @@
+"""
+Frames per second of the updater driven part of ParabolaExample: once
+with its original updater, which rebuilds a Dot, two Lines and a Circle
+every frame and copies them over with become(), and once with the
+updater moving etcslib.geometry mobjects in place.
+
+    python -m etcslib.updater_benchmark [-l | -m] [--run_time 4] [--skip_rendering]
+
+TeX labels are built from placeholders, so LaTeX is not needed.
+"""
+import argparse
+import tempfile
+import time
+
+import manimlib.constants as consts
+from manimlib.imports import *
+
+from etcslib.geometry import ParametricCircle
+from etcslib.geometry import ParametricDot
+from etcslib.geometry import ParametricLine
+from etcslib.layers import LayeredScene
+from etcslib.tex import placeholder_tex
+
+
+class ParabolaUpdaterBenchmark(LayeredScene):
+    CONFIG = {
+        "in_place": True,
+        "render_frames": True,
+        "run_time": 4,
+        "c": 2,
+        "t": 2.5,
+        "t1": -4,
+    }
+
+    def setup(self):
+        c, t = self.c, self.t
+        grid = NumberPlane(y_max=2*FRAME_Y_RADIUS).fade(0.6)
+        self.L_line = grid.get_graph(lambda x: -c, color=BLUE)
+        self.F_dot = Dot(c*UP, color=BLUE)
+        parabola_function = lambda x: (x**2)/(4*c)
+        self.P_graph = grid.get_graph(parabola_function, color=YELLOW, stroke_opacity=0.6)
+        self.path = grid.get_graph(parabola_function, x_min=self.t1, x_max=t)
+
+        DotClass, LineClass = Dot, Line
+        if self.in_place:
+            DotClass, LineClass = ParametricDot, ParametricLine
+        E_dot = DotClass(self.L_line.get_point_from_function(t))
+        C_point = self.P_graph.get_point_from_function(t)
+        C_dot = DotClass(C_point, color=YELLOW)
+        C_to_L = LineClass(C_dot, np.array([C_point[0],0,0])+c*DOWN)
+        C_to_F = LineClass(C_dot.get_center(), self.F_dot.get_center())
+        if self.in_place:
+            C_circle = ParametricCircle(arc_center=C_point, radius=C_point[1] + c, stroke_width=2, stroke_opacity=0.8)
+        else:
+            C_circle = Circle(radius=C_point[1] + c, stroke_width=2, stroke_opacity=0.6).move_to(C_point)
+
+        self.E_name = TexMobject("E").next_to(E_dot, DOWN)
+        self.C_name = TexMobject("C", "=(x_C, y_C)").next_to(C_dot, RIGHT+0.5*DOWN)
+        self.i_name = TexMobject("i", "= y_C + c").next_to(C_to_L)
+        self.j_name = TexMobject("j", r"= \sqrt{x_C^2 + (y_C - c)^2}").next_to(C_to_F.get_center(), RIGHT+0.5*UP)
+
+        self.dot_guide = Dot(C_point, color=YELLOW)
+        self.group = VGroup(C_circle,C_to_L,C_to_F,C_dot,E_dot)
+        self.add(grid, self.L_line, self.P_graph, self.F_dot)
+
+    def construct(self):
+        if self.in_place:
+            self.group.add_updater(self.update_group_in_place)
+        else:
+            self.group.add_updater(self.update_group_with_become)
+        self.add(self.group)
+        start = time.perf_counter()
+        self.play(MoveAlongPath(self.dot_guide, self.path), run_time=self.run_time)
+        self.seconds = time.perf_counter() - start
+        self.n_frames = int(np.ceil(self.run_time * self.camera.frame_rate))
+
+    def update_frame(self, *args, **kwargs):
+        if self.render_frames:
+            LayeredScene.update_frame(self, *args, **kwargs)
+
+    def update_group_with_become(self, group):
+        # As ParabolaExample.update_group was before etcslib.geometry
+        c, L_line, P_graph, F_dot = self.c, self.L_line, self.P_graph, self.F_dot
+        t = self.dot_guide.get_center()[0]
+        C_circle,C_to_L,C_to_F,C_dot,E_dot = group
+        E_dot.move_to(L_line.get_point_from_function(t))
+        self.E_name.next_to(E_dot, DOWN)
+
+        new_C_point = P_graph.get_point_from_function(t)
+        new_C_dot = Dot(new_C_point, color=YELLOW)
+        self.C_name.next_to(C_dot, RIGHT+0.5*DOWN)
+        new_C_to_L = Line(new_C_dot, np.array([new_C_point[0],0,0])+c*DOWN)
+        self.i_name.next_to(new_C_to_L)
+        new_C_to_F = Line(new_C_dot.get_center(), F_dot.get_center())
+        self.j_name.next_to(new_C_to_F.get_center(), RIGHT+0.5*UP)
+
+        new_C_circle = Circle(radius=new_C_point[1] + c, stroke_width=2, stroke_opacity=0.8).move_to(new_C_point)
+
+        C_dot.become(new_C_dot)
+        C_to_L.become(new_C_to_L)
+        C_to_F.become(new_C_to_F)
+        C_circle.become(new_C_circle)
+        self.bring_to_front(F_dot)
+
+    def update_group_in_place(self, group):
+        # As ParabolaExample.update_group
+        c, L_line, P_graph, F_dot = self.c, self.L_line, self.P_graph, self.F_dot
+        t = self.dot_guide.get_center()[0]
+        C_circle,C_to_L,C_to_F,C_dot,E_dot = group
+        E_dot.set_center(L_line.get_point_from_function(t))
+        self.E_name.next_to(E_dot, DOWN)
+
+        new_C_point = P_graph.get_point_from_function(t)
+        C_dot.set_center(new_C_point)
+        self.C_name.next_to(C_dot, RIGHT+0.5*DOWN)
+        C_to_L.set_start_and_end(C_dot, np.array([new_C_point[0],0,0])+c*DOWN)
+        self.i_name.next_to(C_to_L)
+        C_to_F.set_start_and_end(new_C_point, F_dot.get_center())
+        self.j_name.next_to(C_to_F.get_center(), RIGHT+0.5*UP)
+        C_circle.set_center_and_radius(new_C_point, new_C_point[1] + c)
+        self.bring_to_front(F_dot)
+
+
+def get_parser():
+    parser = argparse.ArgumentParser(
+        description="Frames per second of ParabolaExample's updaters, "
+                    "with become() and in place"
+    )
+    quality = parser.add_mutually_exclusive_group()
+    quality.add_argument(
+        "-l", "--low_quality", action="store_true",
+        help="Render at low quality",
+    )
+    quality.add_argument(
+        "-m", "--medium_quality", action="store_true",
+        help="Render at medium quality",
+    )
+    parser.add_argument(
+        "--run_time", type=float, default=4,
+        help="Seconds of animation to render for each updater",
+    )
+    parser.add_argument(
+        "--skip_rendering", action="store_true",
+        help="Only time the updaters, without drawing any frames",
+    )
+    return parser
+
+
+def get_camera_config(args):
+    if args.low_quality:
+        return dict(consts.LOW_QUALITY_CAMERA_CONFIG)
+    if args.medium_quality:
+        return dict(consts.MEDIUM_QUALITY_CAMERA_CONFIG)
+    return dict(consts.PRODUCTION_QUALITY_CAMERA_CONFIG)
+
+
+def main():
+    args = get_parser().parse_args()
+    camera_config = get_camera_config(args)
+    results = []
+    with tempfile.TemporaryDirectory() as output_directory, placeholder_tex():
+        for name, in_place in [("become", False), ("in place", True)]:
+            scene = ParabolaUpdaterBenchmark(
+                in_place=in_place,
+                render_frames=not args.skip_rendering,
+                run_time=args.run_time,
+                camera_config=camera_config,
+                file_writer_config={
+                    "write_to_movie": False,
+                    "save_last_frame": False,
+                    "output_directory": output_directory,
+                    "file_name": "benchmark",
+                },
+            )
+            results.append((name, scene.n_frames / scene.seconds))
+
+    print("ParabolaExample updaters, {} frames at {}x{}{}:".format(
+        scene.n_frames,
+        camera_config["pixel_width"],
+        camera_config["pixel_height"],
+        ", not rendered" if args.skip_rendering else "",
+    ))
+    base_fps = results[0][1]
+    for name, fps in results:
+        print("  {:<10}{:8.1f} fps  ({:.2f}x)".format(name, fps, fps / base_fps))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,20 @@
 
 from manimlib.imports import *
 
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from etcslib.finite import FiniteMapping
+from etcslib.finite import FiniteNamedSetBag
+from etcslib.finset import FinFunction
+from etcslib.finset import FinSet
+from etcslib.finset import is_commuting_square
+from etcslib.spotlight import GroupOpacityCamera
+from etcslib.spotlight import set_group_opacity
+from etcslib.spotlight import spotlight
+
 # To watch one of these scenes, run the following:
 # python -m manim example_scenes.py SquareToCircle -pl
 #
@@ -14,54 +28,6 @@ from manimlib.imports import *
 # Use -r <number> to specify a resolution (for example, -r 1080
 # for a 1920x1080 video)
 
-class FiniteMapping(VMobject):
-    def __init__(self, set_from, set_to, f, f_name=None, **kwargs):
-        VMobject.__init__(self, **kwargs)
-        if f_name:
-            self.f_name = TextMobject(str(f_name), **kwargs).move_to(n/2 * UP)
-            self.add(self.f_name)
-
-        self.set_from = set_from
-        self.set_to   = set_to
-
-        self.arrows = []
-        for i in range(len(set_from.elements)):
-            x = set_from.elements[i]
-            dot_from = set_from.dots[i]
-            y = f(x)
-            j = set_to.elements.index(y)
-            dot_to = set_to.dots[j]
-            arr = Arrow(dot_from, dot_to, tip_length = 0.15, stroke_width = 2, buff=0.1, **kwargs)
-            self.arrows.append(arr)
-            self.add(arr)
-
-class FiniteNamedSetBag(VMobject):
-    def __init__(self, names, set_name=None, set_boundary=False, set_orientation=DOWN,
-            element_label_at=None, **kwargs):
-        VMobject.__init__(self, **kwargs)
-
-        if element_label_at is None:
-            element_label_at = 0.7 * rotate_vector(set_orientation, np.pi/2)
-
-        self.elements = names
-
-        if set_name:
-            self.set_name = TextMobject(str(set_name), **kwargs).move_to(n/2 * UP)
-            self.add(self.set_name)
-
-        n = len(names)
-        self.dots = [Dot((i - (n-1)/2)/2 * set_orientation, **kwargs) for i in range(n)]
-
-        for (dot, name) in zip(self.dots, names):
-            label = TextMobject(str(name), **kwargs).scale(0.8).next_to(dot, element_label_at)
-            self.add(dot)
-            self.add(label)
-
-        if set_boundary:
-            self.bag = Circle(**kwargs)
-            self.bag.surround(self)
-            self.add(self.bag)
-
 class FiniteSetBag(VMobject):
     def __init__(self, n, boundary=False, **kwargs):
         self.elements = [Dot(((n-1)/2 - i)/2 * UP, **kwargs) for i in range(n)]
@@ -74,23 +40,35 @@ class FiniteSetBag(VMobject):
             self.add(self.bag)
 
 class FourSetsExample(Scene):
+    CONFIG = {
+        "camera_class": GroupOpacityCamera,
+    }
+
     def construct(self):
         title = TextMobject("Sets and mappings").move_to(3*UP)
         self.play(Write(title))
 
-        setA = FiniteNamedSetBag(range(3), color=BLUE, set_orientation=0.6*(RIGHT+UP), set_boundary=True)
+        A, B, C, D = FinSet(range(3)), FinSet(range(2)), FinSet(range(2)), FinSet(range(2))
+        f0 = FinFunction.from_function(A, B, lambda x: x % 2)
+        X = FinFunction.from_function(A, C, lambda x: 1 - x % 2)
+        Y = FinFunction.from_function(B, D, lambda x: x)
+        f1 = FinFunction.from_function(C, D, lambda x: 1 - x)
+        # f_1(X(z)) = Y(f_0(z)) for all z, as the equation below claims
+        assert is_commuting_square(f0, X, Y, f1)
+
+        setA = FiniteNamedSetBag(A, color=BLUE, set_orientation=0.6*(RIGHT+UP), set_boundary=True)
         setA.move_to(1.5*LEFT + 1*UP)
-        setB = FiniteNamedSetBag(range(2), color=RED, set_orientation=0.6*(RIGHT+DOWN), set_boundary=True)
+        setB = FiniteNamedSetBag(B, color=RED, set_orientation=0.6*(RIGHT+DOWN), set_boundary=True)
         setB.move_to(1.5*RIGHT + 1*UP)
-        setC = FiniteNamedSetBag(range(2), color=BLUE, set_orientation=0.6*(LEFT+UP), set_boundary=True)
+        setC = FiniteNamedSetBag(C, color=BLUE, set_orientation=0.6*(LEFT+UP), set_boundary=True)
         setC.move_to(1.5*LEFT + 1*DOWN)
-        setD = FiniteNamedSetBag(range(2), color=RED, set_orientation=0.6*(LEFT+DOWN), set_boundary=True)
+        setD = FiniteNamedSetBag(D, color=RED, set_orientation=0.6*(LEFT+DOWN), set_boundary=True)
         setD.move_to(1.5*RIGHT + 1*DOWN)
 
-        AB_arrows = FiniteMapping(setA, setB, lambda x: x % 2, color=YELLOW)
-        AC_arrows = FiniteMapping(setA, setC, lambda x: 1 - x % 2, color=BLUE)
-        BD_arrows = FiniteMapping(setB, setD, lambda x: x, color=RED)
-        CD_arrows = FiniteMapping(setC, setD, lambda x: 1 - x, color=YELLOW)
+        AB_arrows = FiniteMapping(setA, setB, f0, color=YELLOW)
+        AC_arrows = FiniteMapping(setA, setC, X, color=BLUE)
+        BD_arrows = FiniteMapping(setB, setD, Y, color=RED)
+        CD_arrows = FiniteMapping(setC, setD, f1, color=YELLOW)
 
 
         f0_name = TexMobject(r"f_0", color=YELLOW).next_to(AB_arrows, UP)
@@ -134,24 +112,24 @@ class FourSetsExample(Scene):
         fz_name  = TexMobject("f_0(z_1)").next_to(fz_dot, RIGHT+UP)
         temp_names = VGroup(z_name, Xz_name, fXz_name, fz_name)
 
-        parts = [ VGroup(z_dot, z_name)
-                , VGroup(Xz_dot, Xz_name, AC_arrows.arrows[1])
-                , VGroup(fXz_dot, fXz_name[0], CD_arrows.arrows[0])
-                , VGroup(fz_dot, fz_name, AB_arrows.arrows[1])
-                , VGroup(fXz_name[1], BD_arrows.arrows[1])
+        parts = [ [z_dot, z_name]
+                , [Xz_dot, Xz_name, AC_arrows.arrows[1]]
+                , [fXz_dot, fXz_name[0], CD_arrows.arrows[0]]
+                , [fz_dot, fz_name, AB_arrows.arrows[1]]
+                , [fXz_name[1], BD_arrows.arrows[1]]
                 ]
 
         everything = self.get_top_level_mobjects()
-        self.play(
-                *[ApplyMethod(mob.fade, 0.8) for mob in everything],
-                ApplyMethod(equation[0:9].fade, 1 - 1 / (1 - 0.8))
-                )
-        temp_names.fade(0.8)
+        lit = list(equation[0:9])
+        self.play(*spotlight(everything, lit))
+        for name in [z_name, Xz_name, fXz_name[0], fXz_name[1], fz_name]:
+            set_group_opacity(name, 0.2)
         for part in parts:
-            self.play(ApplyMethod(part.fade, 1 - 1 / (1 - 0.8)))
+            lit += part
+            self.play(*spotlight(everything, lit))
         self.wait()
         self.play(
-                *[ApplyMethod(mob.fade, 1 - 1 / (1 - 0.8)) for mob in everything],
+                *spotlight(everything, opacity=1),
                 FadeOut(temp_names)
                 )
         self.wait()
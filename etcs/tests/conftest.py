@@ -0,0 +1,5 @@
+import os
+import sys
+
+# As in the scene files, etcslib is imported from the etcs/ directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,138 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from etcslib.finset import FinFunction
+from etcslib.finset import FinSet
+from etcslib.finset import HomSet
+from etcslib.finset import coproduct
+from etcslib.finset import equalizer
+from etcslib.finset import is_commuting_square
+from etcslib.finset import product
+from etcslib.finset import pullback
+
+
+def all_tables(n_from, n_to):
+    # Every function as a table, in the order HomSet promises
+    return [list(table) for table in itertools.product(range(n_to), repeat=n_from)]
+
+
+def get_tables(hom_set):
+    return [list(f.table) for f in hom_set]
+
+
+def test_finset_needs_elements():
+    with pytest.raises(Exception, match="needs its elements"):
+        FinSet(None)
+
+
+@pytest.mark.parametrize("x", [[1], {}, "e"])
+def test_index_of_a_non_element(x):
+    A = FinSet(["a", "b"])
+    with pytest.raises(Exception, match="is not an element"):
+        A.index(x)
+
+
+@pytest.mark.parametrize("n_from, n_to", [(0, 2), (2, 0), (3, 2), (2, 3), (4, 3)])
+@pytest.mark.parametrize("batch_size", [1, 5, 4096])
+def test_hom_set_order(n_from, n_to, batch_size):
+    A, B = FinSet(range(n_from)), FinSet(range(n_to))
+    tables = all_tables(n_from, n_to)
+    hom_set = HomSet(A, B, batch_size=batch_size)
+    assert hom_set.get_n_candidates() == n_to ** n_from
+    assert get_tables(hom_set) == tables
+    assert [
+        list(hom_set.get_candidate(i).table) for i in range(len(tables))
+    ] == tables
+    assert get_tables(hom_set.injective()) == [
+        table for table in tables if len(set(table)) == n_from
+    ]
+    assert get_tables(hom_set.surjective()) == [
+        table for table in tables if len(set(table)) == n_to
+    ]
+    assert hom_set.injective().count() == len(get_tables(hom_set.injective()))
+
+
+def test_composing_to():
+    A, B, C = FinSet(range(3)), FinSet(range(4)), FinSet(range(2))
+    after = FinFunction(B, C, [0, 1, 1, 0])
+    target = FinFunction(A, C, [1, 0, 1])
+    before = FinFunction(A, A, [2, 0, 0])
+    for hom_set in [HomSet(A, B), HomSet(A, B, batch_size=3)]:
+        expected = [
+            table for table in all_tables(3, 4)
+            if [after.table[table[i]] for i in range(3)] == list(target.table)
+        ]
+        assert get_tables(hom_set.composing_to(target, after=after)) == expected
+        expected = [
+            table for table in all_tables(3, 4)
+            if [after.table[table[i]] for i in before.table] == list(target.table)
+        ]
+        assert get_tables(
+            hom_set.composing_to(target, before=before, after=after)
+        ) == expected
+
+
+def test_sections():
+    A, B = FinSet(range(2)), FinSet(range(5))
+    p = FinFunction(B, A, [0, 1, 1, 0, 1])
+    sections = list(HomSet(A, B).sections_of(p))
+    assert len(sections) == 2 * 3
+    for s in sections:
+        assert p.compose(s).equals(A.identity())
+
+
+def test_product_and_coproduct():
+    A, B, D = FinSet("abc"), FinSet("xy"), FinSet(range(4))
+    AxB = product(A, B)
+    assert AxB.elements == [(a, b) for b in B for a in A]
+    pi1, pi2 = AxB.projections
+    f = FinFunction(D, A, [2, 0, 1, 1])
+    g = FinFunction(D, B, [1, 1, 0, 1])
+    h = AxB.pairing(f, g)
+    assert pi1.compose(h).equals(f) and pi2.compose(h).equals(g)
+
+    AplusB = coproduct(A, B)
+    assert AplusB.elements == [(0, a) for a in A] + [(1, b) for b in B]
+    i1, i2 = AplusB.injections
+    k = FinFunction(A, D, [3, 0, 2])
+    l = FinFunction(B, D, [1, 1])
+    m = AplusB.copairing(k, l)
+    assert m.compose(i1).equals(k) and m.compose(i2).equals(l)
+
+
+def test_equalizer():
+    A, B, D = FinSet(range(6)), FinSet(range(3)), FinSet(range(2))
+    f = FinFunction(A, B, [0, 1, 2, 0, 1, 2])
+    g = FinFunction(A, B, [0, 2, 2, 1, 1, 0])
+    E = equalizer(f, g)
+    assert E.elements == [x for x in A if f(x) == g(x)]
+    e = E.inclusion
+    assert f.compose(e).equals(g.compose(e))
+    h = FinFunction(D, A, [4, 2])
+    assert e.compose(E.factor(h)).equals(h)
+    with pytest.raises(Exception):
+        E.factor(FinFunction(D, A, [1, 2]))
+
+
+def test_pullback():
+    A, B, C = FinSet(range(4)), FinSet(range(3)), FinSet(range(2))
+    f = FinFunction(A, C, [0, 1, 1, 0])
+    g = FinFunction(B, C, [1, 0, 1])
+    P = pullback(f, g)
+    assert P.elements == [
+        (a, b) for b in B for a in A if f(a) == g(b)
+    ]
+    p1, p2 = P.projections
+    assert is_commuting_square(p2, p1, g, f)
+    assert not is_commuting_square(
+        p2, p1, g, FinFunction(A, C, [1, 0, 0, 1]),
+    )
+    # Any commuting square over f and g factors through the pullback
+    D = FinSet(range(2))
+    q1 = FinFunction(D, A, [1, 3])
+    q2 = FinFunction(D, B, [0, 1])
+    assert is_commuting_square(q2, q1, g, f)
+    k = P.factor(P.parent.pairing(q1, q2))
+    assert p1.compose(k).equals(q1) and p2.compose(k).equals(q2)